@@ -34,6 +34,72 @@ export type CalendarSettings = {
 
 type DateRange = [Date, Date] | [Date, null] | [null, null];
 
+type CalendarTables = {
+	language: string,
+	weekdays: Array<[string, string]>,  // abbreviated and full names, starting with the first day of the week
+	months: Array<string>,
+	titles: {[key: string]: string},
+	icons: {[key: string]: string},
+};
+
+type SheetData = {
+	mode: ViewMode,
+	date: string,
+	prev: string,
+	next: string,
+	cells: Array<any>,
+};
+
+// localized tables, shared by all calendars on the page using the same endpoint
+const calendarTables = new Map<string, Promise<CalendarTables>>();
+
+type CachedSheet = {
+	content: Promise<any>,
+	expires: number,
+};
+
+// calendar sheets, shared by all calendars on the page and kept as long as the server allows
+const sheetCache = new Map<string, CachedSheet>();
+const maxCachedSheets = 100;
+
+function getMaxAge(response: Response) : number {
+	const cacheControl = response.headers.get('Cache-Control') ?? '';
+	if (/no-store|no-cache/.test(cacheControl))
+		return 0;
+	const maxAge = /max-age=(\d+)/.exec(cacheControl);
+	return maxAge ? parseInt(maxAge[1]) : 0;
+}
+
+function fetchSheet(url: string, asData: boolean) : Promise<any> {
+	const cachedSheet = sheetCache.get(url);
+	if (cachedSheet && cachedSheet.expires > Date.now())
+		return cachedSheet.content;
+	// while being fetched, the sheet is shared with concurrent requests for the same URL
+	const entry: CachedSheet = {content: Promise.resolve(), expires: Infinity};
+	entry.content = fetch(url, {
+		method: 'GET',
+	}).then(response => {
+		if (response.status !== 200)
+			throw new Error(`Failed to fetch from ${url} (status=${response.status})`);
+		entry.expires = Date.now() + 1000 * getMaxAge(response);
+		return asData ? response.json() : response.text();
+	});
+	entry.content.catch(() => {
+		if (sheetCache.get(url) === entry) {
+			sheetCache.delete(url);
+		}
+	});
+	sheetCache.delete(url);
+	sheetCache.set(url, entry);
+	// evict the least recently fetched sheets
+	for (const key of sheetCache.keys()) {
+		if (sheetCache.size <= maxCachedSheets)
+			break;
+		sheetCache.delete(key);
+	}
+	return entry.content;
+}
+
 export class CalendarSheet extends Widget {
 	public readonly element: HTMLElement;
 	private viewMode!: ViewMode;
@@ -57,6 +123,7 @@ export class CalendarSheet extends Widget {
 	private minYearDate?: Date;
 	private maxYearDate?: Date;
 	private readonly baseSelector = '.dj-calendar';
+	private readonly sheetFormat: string | null;
 	private readonly rangeSelectCssRule: CSSStyleRule;
 	private readonly rangeSelectorText: string;
 	private readonly contractLeftCursor: string;
@@ -67,8 +134,10 @@ export class CalendarSheet extends Widget {
 		this.settings = settings;
 		if (calendarElement instanceof HTMLElement) {
 			this.element = calendarElement;
+			this.sheetFormat = calendarElement.getAttribute('data-format');
 		} else {
 			this.element = document.createElement('div');
+			this.sheetFormat = null;
 			this.fetchCalendar(new Date(), ViewMode.weeks);
 		}
 		const observer = new MutationObserver(() => this.registerCalendar());
@@ -801,7 +870,7 @@ export class CalendarSheet extends Widget {
 		}
 	}
 
-	private async fetchCalendar(atDate: Date, viewMode: ViewMode) {
+	private getSheetUrl(atDate: Date, viewMode: ViewMode, asData: boolean) : string {
 		const query = new URLSearchParams('calendar');
 		query.set('date', this.asUTCDate(atDate).toISOString().slice(0, 10));
 		query.set('mode', viewMode);
@@ -814,17 +883,209 @@ export class CalendarSheet extends Widget {
 		if (this.interval) {
 			query.set('interval', String(this.interval));
 		}
-		const response = await fetch(`${this.endpoint}?${query.toString()}`, {
-			method: 'GET',
-		});
-		if (response.status === 200) {
-			this.element.innerHTML = await response.text();
-			if (this.settings.withRange) {
-				this.showDateRange();
+		if (asData) {
+			query.set('format', 'json');
+		}
+		return `${this.endpoint}?${query.toString()}`;
+	}
+
+	private async fetchCalendar(atDate: Date, viewMode: ViewMode) {
+		if (!(this.sheetFormat === 'json' && await this.fetchSheetData(atDate, viewMode))) {
+			try {
+				this.element.innerHTML = await fetchSheet(this.getSheetUrl(atDate, viewMode, false), false);
+			} catch (error) {
+				console.error(error);
+				return;
 			}
+		}
+		if (this.settings.withRange) {
+			this.showDateRange();
+		}
+		this.prefetchAdjacentSheets();
+	}
+
+	// while idle, fetch the previous and next sheets into the cache, so that turning pages is instant
+	private prefetchAdjacentSheets() {
+		const prefetch = () => {
+			const asData = this.sheetFormat === 'json';
+			[this.prevSheetDate, this.nextSheetDate].forEach(date => {
+				fetchSheet(this.getSheetUrl(date, this.viewMode, asData), asData).catch(() => {});
+			});
+		};
+		if (typeof window.requestIdleCallback === 'function') {
+			window.requestIdleCallback(prefetch, {timeout: 2000});
 		} else {
-			console.error(`Failed to fetch from ${this.endpoint} (status=${response.status})`);
+			window.setTimeout(prefetch, 100);
+		}
+	}
+
+	private fetchCalendarTables() : Promise<CalendarTables> {
+		const key = `${this.endpoint}#${document.documentElement.lang}`;
+		let tables = calendarTables.get(key);
+		if (!tables) {
+			const query = new URLSearchParams('calendar');
+			query.set('format', 'json');
+			query.set('tables', '');
+			tables = fetch(`${this.endpoint}?${query.toString()}`, {
+				method: 'GET',
+			}).then(response => {
+				if (response.status !== 200)
+					throw new Error(`Failed to fetch calendar tables from ${this.endpoint} (status=${response.status})`);
+				return response.json();
+			});
+			tables.catch(() => calendarTables.delete(key));
+			calendarTables.set(key, tables);
+		}
+		return tables;
+	}
+
+	// fetch the data of a calendar sheet and build its DOM, return false if the sheet must be fetched as HTML
+	private async fetchSheetData(atDate: Date, viewMode: ViewMode) : Promise<boolean> {
+		try {
+			const [tables, data] = await Promise.all([
+				this.fetchCalendarTables(),
+				fetchSheet(this.getSheetUrl(atDate, viewMode, true), true),
+			]);
+			this.element.replaceChildren(...this.buildSheet(data, tables));
+			return true;
+		} catch (error) {
+			console.warn(error);
+			return false;
+		}
+	}
+
+	private createElement(tagName: string, attributes: {[key: string]: string} = {}, textContent?: string) : HTMLElement {
+		const element = document.createElement(tagName);
+		for (const [name, value] of Object.entries(attributes)) {
+			element.setAttribute(name, value);
+		}
+		if (textContent !== undefined) {
+			element.textContent = textContent;
+		}
+		return element;
+	}
+
+	// build the same DOM as rendered by the templates `calendar/*.html`
+	private buildSheet(data: SheetData, tables: CalendarTables) : Array<HTMLElement> {
+		const [viewName, period] = {
+			[ViewMode.hours]: ['hours', 'day'],
+			[ViewMode.weeks]: ['weeks', 'month'],
+			[ViewMode.months]: ['months', 'year'],
+			[ViewMode.years]: ['years', 'epoch'],
+		}[data.mode];
+		const year = data.date.slice(0, 4);
+		const month = parseInt(data.date.slice(5, 7));
+		const day = parseInt(data.date.slice(8, 10));
+		const createButton = (className: string, title: string, date?: string, icon?: string) => {
+			const button = this.createElement('button', {class: className, type: 'button', title: tables.titles[title]});
+			if (date) {
+				button.setAttribute('data-date', date);
+			}
+			if (icon) {
+				button.innerHTML = tables.icons[icon];
+			}
+			return button;
+		};
+		const createExtendButton = (text: string) => {
+			const button = createButton('extend', 'extend', data.date);
+			button.append(this.createElement('time', {datetime: data.date}, text));
+			return button;
+		};
+
+		const controls = this.createElement('div', {class: `controls ${viewName}-view`});
+		controls.append(createButton('prev', `prev_${period}`, data.prev, 'prev'));
+		const central = this.createElement('div', {class: 'central'});
+		switch (data.mode) {
+			case ViewMode.hours:
+				controls.append(createExtendButton(`${day}. ${tables.months[month - 1]} ${year}`));
+				central.append(...this.buildHoursView(data.cells));
+				break;
+			case ViewMode.weeks:
+				controls.append(createExtendButton(`${tables.months[month - 1]} ${year}`));
+				central.append(
+					this.createElement('ul', {class: 'weekdays'}),
+					this.createElement('ul', {class: 'monthdays'}),
+				);
+				central.firstElementChild!.append(...tables.weekdays.map(([abbr, weekday]) => {
+					const liElement = this.createElement('li');
+					liElement.append(this.createElement('abbr', {title: weekday}, abbr));
+					return liElement;
+				}));
+				central.lastElementChild!.append(...data.cells.map(([date, flags]: [string, number]) => {
+					const liElement = this.createElement('li', {'data-date': date}, String(parseInt(date.slice(8, 10))));
+					if (flags & 1) {
+						liElement.classList.add('adjacent');
+					}
+					return liElement;
+				}));
+				break;
+			case ViewMode.months:
+				controls.append(
+					createButton('narrow', 'narrow_weeks', data.date, 'narrow'),
+					createExtendButton(year),
+				);
+				central.append(this.createElement('ul', {class: 'months'}));
+				central.firstElementChild!.append(...data.cells.map((date: string, index: number) =>
+					this.createElement('li', {'data-date': date}, tables.months[index])
+				));
+				break;
+			case ViewMode.years:
+				controls.append(
+					createButton('narrow', 'narrow_months', data.date, 'narrow'),
+					this.createElement('time', {datetime: data.date}, `${data.cells[0].slice(0, 4)} – ${data.cells[data.cells.length - 1].slice(0, 4)}`),
+				);
+				central.append(this.createElement('ul', {class: 'years'}));
+				central.firstElementChild!.append(...data.cells.map((date: string) =>
+					this.createElement('li', {'data-date': date}, date.slice(0, 4))
+				));
+				break;
+		}
+		controls.append(
+			createButton('today', 'today', undefined, 'today'),
+			createButton('next', `next_${period}`, data.next, 'next'),
+		);
+
+		const sheetBody = this.createElement('div', {class: 'sheet-body', 'aria-label': `${viewName}-view`});
+		if (this.settings.pure) {
+			const asideLeft = this.createElement('div', {class: 'aside-left'});
+			asideLeft.append(this.createElement('time'));
+			const asideRight = this.createElement('div', {class: 'aside-right'});
+			asideRight.append(this.createElement('time'));
+			sheetBody.append(asideLeft, central, asideRight);
+		} else {
+			sheetBody.append(central);
+		}
+		return [controls, sheetBody];
+	}
+
+	private buildHoursView(cells: Array<[string, Array<string>|null]>) : Array<HTMLElement> {
+		const hour12 = this.settings.hour12;
+		const elements: Array<HTMLElement> = [];
+		// each shift contains six hours, the last one only contains midnight of the following day
+		for (let shift = 0; shift < cells.length; shift += 6) {
+			const hoursElement = this.createElement('ul', {class: 'hours'});
+			const minutesElements: Array<HTMLElement> = [];
+			cells.slice(shift, shift + 6).forEach(([datetime, minutes], index) => {
+				const hour = parseInt(datetime.slice(11, 13));
+				let hourLabel;
+				if (shift + index === 24) {
+					hourLabel = hour12 ? '12am' : '24h';
+				} else {
+					hourLabel = hour12 ? `${hour % 12 || 12}${hour < 12 ? 'am' : 'pm'}` : `${hour}h`;
+				}
+				hoursElement.append(this.createElement('li', {[minutes ? 'aria-label' : 'data-date']: datetime}, hourLabel));
+				if (minutes) {
+					const minutesElement = this.createElement('ul', {class: 'minutes', 'aria-labelledby': datetime});
+					minutesElement.toggleAttribute('hidden', true);
+					minutesElement.append(...minutes.map(minute =>
+						this.createElement('li', {'data-date': minute}, `${hour12 ? hour % 12 || 12 : hour}:${minute.slice(14, 16)}`)
+					));
+					minutesElements.push(minutesElement);
+				}
+			});
+			elements.push(hoursElement, ...minutesElements);
 		}
+		return elements;
 	}
 
 	private getSheetBounds() : [Date, Date] {
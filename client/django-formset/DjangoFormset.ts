@@ -23,6 +23,7 @@ type FieldValue = string|Array<string|Object>;
 const NON_FIELD_ERRORS = '__all__';
 const COLLECTION_ERRORS = '_collection_errors_';
 const MARKED_FOR_REMOVAL = '_marked_for_removal_';
+const ERROR_FORMAT_HEADER = 'X-Formset-Error-Format';
 
 const style = document.createElement('style');
 style.innerText = styles;
@@ -37,6 +38,23 @@ function assert(condition: any, message?: string) {
 }
 
 
+/**
+ * Read the errors from a response with status 422. If the server responded using the sparse error
+ * format, where each dotted path is mapped to its list of errors, convert them into the nested shape
+ * of the form collection.
+ */
+async function parseErrors(response: Response) : Promise<any> {
+	const body = await response.clone().json();
+	if (response.headers.get(ERROR_FORMAT_HEADER) !== 'sparse')
+		return body;
+	const errors = {};
+	for (const [path, messages] of Object.entries(body)) {
+		setDataValue(errors, path.split('.'), messages);
+	}
+	return errors;
+}
+
+
 class BoundValue {
 	public readonly value: FieldValue;
 
@@ -60,6 +78,9 @@ class FieldGroup {
 	private readonly updateVisibility: Function;
 	private readonly updateDisabled: Function;
 	private readonly updateRequired: Function;
+	private readonly serverDependencies: Array<string>|null;
+	private serverValidationTimer?: number;
+	private serverValidationController?: AbortController;
 
 	constructor(form: DjangoForm, element: HTMLElement) {
 		this.form = form;
@@ -135,6 +156,7 @@ class FieldGroup {
 		this.updateVisibility = this.evalVisibility('df-show', true) ?? this.evalVisibility('df-hide', false) ?? function() {};
 		this.updateDisabled = this.evalDisable();
 		this.updateRequired = this.evalRequire();
+		this.serverDependencies = this.evalServerValidation();
 		this.untouch();
 		this.setPristine();
 	}
@@ -301,6 +323,40 @@ class FieldGroup {
 		}
 	}
 
+	private evalServerValidation() : Array<string>|null {
+		// <... validate-on-blur="other_field another_field"> lists the fields this field depends on
+		const attrValue = this.fieldElements[0]?.getAttribute('validate-on-blur');
+		if (!isString(attrValue))
+			return null;
+		this.fieldElements.forEach(element => element.addEventListener('blur', () => {
+			window.clearTimeout(this.serverValidationTimer);
+			this.serverValidationTimer = window.setTimeout(() => this.validateOnServer(), 250);
+		}));
+		return attrValue.split(/[\s,]+/).filter(name => name);
+	}
+
+	private async validateOnServer() {
+		if (this.isPristine || this.fieldElements.some(element => !element.validity.valid && !element.validity.customError))
+			return;  // no need to ask the server, if the browser already rejects the value
+		this.serverValidationController?.abort();
+		const controller = this.serverValidationController = new AbortController();
+		const values = this.form.aggregateValues();
+		const dependencies = Object.fromEntries(
+			this.serverDependencies!.filter(name => values.has(name)).map(name => [name, values.get(name)])
+		);
+		try {
+			const path = [...this.form.path, this.name];
+			const errors = await this.form.formset.validateField(path, this.aggregateValue(), dependencies, controller.signal);
+			if (errors.length > 0) {
+				this.reportCustomError(errors[0]);
+				this.form.validate();
+			}
+		} catch (error) {
+			if (!(error instanceof DOMException && error.name === 'AbortError'))
+				console.warn(error);
+		}
+	}
+
 	private getDataValue(path: Path) {
 		return this.form.getDataValue(path);
 	}
@@ -2126,6 +2182,7 @@ export class DjangoFormset {
 				const headers = new Headers();
 				headers.append('Accept', 'application/json');
 				headers.append('Content-Type', 'application/json');
+				headers.append(ERROR_FORMAT_HEADER, 'sparse');
 				if (this.CSRFToken) {
 					headers.append('X-CSRFToken', this.CSRFToken);
 				}
@@ -2142,8 +2199,7 @@ export class DjangoFormset {
 						return response;
 					case 422:
 						this.clearErrors();
-						const body = await response.clone().json();
-						this.reportErrors(body);
+						this.reportErrors(await parseErrors(response));
 						return response;
 					default:
 						console.warn(`Unknown response status: ${response.status}`);
@@ -2164,6 +2220,29 @@ export class DjangoFormset {
 		}
 	}
 
+	async validateField(path: Path, value: FieldValue, dependencies: Object, signal: AbortSignal) : Promise<Array<string>> {
+		if (!this.endpoint)
+			throw new Error("<django-formset> requires attribute 'endpoint=\"server endpoint\"' for field validation");
+		const headers = new Headers();
+		headers.append('Accept', 'application/json');
+		headers.append('Content-Type', 'application/json');
+		if (this.CSRFToken) {
+			headers.append('X-CSRFToken', this.CSRFToken);
+		}
+		const response = await fetch(this.endpoint, {
+			method: 'POST',
+			headers: headers,
+			body: JSON.stringify({validate_field: {path: path.join('.'), value, dependencies}}),
+			signal: signal,
+		});
+		if (response.status !== 200) {
+			console.warn(`Unknown response status: ${response.status}`);
+			return [];
+		}
+		const body = await response.json();
+		return Array.isArray(body.errors) ? body.errors : [];
+	}
+
 	async prefillPartial(pk: string, path: Path) : Promise<Response|undefined> {
 		if (!this.endpoint)
 			throw new Error("<django-formset> requires attribute 'endpoint=\"server endpoint\"' for submission");
@@ -2211,6 +2290,7 @@ export class DjangoFormset {
 			const headers = new Headers();
 			headers.append('Accept', 'application/json');
 			headers.append('Content-Type', 'application/json');
+			headers.append(ERROR_FORMAT_HEADER, 'sparse');
 			if (this.CSRFToken) {
 				headers.append('X-CSRFToken', this.CSRFToken);
 			}
@@ -2228,8 +2308,7 @@ export class DjangoFormset {
 					return response;
 				case 422:
 					this.clearErrors();
-					const body = await response.clone().json();
-					this.reportErrors(body);
+					this.reportErrors(await parseErrors(response));
 					return response;
 				default:
 					console.warn(`Unknown response status: ${response.status}`);
@@ -1,4 +1,116 @@
 import template from 'lodash.template';
+import {ImageResizer} from './ImageResizer';
+
+
+type BatchEntry = {
+	file: File,
+	field: string,
+	imageHeight: number,
+	onProgress: (complete: number) => void,
+	uploadSingle: () => Promise<Object>,
+	resolve: (fileHandle: Object) => void,
+	reject: (reason?: any) => void,
+};
+
+
+class UploadBatcher {
+	// files up to this size are collected and uploaded together in one request
+	public static readonly maxFileSize = 2097152;
+	private static readonly batchers = new Map<string, UploadBatcher>();
+	private readonly endpoint: string;
+	private readonly csrfToken: string | null;
+	private queue: Array<BatchEntry> = [];
+	private timer: number | null = null;
+
+	private constructor(endpoint: string, csrfToken: string | null) {
+		this.endpoint = endpoint;
+		this.csrfToken = csrfToken;
+	}
+
+	public static get(endpoint: string, csrfToken: string | null) : UploadBatcher {
+		let batcher = UploadBatcher.batchers.get(endpoint);
+		if (!batcher) {
+			batcher = new UploadBatcher(endpoint, csrfToken);
+			UploadBatcher.batchers.set(endpoint, batcher);
+		}
+		return batcher;
+	}
+
+	public enqueue(file: File, field: string, imageHeight: number, onProgress: (complete: number) => void, uploadSingle: () => Promise<Object>) : Promise<Object> {
+		return new Promise<Object>((resolve, reject) => {
+			this.queue.push({file, field, imageHeight, onProgress, uploadSingle, resolve, reject});
+			if (this.timer === null) {
+				// collect the files chosen or dropped in quick succession
+				this.timer = window.setTimeout(() => this.flush(), 50);
+			}
+		});
+	}
+
+	private flush() {
+		const batch = this.queue;
+		this.queue = [];
+		this.timer = null;
+		if (batch.length === 1) {
+			batch[0].uploadSingle().then(batch[0].resolve).catch(batch[0].reject);
+			return;
+		}
+
+		const body = new FormData();
+		const offsets: Array<number> = [];
+		let totalSize = 0;
+		for (const entry of batch) {
+			body.append('temp_files', entry.file);
+			body.append('image_heights', entry.imageHeight.toString());
+			// the files of a batch may belong to different fields, each enforcing its own limits
+			body.append('fields', entry.field);
+			offsets.push(totalSize);
+			totalSize += entry.file.size;
+		}
+		const settled = new Set<number>();
+		let parsedLength = 0;
+
+		function updateProgress(event: ProgressEvent) {
+			// attribute the transferred bytes to the files in the order they appear in the payload
+			const loaded = event.lengthComputable ? event.loaded * totalSize / event.total : 0;
+			batch.forEach((entry, index) => {
+				const complete = entry.file.size ? (loaded - offsets[index]) / entry.file.size : 1;
+				entry.onProgress(Math.min(Math.max(complete, 0), 1));
+			});
+		}
+
+		function parseResponse() {
+			// the server streams one JSON object per line, each holding the handle for one file
+			const lines = request.responseText.substring(parsedLength).split('\n');
+			const incomplete = lines.pop()!;
+			parsedLength = request.responseText.length - incomplete.length;
+			for (const line of lines.filter(line => line.trim())) {
+				const {index, error, ...fileHandle} = JSON.parse(line);
+				settled.add(index);
+				if (error) {
+					batch[index].reject(error);
+				} else {
+					batch[index].resolve(fileHandle);
+				}
+			}
+		}
+
+		const request = new XMLHttpRequest();
+		request.upload.addEventListener('progress', updateProgress, false);
+		request.addEventListener('progress', parseResponse);
+		request.addEventListener('loadend', () => {
+			if (request.status === 200) {
+				parseResponse();
+			}
+			batch.forEach((entry, index) => settled.has(index) || entry.reject(request.status));
+		});
+		request.open('POST', this.endpoint, true);
+		if (this.csrfToken) {
+			request.setRequestHeader('X-CSRFToken', this.csrfToken);
+		}
+		request.responseType = 'text';
+		request.send(body as XMLHttpRequestBodyInit);
+	}
+}
 
 
 export class FileUploadWidget {
@@ -12,12 +124,18 @@ export class FileUploadWidget {
 	private readonly observer: MutationObserver;
 	private readonly initialData: Array<Object>;
 	private readonly maxUploadSize: number;
+	private readonly chunkSize: number;
+	private readonly directUpload: boolean;
+	private readonly imageResizer: ImageResizer | null;
 	public uploadedFiles: Array<Object>;
 
 	constructor(fieldGroup: FieldGroup, inputElement: HTMLInputElement) {
 		this.fieldGroup = fieldGroup;
 		this.inputElement = inputElement;
 		this.maxUploadSize = parseInt(this.inputElement.getAttribute('max-size') ?? '0');
+		this.chunkSize = parseInt(this.inputElement.getAttribute('chunk-size') ?? '0');
+		this.directUpload = this.inputElement.hasAttribute('direct-upload');
+		this.imageResizer = ImageResizer.fromElement(this.inputElement);
 		this.dropbox = this.fieldGroup.element.querySelector('figure.dj-dropbox') as HTMLElement;
 		if (!this.dropbox)
 			throw new Error('Element <input type="file"> requires sibling element <figure class="dj-dropbox"></figure>');
@@ -119,15 +237,32 @@ export class FileUploadWidget {
 	private async uploadFiles(files: FileList | null) : Promise<void> {
 		if (!files || files.length === 0)
 			return Promise.reject();
+		// Django currently can't handle multiple file uploads, restrict to first file
+		let file = files.item(0);
+		if (file && this.imageResizer) {
+			const resizedFile = await this.imageResizer.resize(file);
+			if (!this.inputElement.accept || this.matchesMimeType(resizedFile.type)) {
+				file = resizedFile;
+			}
+		}
 		return new Promise<void>((resolve, reject) => {
-			// Django currently can't handle multiple file uploads, restrict to first file
-			const file = files.item(0);
+			const imageHeight = this.dropbox.clientHeight;
 			if (file && (!this.maxUploadSize || file.size <= this.maxUploadSize)) {
-				this.uploadFile(file, this.dropbox.clientHeight).then(response => {
+				const upload = this.directUpload
+					? this.uploadFileDirectly(file, imageHeight)
+					: this.chunkSize && file.size > this.chunkSize
+					? this.uploadFileInChunks(file, imageHeight)
+					: file.size <= UploadBatcher.maxFileSize
+					? this.uploadFileInBatch(file, imageHeight)
+					: this.uploadFile(file, imageHeight);
+				upload.then(response => {
 					this.uploadedFiles = [response];
 					this.renderDropbox();
 					this.fieldGroup.inputted();
 					this.inputElement.dataset.fileupload = JSON.stringify(response);
+					if ((response as any).thumbnail_pending) {
+						this.pollThumbnail(response, imageHeight);
+					}
 					resolve();
 				}).catch(() => {
 					reject();
@@ -138,6 +273,16 @@ export class FileUploadWidget {
 		});
 	}
 
+	private get fieldPath() : string {
+		return [...this.fieldGroup.form.path, this.fieldGroup.name].join('.');
+	}
+
+	private get limitedEndpoint() : string {
+		// tell the server which field this file is uploaded for, so that it can enforce the widget's limits
+		const query = new URLSearchParams({field: this.fieldPath});
+		return `${this.fieldGroup.form.formset.endpoint}?${query.toString()}`;
+	}
+
 	private async uploadFile(file: File, imageHeight: number): Promise<Object> {
 		let self = this;
 
@@ -173,7 +318,7 @@ export class FileUploadWidget {
 				request.upload.addEventListener('progress', updateProgress, false);
 			}
 			request.addEventListener('loadend', transferComplete);
-			request.open('POST', this.fieldGroup.form.formset.endpoint, true);
+			request.open('POST', this.limitedEndpoint, true);
 			const csrfToken = this.fieldGroup.form.formset.CSRFToken;
 			if (csrfToken) {
 				request.setRequestHeader('X-CSRFToken', csrfToken);
@@ -183,17 +328,190 @@ export class FileUploadWidget {
 		});
 	}
 
+	private updateProgress(complete: number) {
+		if (this.progressBar) {
+			this.progressBar.style.visibility = 'visible';
+			// the remaining 3% of the progress bar are reserved for image transformation
+			this.progressBar.value = 0.97 * complete;
+		}
+	}
+
+	private finishProgress() {
+		if (this.progressBar) {
+			this.progressBar.value = 1;
+			window.setTimeout(() => this.progressBar!.style.visibility = 'hidden', 333);
+		}
+	}
+
+	private async uploadFileInBatch(file: File, imageHeight: number): Promise<Object> {
+		const formset = this.fieldGroup.form.formset;
+		const batcher = UploadBatcher.get(formset.endpoint, formset.CSRFToken);
+		this.updateProgress(0);
+		try {
+			return await batcher.enqueue(
+				file,
+				this.fieldPath,
+				imageHeight,
+				complete => this.updateProgress(complete),
+				() => this.uploadFile(file, imageHeight),
+			);
+		} finally {
+			this.finishProgress();
+		}
+	}
+
+	private async uploadFileInChunks(file: File, imageHeight: number): Promise<Object> {
+		// upload large files in chunks, so that an interrupted transfer can resume where it stopped
+		const endpoint = this.fieldGroup.form.formset.endpoint;
+		const csrfToken = this.fieldGroup.form.formset.CSRFToken;
+		const jsonHeaders = new Headers({'Content-Type': 'application/json'});
+		const chunkHeaders = new Headers({'Content-Type': 'application/octet-stream'});
+		if (csrfToken) {
+			jsonHeaders.append('X-CSRFToken', csrfToken);
+			chunkHeaders.append('X-CSRFToken', csrfToken);
+		}
+		let response = await fetch(this.limitedEndpoint, {
+			method: 'POST',
+			headers: jsonHeaders,
+			body: JSON.stringify({upload_session: {name: file.name, size: file.size, content_type: file.type}}),
+		});
+		if (response.status !== 200)
+			throw new Error(`Failed to create upload session (status=${response.status})`);
+		const uploadSession = (await response.json()).upload_session;
+		let offset = 0, retries = 0;
+		this.updateProgress(0);
+		while (offset < file.size) {
+			const query = new URLSearchParams({upload_session: uploadSession, offset: offset.toString()});
+			try {
+				response = await fetch(`${endpoint}?${query.toString()}`, {
+					method: 'PUT',
+					headers: chunkHeaders,
+					body: file.slice(offset, offset + this.chunkSize),
+				});
+				if (response.status !== 200 && response.status !== 409)
+					throw new Error(`Failed to upload chunk (status=${response.status})`);
+				// on status 409, the server tells us where to resume
+				offset = (await response.json()).offset;
+				retries = 0;
+			} catch (error) {
+				if (++retries > 5)
+					throw error;
+				await new Promise(resolve => window.setTimeout(resolve, 500 * 2 ** retries));
+				try {
+					// ask the server how many bytes it actually received
+					const status = await fetch(`${endpoint}?${new URLSearchParams({upload_session: uploadSession}).toString()}`);
+					if (status.status === 200) {
+						offset = (await status.json()).offset;
+					}
+				} catch {}
+			}
+			this.updateProgress(offset / file.size);
+		}
+		response = await fetch(endpoint, {
+			method: 'POST',
+			headers: jsonHeaders,
+			body: JSON.stringify({finalize_upload: uploadSession, image_height: imageHeight}),
+		});
+		this.finishProgress();
+		if (response.status !== 200)
+			throw new Error(`Failed to finalize upload (status=${response.status})`);
+		return response.json();
+	}
+
+	private async uploadFileDirectly(file: File, imageHeight: number): Promise<Object> {
+		// send the file to the target named by a signed upload ticket, then register it with the server
+		const endpoint = this.fieldGroup.form.formset.endpoint;
+		const csrfToken = this.fieldGroup.form.formset.CSRFToken;
+		const headers = new Headers({'Content-Type': 'application/json'});
+		if (csrfToken) {
+			headers.append('X-CSRFToken', csrfToken);
+		}
+		let response = await fetch(this.limitedEndpoint, {
+			method: 'POST',
+			headers: headers,
+			body: JSON.stringify({upload_ticket: {name: file.name, size: file.size, content_type: file.type}}),
+		});
+		if (response.status !== 200)
+			return this.uploadFile(file, imageHeight);  // the server does not offer direct uploads
+		const target = await response.json();
+		this.updateProgress(0);
+		try {
+			await new Promise<void>((resolve, reject) => {
+				const request = new XMLHttpRequest();
+				request.upload.addEventListener('progress', (event: ProgressEvent) => {
+					this.updateProgress(event.lengthComputable ? event.loaded / event.total : 0);
+				});
+				request.addEventListener('loadend', () => {
+					request.status >= 200 && request.status < 300 ? resolve() : reject(new Error(`Failed to upload file (status=${request.status})`));
+				});
+				request.open(target.method, target.upload_url, true);
+				for (const [name, value] of Object.entries(target.headers ?? {})) {
+					request.setRequestHeader(name, value as string);
+				}
+				// never disclose the CSRF token to foreign origins, such as an object store
+				if (csrfToken && new URL(target.upload_url, window.location.href).origin === window.location.origin) {
+					request.setRequestHeader('X-CSRFToken', csrfToken);
+				}
+				request.send(file);
+			});
+			response = await fetch(endpoint, {
+				method: 'POST',
+				headers: headers,
+				body: JSON.stringify({register_upload: target.upload_ticket, image_height: imageHeight}),
+			});
+		} finally {
+			this.finishProgress();
+		}
+		if (response.status !== 200)
+			throw new Error(`Failed to register upload (status=${response.status})`);
+		return response.json();
+	}
+
+	private async pollThumbnail(fileHandle: any, imageHeight: number) {
+		// the server renders the thumbnail asynchronously, poll for it using an increasing interval
+		const query = new URLSearchParams({thumbnail: fileHandle.upload_temp_name, image_height: imageHeight.toString()});
+		const headers = new Headers({'Accept': 'application/json'});
+		for (let delay = 250; delay < 10000; delay *= 1.5) {
+			await new Promise(resolve => window.setTimeout(resolve, delay));
+			if (this.uploadedFiles[0] !== fileHandle)
+				return;  // file has been removed or replaced in the meantime
+			const response = await fetch(`${this.fieldGroup.form.formset.endpoint}?${query.toString()}`, {headers});
+			if (response.status === 202)
+				continue;
+			if (response.status === 200) {
+				const body = await response.json();
+				Object.assign(fileHandle, body, {thumbnail_pending: false});
+				this.renderDropbox();
+			}
+			return;
+		}
+	}
+
 	private renderDropbox() {
 		// @ts-ignore
 		const list = this.uploadedFiles.map(this.dropboxItemTemplate);
 		if (list.length > 0) {
 			this.dropbox.innerHTML = list.join('');
+			this.addThumbnailSources(this.uploadedFiles[0]);
 			this.inputElement.dataset.fileupload = JSON.stringify(this.uploadedFiles[0]);
 		} else {
 			this.dropbox.replaceChildren(this.emptyDropboxItem);
 		}
 	}
 
+	private addThumbnailSources(fileHandle: any) {
+		// thumbnails rendered in alternative image formats are offered to the browser as <source> elements
+		const picture = this.dropbox.querySelector('picture');
+		if (!picture || !Array.isArray(fileHandle?.thumbnail_sources))
+			return;
+		for (const thumbnailSource of fileHandle.thumbnail_sources) {
+			const source = document.createElement('source');
+			source.type = thumbnailSource.type;
+			source.srcset = thumbnailSource.srcset;
+			picture.insertBefore(source, picture.querySelector('img'));
+		}
+	}
+
 	private attributesChanged(mutationsList: Array<MutationRecord>) {
 		for (const mutation of mutationsList) {
 			if (mutation.type === 'attributes') {
@@ -203,7 +521,9 @@ export class FileUploadWidget {
 				if (mutation.attributeName === 'data-fileupload') {
 					const fileUpload = this.inputElement.dataset.fileupload;
 					if (fileUpload) {
-						this.dropbox.innerHTML = this.dropboxItemTemplate(JSON.parse(fileUpload));
+						const fileHandle = JSON.parse(fileUpload);
+						this.dropbox.innerHTML = this.dropboxItemTemplate(fileHandle);
+						this.addThumbnailSources(fileHandle);
 						const button = this.dropbox.querySelector('.dj-delete-file');
 						if (button) {
 							button.addEventListener('click', this.fileRemove, {once: true});
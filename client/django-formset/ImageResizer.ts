@@ -0,0 +1,139 @@
+export type ResizeOptions = {
+	maxWidth: number,
+	maxHeight: number,
+	type: string,
+	quality: number,
+	keepOriginal: boolean,
+};
+
+type ResizeResult = {
+	blob?: Blob,
+	scaled?: boolean,
+	error?: string,
+};
+
+async function resize(file: Blob, maxWidth: number, maxHeight: number, type: string, quality: number) : Promise<ResizeResult> {
+	const bitmap = await createImageBitmap(file);
+	const scale = Math.min(1, maxWidth / bitmap.width, maxHeight / bitmap.height);
+	const width = Math.max(Math.round(bitmap.width * scale), 1), height = Math.max(Math.round(bitmap.height * scale), 1);
+	let blob: Blob | null;
+	if (typeof OffscreenCanvas !== 'undefined') {
+		const canvas = new OffscreenCanvas(width, height);
+		canvas.getContext('2d')!.drawImage(bitmap, 0, 0, width, height);
+		blob = await canvas.convertToBlob({type, quality});
+	} else {
+		const canvas = document.createElement('canvas');
+		canvas.width = width;
+		canvas.height = height;
+		canvas.getContext('2d')!.drawImage(bitmap, 0, 0, width, height);
+		blob = await new Promise<Blob | null>(resolve => canvas.toBlob(resolve, type, quality));
+	}
+	bitmap.close();
+	return blob ? {blob, scaled: scale < 1} : {error: `Can not encode image as ${type}`};
+}
+
+// The Worker runs the very same function. It is self-contained, hence its source can be passed on.
+const resizeSource = `const resize = ${resize.toString()};`;
+
+const workerSource = `${resizeSource}
+self.onmessage = async event => {
+	const {file, maxWidth, maxHeight, type, quality} = event.data;
+	try {
+		self.postMessage(await resize(file, maxWidth, maxHeight, type, quality));
+	} catch (error) {
+		self.postMessage({error: String(error)});
+	}
+};
+`;
+
+const fileExtensions: {[key: string]: string} = {
+	'image/avif': 'avif',
+	'image/jpeg': 'jpg',
+	'image/png': 'png',
+	'image/webp': 'webp',
+};
+
+
+export class ImageResizer {
+	private static worker: Worker | null | undefined;
+	private static queue: Promise<void> = Promise.resolve();
+	private readonly options: ResizeOptions;
+
+	constructor(options: ResizeOptions) {
+		this.options = options;
+	}
+
+	public static fromElement(element: HTMLInputElement) : ImageResizer | null {
+		const maxWidth = parseInt(element.getAttribute('max-image-width') ?? '0');
+		const maxHeight = parseInt(element.getAttribute('max-image-height') ?? '0');
+		if (!maxWidth && !maxHeight)
+			return null;
+		return new ImageResizer({
+			maxWidth: maxWidth || Infinity,
+			maxHeight: maxHeight || Infinity,
+			type: element.getAttribute('image-format') ?? '',
+			quality: parseFloat(element.getAttribute('image-quality') ?? '0.85'),
+			keepOriginal: element.hasAttribute('keep-original'),
+		});
+	}
+
+	private static getWorker() : Worker | null {
+		if (ImageResizer.worker === undefined) {
+			try {
+				const url = URL.createObjectURL(new Blob([workerSource], {type: 'text/javascript'}));
+				ImageResizer.worker = typeof OffscreenCanvas !== 'undefined' ? new Worker(url) : null;
+			} catch {
+				ImageResizer.worker = null;
+			}
+		}
+		return ImageResizer.worker;
+	}
+
+	private async resizeBlob(file: File, type: string) : Promise<ResizeResult> {
+		const worker = ImageResizer.getWorker();
+		const {maxWidth, maxHeight, quality} = this.options;
+		if (!worker)
+			return resize(file, maxWidth, maxHeight, type, quality);  // resize in the main thread
+		return new Promise<ResizeResult>(resolve => {
+			// the worker handles one image at a time
+			const previous = ImageResizer.queue;
+			ImageResizer.queue = previous.then(() => new Promise<void>(done => {
+				worker.onmessage = (event: MessageEvent) => {
+					resolve(event.data);
+					done();
+				};
+				worker.onerror = (event: ErrorEvent) => {
+					// for instance if a Content-Security-Policy forbids workers, resize in the main thread henceforth
+					ImageResizer.worker = null;
+					resolve({error: event.message});
+					done();
+				};
+				worker.postMessage({file, maxWidth, maxHeight, type, quality});
+			}));
+		});
+	}
+
+	public async resize(file: File) : Promise<File> {
+		// animated and vector images are never re-encoded
+		if (!file.type.startsWith('image/') || ['image/gif', 'image/svg+xml'].includes(file.type) || typeof createImageBitmap === 'undefined')
+			return file;
+		const type = this.options.type || file.type;
+		let result: ResizeResult;
+		try {
+			result = await this.resizeBlob(file, type);
+		} catch (error) {
+			result = {error: String(error)};
+		}
+		if (!result.blob) {
+			console.warn(`Failed to resize image ${file.name}: ${result.error}`);
+			return file;
+		}
+		// keep the original image, if re-encoding it reduces neither its dimensions nor its size
+		if (this.options.keepOriginal && !result.scaled && result.blob.size >= file.size)
+			return file;
+		// the browser falls back to PNG, if it can not encode the requested type
+		const extension = fileExtensions[result.blob.type] ?? 'png';
+		const name = `${file.name.replace(/\.[^.]*$/, '')}.${extension}`;
+		return new File([result.blob], name, {type: result.blob.type, lastModified: file.lastModified});
+	}
+}
@@ -610,21 +610,21 @@ interface FormDialogOptions {
 
 
 class RichtextFormDialog extends FormDialog {
-	private readonly richtext: RichtextArea;
+	private static readonly sharedDialogs = new WeakMap<HTMLDialogElement, RichtextFormDialog>();
+	private richtext!: RichtextArea;
+	private readonly induceButtons = new Map<RichtextArea, HTMLButtonElement>();
+	private extensionScript?: Promise<string>;
 	private readonly inputElements = new Array<HTMLInputElement|HTMLSelectElement|HTMLTextAreaElement>();
 	private textSelectionField: HTMLInputElement|null = null;
 	private applyAttributes: Function = () => {};
 	private revertAttributes: Function = () => {};
-	private readonly induceButton: HTMLButtonElement;
 	private readonly closeButtons = new Array<HTMLButtonElement>();
 	private applyButton: HTMLButtonElement|null = null;
 	private revertButton: HTMLButtonElement|null = null;
 	public readonly extension: string;
 
-	constructor(element: HTMLDialogElement, button: HTMLButtonElement, richtext: RichtextArea) {
+	constructor(element: HTMLDialogElement) {
 		super(element);
-		this.induceButton = button;
-		this.richtext = richtext;
 		const extension = this.formElement.getAttribute('richtext-extension');
 		if (!extension)
 			throw new Error(`${this} requires a <form richtext-extension="…">`);
@@ -655,11 +655,24 @@ class RichtextFormDialog extends FormDialog {
 		});
 	}
 
-	activate(editor: Editor) {
-		this.induceButton.classList.toggle('active', editor.isActive(this.extension));
+	// A dialog rendered once per page is shared by all rich text editors referring to it.
+	// It then acts on behalf of the editor whose button opened it.
+	public static attach(element: HTMLDialogElement, button: HTMLButtonElement, richtext: RichtextArea) : RichtextFormDialog {
+		let formDialog = RichtextFormDialog.sharedDialogs.get(element);
+		if (!formDialog) {
+			formDialog = new RichtextFormDialog(element);
+			RichtextFormDialog.sharedDialogs.set(element, formDialog);
+			formDialog.richtext = richtext;
+		}
+		formDialog.induceButtons.set(richtext, button);
+		return formDialog;
+	}
+
+	activate(richtext: RichtextArea) {
+		this.induceButtons.get(richtext)?.classList.toggle('active', richtext.editor.isActive(this.extension));
 	}
 
-	private addProseMirrorPlugins() {
+	private addProseMirrorPlugins(richtext: RichtextArea) {
 		const self = this;
 		return () => {
 			const plugin = new Plugin({
@@ -671,6 +684,7 @@ class RichtextFormDialog extends FormDialog {
 						const attributes = getAttributes(view.state, self.extension);
 						if (isEmpty(attributes))
 							return false;
+						self.richtext = richtext;
 						const viewDesc = event.target.pmViewDesc;
 						if (viewDesc) {
 							self.richtext.editor.chain().focus()
@@ -686,17 +700,20 @@ class RichtextFormDialog extends FormDialog {
 		}
 	}
 
-	public async createPlugin() : Promise<Mark|Node> {
+	public async createPlugin(richtext: RichtextArea) : Promise<Mark|Node> {
 		if (!(this.element.nextElementSibling instanceof HTMLScriptElement) || this.element.nextElementSibling.type !== 'text/plain')
 			throw new Error(`Element ${this.element} requires a <script type="text/plain">…</script>`);
 		const scriptElement = this.element.nextElementSibling as HTMLScriptElement;
 		try {
 			const plugin = scriptElement.getAttribute('tiptap-plugin');
-			const response = await fetch(scriptElement.src);
-			const extensionScript = parse(await response.text(), {startRule: 'FunctionCode'});
+			// a shared dialog fetches its extension script only once, but creates a plugin for each editor
+			if (!this.extensionScript) {
+				this.extensionScript = fetch(scriptElement.src).then(response => response.text());
+			}
+			const extensionScript = parse(await this.extensionScript, {startRule: 'FunctionCode'});
 			const parsedScript = new Function('mergeAttributes', 'markPasteRule', `return ${extensionScript}`);
 			const executedScript = parsedScript(mergeAttributes, markPasteRule);
-			executedScript.addProseMirrorPlugins = this.addProseMirrorPlugins();
+			executedScript.addProseMirrorPlugins = this.addProseMirrorPlugins(richtext);
 			switch (plugin) {
 				case 'mark':
 					this.applyAttributes = this.applyMarkAttributes;
@@ -717,11 +734,14 @@ class RichtextFormDialog extends FormDialog {
 	protected isButtonActive(path: Array<string>, action: string): boolean {
 		if (action !== 'active')
 			return false;
-		const openButton = this.richtext.formDialogs.find(
-			dialog => dialog.induceButton.name === path[0]
-		)?.induceButton;
-		if (openButton instanceof HTMLButtonElement)
-			return openButton === document.activeElement;
+		for (const [richtext, openButton] of this.induceButtons) {
+			if (openButton.name !== path[0])
+				continue;
+			if (openButton !== document.activeElement)
+				return false;
+			this.richtext = richtext;
+			return true;
+		}
 		const closeButton = this.closeButtons.find(button => isEqual(button.name, path[0]));
 		return closeButton === document.activeElement;
 	}
@@ -775,7 +795,8 @@ class RichtextFormDialog extends FormDialog {
 	}
 
 	protected closeDialog(...args: any[]) {
-		if (!isString(args[1]))
+		// a shared dialog is notified by each of its editors, but must act only once
+		if (!isString(args[1]) || !this.element.open)
 			return;
 		const editor = this.richtext.editor;
 		if (args[1] === 'apply') {
@@ -936,13 +957,14 @@ class RichtextArea {
 			this.menubarElement?.querySelectorAll('button[df-click]').forEach(button => {
 				if (!(button instanceof HTMLButtonElement))
 					return;
-				const dialogElement = this.wrapperElement?.querySelector(`dialog[df-induce-open="${button.name}:active"]`);
+				const dialogElement = this.wrapperElement?.querySelector(`dialog[df-induce-open="${button.name}:active"]`)
+					?? this.findSharedDialog(button);
 				if (dialogElement instanceof HTMLDialogElement) {
-					const formDialog = new RichtextFormDialog(dialogElement, button, this);
+					const formDialog = RichtextFormDialog.attach(dialogElement, button, this);
 					if (this.formDialogs.find(dialog => dialog.extension === formDialog.extension))
 						throw new Error(`Duplicate dialog for extension ${formDialog.extension}`);
 					this.formDialogs.push(formDialog);
-					promises.push(formDialog.createPlugin());
+					promises.push(formDialog.createPlugin(this));
 				}
 			});
 			Promise.all(promises).then(plugins => {
@@ -952,6 +974,15 @@ class RichtextArea {
 		});
 	}
 
+	private findSharedDialog(button: HTMLButtonElement) : HTMLDialogElement | null {
+		const dialogId = button.getAttribute('aria-controls');
+		if (!dialogId)
+			return null;
+		// shared dialogs are rendered after the form or collection, hence outside any sibling
+		const dialogElement = document.getElementById(dialogId);
+		return dialogElement instanceof HTMLDialogElement ? dialogElement : null;
+	}
+
 	private registerPlaceholder(extensions: Array<Extension|Mark|Node>) {
 		const placeholderText = this.textAreaElement.getAttribute('placeholder');
 		if (!placeholderText)
@@ -1019,7 +1050,7 @@ class RichtextArea {
 
 	private selectionUpdate = () => {
 		this.registeredActions.forEach(action => action.activate(this.editor));
-		this.formDialogs.forEach(dialog => dialog.activate(this.editor));
+		this.formDialogs.forEach(dialog => dialog.activate(this));
 	};
 
 	private formResetted = () => {
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_save, pre_save
+
+
+class FormsetConfig(AppConfig):
+    name = 'formset'
+    verbose_name = "django-formset"
+
+    def ready(self):
+        from formset.upload import _promote_thumbnails, _track_promotions
+
+        # move the thumbnails of uploaded files along, when saving the models they are assigned to
+        pre_save.connect(_track_promotions, dispatch_uid='formset.upload.track_promotions')
+        post_save.connect(_promote_thumbnails, dispatch_uid='formset.upload.promote_thumbnails')
@@ -1,12 +1,25 @@
 import calendar
-from datetime import date, timedelta
+import copy
+import hashlib
+from datetime import date, time, timedelta
 from enum import Enum
+from functools import lru_cache
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.http.response import HttpResponse, HttpResponseBadRequest
 from django.template.loader import get_template
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
 from django.utils.formats import date_format
 from django.utils.timezone import datetime
+from django.utils.translation import get_language, gettext_lazy as _, override
+
+from formset.codec import JsonResponse
+from formset.utils import BoundedCache
+
+CALENDAR_CACHE_SIZE = 512
+CALENDAR_MAX_AGE = 3600
 
 
 class ViewMode(Enum):
@@ -23,8 +36,121 @@ class ViewMode(Enum):
         raise KeyError(value)
 
 
+@lru_cache
+def get_weekday_names(language):
+    """
+    Return the abbreviated and the full names of the weekdays in the given language, starting
+    with Monday.
+    """
+    with override(language):
+        # the 1st of January 2001 is a Monday
+        return tuple((date_format(day, 'D'), date_format(day, 'l')) for day in map(date, [2001] * 7, [1] * 7, range(1, 8)))
+
+
+@lru_cache
+def get_month_names(language):
+    """
+    Return the names of the months in the given language, starting with January.
+    """
+    with override(language):
+        return tuple(date_format(date(2001, month, 1), 'F') for month in range(1, 13))
+
+
+_month_grids = BoundedCache(CALENDAR_CACHE_SIZE, 'FORMSET_CALENDAR_CACHE_SIZE')
+_calendar_sheets = BoundedCache(CALENDAR_CACHE_SIZE, 'FORMSET_CALENDAR_CACHE_SIZE')
+
+
+def get_month_grid(year, month, firstweekday):
+    """
+    Return the days of the weeks covering a month, as tuples of the ISO date, the day of the month
+    and the CSS classes for each day.
+    """
+    key = year, month, firstweekday
+    if (month_grid := _month_grids.get(key)) is None:
+        month_grid = tuple(
+            (monthday.isoformat(), monthday.day, 'adjacent' if monthday.month != month else '')
+            for monthday in map(lambda day: date(*day), calendar.Calendar(firstweekday).itermonthdays3(year, month))
+        )
+        _month_grids.set(key, month_grid)
+    return month_grid
+
+
+def render_calendar_sheet(renderer, view_mode, hour12=False, pure=False, interval=None):
+    """
+    Render a calendar sheet. Its HTML only depends on the date of the sheet, the first weekday,
+    the arguments and the active language, but not on the time of day. Hence each sheet is rendered
+    only once, while the least recently used sheets are evicted beyond
+    ``settings.FORMSET_CALENDAR_CACHE_SIZE``. Renderers using other templates or context render
+    each sheet, since it is unknown what they depend on.
+    """
+    if not renderer.sheet_data:
+        return renderer.render_sheet(view_mode, hour12, pure, interval)
+    sheet_date = renderer.start_datetime.date()
+    key = type(renderer), sheet_date, view_mode, renderer.firstweekday, hour12, pure, interval, get_language()
+    if (html := _calendar_sheets.get(key)) is None:
+        sheet_renderer = copy.copy(renderer)
+        sheet_renderer.start_datetime = datetime.combine(sheet_date, time.min)
+        html = sheet_renderer.render_sheet(view_mode, hour12, pure, interval)
+        _calendar_sheets.set(key, html)
+    return html
+
+
+# titles of the buttons in the controls of a calendar sheet, as used in templates `calendar/*.html`
+CALENDAR_TITLES = {
+    'prev_day': _("Previous day"),
+    'next_day': _("Next day"),
+    'prev_month': _("Previous month"),
+    'next_month': _("Next month"),
+    'prev_year': _("Previous year"),
+    'next_year': _("Next year"),
+    'prev_epoch': _("Previous epoch"),
+    'next_epoch': _("Next epoch"),
+    'narrow_weeks': _("Narrow down to weeks view"),
+    'narrow_months': _("Narrow down to months view"),
+    'extend': _("Extend period"),
+    'today': _("Today"),
+}
+
+CALENDAR_ICONS = {
+    'prev': 'formset/icons/arrow-left.svg',
+    'next': 'formset/icons/arrow-right.svg',
+    'narrow': 'formset/icons/arrow-up.svg',
+    'today': 'formset/icons/calendar-today.svg',
+}
+
+
+@lru_cache
+def get_calendar_tables(firstweekday, language):
+    """
+    Return the localized names and titles, from which the client builds calendar sheets out of the
+    data returned by :meth:`CalendarRenderer.get_sheet_data`. They only depend on the language and
+    the first day of the week, hence the client fetches them once.
+    """
+    weekday_names = get_weekday_names(language)
+    with override(language):
+        titles = {key: str(title) for key, title in CALENDAR_TITLES.items()}
+    return {
+        'language': language,
+        'weekdays': [weekday_names[weekday] for weekday in calendar.Calendar(firstweekday).iterweekdays()],
+        'months': get_month_names(language),
+        'titles': titles,
+        'icons': {key: get_template(template_name).render() for key, template_name in CALENDAR_ICONS.items()},
+    }
+
+
+@receiver(setting_changed)
+def _clear_calendar_caches(setting, **kwargs):
+    if setting == 'TEMPLATES':
+        _calendar_sheets.clear()
+        get_calendar_tables.cache_clear()
+    if setting == 'FORMSET_CALENDAR_CACHE_SIZE':
+        _month_grids.clear()
+        _calendar_sheets.clear()
+
+
 class CalendarRenderer:
     starting_view_mode = ViewMode.weeks
+    sheet_data = True
     valid_intervals = [
         None,
         timedelta(minutes=5),
@@ -36,12 +162,21 @@ class CalendarRenderer:
         timedelta(days=1),
     ]
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        customized = {'get_template_name', 'get_context_sheet', 'get_context_hours', 'get_context_weeks',
+                      'get_context_months', 'get_context_years', 'render_sheet'}.intersection(cls.__dict__)
+        if customized and 'sheet_data' not in cls.__dict__:
+            # sheets using other templates or context can not be built by the client
+            cls.sheet_data = False
+
     def __init__(self, firstweekday=None, start_datetime=None):
         self.firstweekday = settings.FIRST_DAY_OF_WEEK if firstweekday is None else firstweekday
         if isinstance(start_datetime, datetime):
             self.start_datetime = start_datetime
         else:
-            self.start_datetime = datetime.now()
+            # whole minutes, so that sheets rendered without a start date can be shared
+            self.start_datetime = datetime.now().replace(second=0, microsecond=0)
 
     def get_context_hours(self, hour12, interval):
         assert interval in self.valid_intervals, f"{interval} is not a valid interval for {self.__class__}"
@@ -100,15 +235,9 @@ class CalendarRenderer:
                 prev_month=start_datetime.replace(day=safe_day, month=start_datetime.month - 1).isoformat()[:10],
                 next_month=start_datetime.replace(day=safe_day, month=start_datetime.month + 1).isoformat()[:10],
             )
-        monthdays = []
-        for day in cal.itermonthdays3(start_datetime.year, start_datetime.month):
-            monthday = date(*day)
-            monthdays.append(monthday)
-            css_classes = []
-            if monthday.month != start_datetime.month:
-                css_classes.append('adjacent')
-            context['monthdays'].append((monthday.isoformat()[:10], monthday.day, ' '.join(css_classes)))
-        context['weekdays'] = [(date_format(day, 'D'), date_format(day, 'l')) for day in monthdays[:7]]
+        context['monthdays'] = get_month_grid(start_datetime.year, start_datetime.month, cal.firstweekday)
+        weekday_names = get_weekday_names(get_language())
+        context['weekdays'] = [weekday_names[weekday] for weekday in cal.iterweekdays()]
         return context
 
     def get_context_months(self):
@@ -120,9 +249,9 @@ class CalendarRenderer:
             prev_year=start_datetime.replace(year=start_datetime.year - 1, month=1).isoformat()[:10],
             next_year=start_datetime.replace(year=start_datetime.year + 1, month=1).isoformat()[:10],
         )
+        month_names = get_month_names(get_language())
         for m in range(1, 13):
-            month_date = date(start_datetime.year, m, 1)
-            context['months'].append((month_date.isoformat()[:10], date_format(month_date, 'F')))
+            context['months'].append((date(start_datetime.year, m, 1).isoformat(), month_names[m - 1]))
         return context
 
     def get_context_years(self):
@@ -136,21 +265,70 @@ class CalendarRenderer:
             next_epoch=start_datetime.replace(year=start_epoch + 20, month=1).isoformat()[:10],
         )
         for y in range(start_epoch, start_epoch + 20):
-            year_date = date(y, 1, 1)
-            context['years'].append((year_date.isoformat()[:10], date_format(year_date, 'Y')))
+            context['years'].append((date(y, 1, 1).isoformat(), f'{y:04d}'))
         return context
 
+    def get_context_sheet(self, view_mode, hour12=False, interval=None):
+        if view_mode == ViewMode.hours:
+            return self.get_context_hours(hour12, interval)
+        if view_mode == ViewMode.years:
+            return self.get_context_years()
+        if view_mode == ViewMode.months:
+            return self.get_context_months()
+        return self.get_context_weeks()
+
     def get_context(self, hour12=False, interval=None):
+        """
+        Return the context of the sheet for the starting view mode. Sheets for the other view modes
+        are fetched by the client on demand.
+        """
         context = {
             'startdate': self.start_datetime,
             'template': self.get_template_name(self.starting_view_mode),
         }
-        context.update(self.get_context_hours(hour12, interval))
-        context.update(self.get_context_weeks())
-        context.update(self.get_context_months())
-        context.update(self.get_context_years())
+        context.update(self.get_context_sheet(self.starting_view_mode, hour12, interval))
         return context
 
+    def get_sheet_data(self, view_mode, hour12=False, interval=None):
+        """
+        Return the data of a calendar sheet as an alternative to rendering it. The client builds the
+        sheet from this data, using the localized names returned by :func:`get_calendar_tables`.
+        """
+        context = self.get_context_sheet(view_mode, hour12, interval)
+        data = {
+            'mode': view_mode.value,
+            'date': self.start_datetime.isoformat(),
+        }
+        if view_mode == ViewMode.hours:
+            data.update(
+                prev=context['prev_day'],
+                next=context['next_day'],
+                cells=[
+                    (hour[0], [minute[0] for minute in hour[2]] if hour[2] else None)
+                    for shift in context['shifts'] for hour in shift
+                ],
+            )
+        elif view_mode == ViewMode.years:
+            data.update(
+                prev=context['prev_epoch'],
+                next=context['next_epoch'],
+                cells=[year[0] for year in context['years']],
+            )
+        elif view_mode == ViewMode.months:
+            data.update(
+                prev=context['prev_year'],
+                next=context['next_year'],
+                cells=[month[0] for month in context['months']],
+            )
+        else:
+            # flag 1 marks days of adjacent months
+            data.update(
+                prev=context['prev_month'],
+                next=context['next_month'],
+                cells=[(monthday[0], int(bool(monthday[2]))) for monthday in context['monthdays']],
+            )
+        return data
+
     def get_template_name(self, view_mode):
         return {
             ViewMode.hours: 'calendar/hours.html',
@@ -160,17 +338,13 @@ class CalendarRenderer:
         }[view_mode]
 
     def render(self, view_mode, hour12=False, pure=False, interval=None):
+        return render_calendar_sheet(self, view_mode, hour12, pure, interval)
+
+    def render_sheet(self, view_mode, hour12=False, pure=False, interval=None):
         context = {
             'startdate': self.start_datetime,
         }
-        if view_mode == ViewMode.hours:
-            context.update(self.get_context_hours(hour12, interval))
-        elif view_mode == ViewMode.years:
-            context.update(self.get_context_years())
-        elif view_mode == ViewMode.months:
-            context.update(self.get_context_months())
-        else:
-            context.update(self.get_context_weeks())
+        context.update(self.get_context_sheet(view_mode, hour12, interval))
         template = get_template(self.get_template_name(view_mode))
         if pure:
             context.update(template=template)
@@ -181,22 +355,51 @@ class CalendarRenderer:
 class CalendarResponseMixin:
     """
     To be added to a view class in order to build the responses when iterating over months.
+
+    Calendar sheets are returned as rendered HTML. If the query contains ``format=json``, they are
+    returned as data instead, and the query ``tables`` returns the localized names required to build
+    sheets from that data.
     """
     calendar_renderer_class = CalendarRenderer
 
     def get(self, request, **kwargs):
+        if 'calendar' in request.GET and request.GET.get('format') == 'json':
+            if not self.calendar_renderer_class.sheet_data:
+                return HttpResponseBadRequest("Calendar sheets can not be returned as data")
+            if 'tables' in request.GET:
+                firstweekday = self.calendar_renderer_class().firstweekday
+                return self.get_calendar_response(request, JsonResponse(get_calendar_tables(firstweekday, get_language())))
+            try:
+                cal, view_mode, hour12, pure, interval = self.parse_calendar_query(request)
+            except (KeyError, TypeError, ValueError):
+                return HttpResponseBadRequest("Invalid parameter 'calendar'")
+            return self.get_calendar_response(request, JsonResponse(cal.get_sheet_data(view_mode, hour12, interval)))
         if request.accepts('text/html') and 'calendar' in request.GET:
             try:
-                start_datetime = datetime.fromisoformat(request.GET.get('date'))
-                hour12 = 'hour12' in request.GET
-                pure = 'pure' in request.GET
-                view_mode = ViewMode.frommode(request.GET.get('mode'))
-                if 'interval' in request.GET:
-                    interval = timedelta(minutes=int(request.GET.get('interval')))
-                else:
-                    interval = None
-            except (TypeError, ValueError):
+                cal, view_mode, hour12, pure, interval = self.parse_calendar_query(request)
+            except (KeyError, TypeError, ValueError):
                 return HttpResponseBadRequest("Invalid parameter 'calendar'")
-            cal = self.calendar_renderer_class(start_datetime=start_datetime)
-            return HttpResponse(cal.render(view_mode, hour12, pure, interval))
+            return self.get_calendar_response(request, HttpResponse(cal.render(view_mode, hour12, pure, interval)))
         return super().get(request, **kwargs)
+
+    def parse_calendar_query(self, request):
+        start_datetime = datetime.fromisoformat(request.GET.get('date'))
+        hour12 = 'hour12' in request.GET
+        pure = 'pure' in request.GET
+        view_mode = ViewMode.frommode(request.GET.get('mode'))
+        if 'interval' in request.GET:
+            interval = timedelta(minutes=int(request.GET.get('interval')))
+        else:
+            interval = None
+        return self.calendar_renderer_class(start_datetime=start_datetime), view_mode, hour12, pure, interval
+
+    def get_calendar_response(self, request, response):
+        # a calendar sheet never changes for the same query, hence let the browser cache it
+        etag = f'"{hashlib.md5(response.content).hexdigest()}"'
+        response = get_conditional_response(request, etag=etag) or response
+        response.headers['ETag'] = etag
+        max_age = getattr(settings, 'FORMSET_CALENDAR_MAX_AGE', CALENDAR_MAX_AGE)
+        patch_cache_control(response, private=True, max_age=max_age)
+        # the language may also be chosen through a cookie
+        patch_vary_headers(response, ['Accept-Language', 'Cookie'])
+        return response
@@ -0,0 +1,199 @@
+import json
+import re
+from collections import UserList
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import BadRequest, ImproperlyConfigured, RequestDataTooBig, SuspiciousOperation
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http.response import HttpResponse
+from django.utils.module_loading import import_string
+
+MAX_BODY_DEPTH = 100
+
+_json_string_pattern = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_json_bracket_pattern = re.compile(rb'[\[\]{}]')
+_django_encoder = DjangoJSONEncoder()
+
+
+def to_builtin(obj):
+    """
+    Convert objects which can not be serialized natively by the fast JSON libraries, such as
+    lazy translation strings, `ErrorList` and `ErrorDict`, into their builtin counterparts.
+    """
+    if isinstance(obj, UserList):
+        # ErrorList inherits from UserList and list, but stores its items in attribute `data`
+        return list(obj)
+    if isinstance(obj, dict):
+        return dict(obj)
+    if isinstance(obj, list):
+        return list(obj)
+    if isinstance(obj, str):
+        # `str(obj)` would return the subclass itself, for instance a `SafeString`
+        return str.__str__(obj)
+    return _django_encoder.default(obj)
+
+
+class JSONCodec:
+    """
+    Codec using the JSON library from Python's standard library. This is the default.
+    """
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj, cls=DjangoJSONEncoder, **kwargs):
+        return json.dumps(obj, cls=cls, **kwargs).encode()
+
+
+class OrjsonCodec:
+    """
+    Codec using the `orjson <https://github.com/ijl/orjson>`_ library.
+    """
+    def __init__(self):
+        import orjson
+
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+        # subclasses of builtin types and datetime objects are handed over to `to_builtin()`, so that
+        # errors and dates are serialized exactly as with the standard library
+        self._option = orjson.OPT_PASSTHROUGH_SUBCLASS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def loads(self, data):
+        return self._loads(data)
+
+    def dumps(self, obj):
+        return self._dumps(obj, default=to_builtin, option=self._option)
+
+
+class MsgspecCodec:
+    """
+    Codec using the `msgspec <https://jcristharif.com/msgspec/>`_ library.
+    """
+    def __init__(self):
+        import msgspec
+
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder(enc_hook=to_builtin)
+        self._decode_error = msgspec.DecodeError
+
+    def loads(self, data):
+        try:
+            return self._decoder.decode(data)
+        except self._decode_error as error:
+            raise ValueError(str(error)) from error
+
+    def dumps(self, obj):
+        return self._encoder.encode(self._unwrap_lists(obj))
+
+    def _unwrap_lists(self, obj):
+        # msgspec serializes subclasses of list natively and hence would miss the items of an `ErrorList`
+        if isinstance(obj, dict):
+            return {key: self._unwrap_lists(value) for key, value in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [self._unwrap_lists(value) for value in obj]
+        return obj
+
+
+codec_aliases = {
+    'json': JSONCodec,
+    'orjson': OrjsonCodec,
+    'msgspec': MsgspecCodec,
+}
+
+
+@lru_cache
+def load_codec(name):
+    if name == 'auto':
+        for codec_class in (OrjsonCodec, MsgspecCodec):
+            try:
+                return codec_class()
+            except ImportError:
+                continue
+        return JSONCodec()
+    try:
+        codec_class = codec_aliases[name] if name in codec_aliases else import_string(name)
+        return codec_class()
+    except ImportError as error:
+        raise ImproperlyConfigured(f"Can not load JSON codec '{name}' as set in FORMSET_JSON_CODEC: {error}")
+
+
+def get_codec():
+    """
+    Return the JSON codec as configured by ``settings.FORMSET_JSON_CODEC``. This can be one of
+    ``'json'`` (default), ``'orjson'``, ``'msgspec'``, ``'auto'`` (uses the fastest installed
+    library) or the dotted path to a class implementing the methods ``loads()`` and ``dumps()``.
+    """
+    return load_codec(getattr(settings, 'FORMSET_JSON_CODEC', 'json'))
+
+
+def check_body_size(request):
+    """
+    Reject payloads exceeding ``settings.FORMSET_MAX_BODY_SIZE`` before reading them.
+    """
+    max_size = getattr(settings, 'FORMSET_MAX_BODY_SIZE', None)
+    if max_size is None:
+        return
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except (TypeError, ValueError):
+        content_length = 0
+    if content_length > max_size:
+        raise RequestDataTooBig("Submitted payload exceeds settings.FORMSET_MAX_BODY_SIZE.")
+
+
+def check_nesting_depth(raw, max_depth):
+    """
+    Reject JSON payloads nested deeper than ``max_depth`` without parsing them.
+    """
+    if raw.count(b'[') + raw.count(b'{') <= max_depth:
+        return
+    depth = 0
+    for match in _json_bracket_pattern.finditer(_json_string_pattern.sub(b'""', raw)):
+        if match.group() in b'[{':
+            depth += 1
+            if depth > max_depth:
+                raise SuspiciousOperation("Submitted payload exceeds settings.FORMSET_MAX_BODY_DEPTH.")
+        else:
+            depth -= 1
+
+
+def parse_request_body(request):
+    """
+    Decode the JSON body of a submission. The parsed body is cached on the request object, so that
+    all view mixins share the same decoded payload.
+    """
+    try:
+        return request._formset_body
+    except AttributeError:
+        pass
+    body = None
+    if request.content_type == 'application/json':
+        check_body_size(request)
+        raw = request.body
+        max_size = getattr(settings, 'FORMSET_MAX_BODY_SIZE', None)
+        if max_size is not None and len(raw) > max_size:
+            raise RequestDataTooBig("Submitted payload exceeds settings.FORMSET_MAX_BODY_SIZE.")
+        check_nesting_depth(raw, getattr(settings, 'FORMSET_MAX_BODY_DEPTH', MAX_BODY_DEPTH))
+        try:
+            body = get_codec().loads(raw)
+        except ValueError:
+            raise BadRequest("Submitted payload is not valid JSON.")
+    request._formset_body = body
+    return body
+
+
+class JsonResponse(HttpResponse):
+    """
+    Drop-in replacement for Django's ``JsonResponse`` which encodes its payload using the
+    configured JSON codec. If ``encoder`` or ``json_dumps_params`` are given, the payload is
+    encoded by Python's standard library instead, since only that one accepts these arguments.
+    """
+    def __init__(self, data, encoder=None, safe=True, json_dumps_params=None, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError("In order to allow non-dict objects to be serialized set the safe parameter to False.")
+        kwargs.setdefault('content_type', 'application/json')
+        if encoder is None and json_dumps_params is None:
+            content = get_codec().dumps(data)
+        else:
+            content = JSONCodec().dumps(data, cls=encoder or DjangoJSONEncoder, **(json_dumps_params or {}))
+        super().__init__(content=content, **kwargs)
@@ -9,17 +9,33 @@ from django.forms.models import BaseModelForm, construct_instance, model_to_dict
 from django.forms.utils import ErrorDict, ErrorList, RenderableMixin
 from django.forms.widgets import MediaDefiningClass
 from django.utils.datastructures import MultiValueDict
+from django.utils.html import format_html_join
 from django.utils.text import get_text_list
 from django.utils.translation import gettext_lazy
 
 from formset.exceptions import FormCollectionError
 from formset.fields import Activator
 from formset.renderers.default import FormRenderer
-from formset.utils import MARKED_FOR_REMOVAL, FormMixin, FormsetErrorList, HolderMixin, RenderableDetachedFieldMixin
+from formset.utils import (
+    MARKED_FOR_REMOVAL, FormMixin, FormsetErrorList, HolderMixin, RenderableDetachedFieldMixin, get_render_scope,
+    render_scope,
+)
 
 COLLECTION_ERRORS = '_collection_errors_'
 
 
+def is_marked_for_removal(sibling_data):
+    """
+    Return True if the raw data of a sibling contains a form which has been marked for removal.
+    """
+    if not isinstance(sibling_data, dict):
+        return False
+    return any(
+        isinstance(value, (dict, list)) and MARKED_FOR_REMOVAL in value
+        for value in sibling_data.values()
+    )
+
+
 class FormCollectionMeta(MediaDefiningClass):
     """
     Collect Forms declared on the base classes.
@@ -90,6 +106,8 @@ class BaseFormCollection(HolderMixin, RenderableMixin):
                  help_text=None):
         self.data = MultiValueDict() if data is None else data
         self.initial = initial
+        self.structure_validated = False
+        self.structure_rejected = False
         if auto_id is not None:
             self.auto_id = auto_id
         if prefix is not None:
@@ -240,10 +258,20 @@ class BaseFormCollection(HolderMixin, RenderableMixin):
 
         if self._errors is None:
             self.full_clean()
-            self.validate_siblings_count()
+            if not self.structure_rejected:
+                # otherwise the structural error would be replaced by a misleading one
+                self.validate_siblings_count()
         return is_valid(self._errors)
 
     def full_clean(self):
+        if not self.structure_validated:
+            self.structure_validated = True
+            if (errors := self.validate_structure(self.data)) is not None:
+                # reject malformed data before instantiating any form
+                self.valid_holders = [] if self.has_many else {}
+                self._errors = errors
+                self.structure_rejected = True
+                return
         if self.has_many:
             self.valid_holders = []
             self._errors = ErrorList()
@@ -262,6 +290,7 @@ class BaseFormCollection(HolderMixin, RenderableMixin):
                             instance=instance,
                             ignore_marked_for_removal=self.ignore_marked_for_removal,
                         )
+                        holder.structure_validated = True
                         if MARKED_FOR_REMOVAL in holder.data:
                             if holder.ignore_marked_for_removal:
                                 break
@@ -295,6 +324,7 @@ class BaseFormCollection(HolderMixin, RenderableMixin):
                         partial=self.partial,
                         ignore_marked_for_removal=self.ignore_marked_for_removal,
                     )
+                    holder.structure_validated = True
                     if holder.is_valid():
                         self.valid_holders[name] = holder
                     self._errors[name] = holder._errors
@@ -302,6 +332,61 @@ class BaseFormCollection(HolderMixin, RenderableMixin):
                     # can only happen, if client bypasses browser control
                     self._errors[name] = {NON_FIELD_ERRORS: ["Form data is missing."]}
 
+    def validate_structure(self, data):
+        """
+        Check the raw submitted data against the declared structure of this collection, before
+        any form is instantiated. This rejects data containing more siblings than allowed by
+        `max_siblings`, nesting not matching the declared forms and collections, or unknown keys.
+        Return the errors in the same shape as produced by `full_clean()` or None if the data is
+        well-formed. Nested collections are checked recursively.
+        """
+        if self.has_many:
+            collection_name = self.legend if self.legend else self.__class__.__name__
+            if not isinstance(data, list):
+                msg = gettext_lazy("Submitted data for “{collection_name}” is malformed.")
+                return ErrorList([{COLLECTION_ERRORS: [msg.format(collection_name=collection_name)]}])
+            siblings = [sibling for sibling in data if sibling is not None]
+            if self.max_siblings:
+                num_siblings = sum(not is_marked_for_removal(sibling) for sibling in siblings)
+                if num_siblings > self.max_siblings:
+                    msg = gettext_lazy("Too many entries in “{collection_name}”, please remove one.")
+                    return ErrorList([{COLLECTION_ERRORS: [msg.format(collection_name=collection_name)]}])
+            for sibling in siblings:
+                if self._validate_holders_structure(sibling) is not None:
+                    msg = gettext_lazy("Submitted data for “{collection_name}” is malformed.")
+                    return ErrorList([{COLLECTION_ERRORS: [msg.format(collection_name=collection_name)]}])
+            return None
+        return self._validate_holders_structure(data)
+
+    def _validate_holders_structure(self, data):
+        errors, is_malformed = ErrorDict(), False
+        if not isinstance(data, dict):
+            if self.partial:
+                return None
+            for name, declared_holder in self.declared_holders.items():
+                if isinstance(declared_holder, (BaseForm, BaseFormCollection)):
+                    errors[name] = {NON_FIELD_ERRORS: ["Form data is missing."]}
+            return errors
+        for name, value in data.items():
+            declared_holder = self.declared_holders.get(name)
+            if declared_holder is None:
+                msg = gettext_lazy("Submitted data contains unknown key “{key}”.")
+                errors.setdefault(NON_FIELD_ERRORS, []).append(msg.format(key=name))
+                is_malformed = True
+            elif isinstance(declared_holder, BaseFormCollection):
+                if (holder_errors := declared_holder.validate_structure(value)) is None:
+                    errors[name] = ErrorList() if declared_holder.has_many else ErrorDict()
+                else:
+                    errors[name] = holder_errors
+                    is_malformed = True
+            elif isinstance(declared_holder, BaseForm):
+                if isinstance(value, dict):
+                    errors[name] = ErrorDict()
+                else:
+                    errors[name] = {NON_FIELD_ERRORS: ["Form data is malformed."]}
+                    is_malformed = True
+        return errors if is_malformed else None
+
     def validate_unique(self):
         unique_fields = {self.related_field} if getattr(self, 'related_field', None) else set()
         all_unique_checks = set()
@@ -403,7 +488,12 @@ class BaseFormCollection(HolderMixin, RenderableMixin):
     def render(self, template_name=None, context=None, renderer=None):
         if not (renderer or self.renderer):
             renderer = FormRenderer()
-        return super().render(template_name, context, renderer)
+        if get_render_scope() is not None:
+            return super().render(template_name, context, renderer)
+        with render_scope(f'id_{self.prefix or type(self).__name__.lower()}') as scope:
+            html = super().render(template_name, context, renderer)
+        # elements shared by all siblings, such as rich text dialogs, must survive their removal
+        return html + format_html_join('', '{}', ([snippet] for snippet in scope['epilogue']))
 
     def model_to_dict(self, instance):
         """
@@ -508,3 +598,19 @@ class FormCollection(BaseFormCollection, metaclass=FormCollectionMeta):
         else:
             key, path = field_path.split('.', 1)
         return self.declared_holders[key].get_field(path)
+
+    def get_form(self, field_path):
+        """
+        Return the declared form containing the field addressed by the given path.
+        """
+        if self.has_many:
+            index, key, path = field_path.split('.', 2)
+            int(index)  # raises ValueError if index is not an integer
+        else:
+            key, path = field_path.split('.', 1)
+        holder = self.declared_holders[key]
+        if isinstance(holder, BaseFormCollection):
+            return holder.get_form(path)
+        if not isinstance(holder, BaseForm) or path not in holder.fields:
+            raise KeyError(f"No such field: {field_path}")
+        return holder
@@ -0,0 +1,43 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from formset.richtext.extract import iter_queryset_extracts
+
+
+class Command(BaseCommand):
+    help = "Store the plain text of the rich text in a model field into another field of that model, for instance to index it for searching."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'field',
+            help="The rich text field to extract, given as app_label.ModelName.field_name.",
+        )
+        parser.add_argument(
+            'index_field',
+            help="The field of the same model, into which the plain text is stored.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Number of rows fetched from and written to the database at once (default: 500).",
+        )
+
+    def handle(self, field, index_field, batch_size, verbosity, **options):
+        try:
+            app_label, model_name, field_name = field.split('.')
+            model = apps.get_model(app_label, model_name)
+            model._meta.get_field(field_name)
+            model._meta.get_field(index_field)
+        except (ValueError, LookupError) as error:
+            raise CommandError(f"Invalid rich text field '{field}' or index field '{index_field}': {error}")
+        batch, updated = [], 0
+        for pk, extract in iter_queryset_extracts(model._default_manager.all(), field_name, chunk_size=batch_size):
+            batch.append(model(pk=pk, **{index_field: extract.text}))
+            if len(batch) >= batch_size:
+                updated += model._default_manager.bulk_update(batch, [index_field])
+                batch.clear()
+        if batch:
+            updated += model._default_manager.bulk_update(batch, [index_field])
+        if verbosity > 0:
+            self.stdout.write(f"Indexed {updated} documents of {field} into {index_field}.")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from formset.upload import sweep_temporary_uploads
+
+
+class Command(BaseCommand):
+    help = "Remove abandoned files from the folder keeping temporary uploads."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age',
+            type=int,
+            help="Remove uploads not referenced for this number of seconds (default: settings.FORMSET_UPLOAD_MAX_AGE).",
+        )
+        parser.add_argument(
+            '--quota',
+            type=int,
+            help="Remove the oldest uploads until they occupy less than this number of bytes (default: settings.FORMSET_UPLOAD_QUOTA).",
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only report what would be removed.",
+        )
+
+    def handle(self, max_age, quota, dry_run, verbosity, **options):
+        removed_files, reclaimed_bytes = sweep_temporary_uploads(max_age=max_age, quota=quota, dry_run=dry_run)
+        if verbosity > 0:
+            verb = "Would remove" if dry_run else "Removed"
+            self.stdout.write(f"{verb} {removed_files} files, reclaiming {reclaimed_bytes} bytes.")
@@ -0,0 +1,45 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from formset.richtext.renderer import DEFAULT_DOC_TEMPLATE, render_richtext
+
+
+class Command(BaseCommand):
+    help = "Render the rich text stored in a model field into the cache used by template tag render_richtext."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'field',
+            help="The rich text field to render, given as app_label.ModelName.field_name.",
+        )
+        parser.add_argument(
+            '--doc-template',
+            default=DEFAULT_DOC_TEMPLATE,
+            help=f"The template used to render the documents (default: {DEFAULT_DOC_TEMPLATE}).",
+        )
+        parser.add_argument(
+            '--framework',
+            default='default',
+            help="The CSS framework used to render the documents (default: default).",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Number of rows fetched from the database at once (default: 500).",
+        )
+
+    def handle(self, field, doc_template, framework, batch_size, verbosity, **options):
+        try:
+            app_label, model_name, field_name = field.split('.')
+            model = apps.get_model(app_label, model_name)
+            model._meta.get_field(field_name)
+        except (ValueError, LookupError) as error:
+            raise CommandError(f"Invalid rich text field '{field}': {error}")
+        queryset = model._default_manager.exclude(**{f'{field_name}__isnull': True})
+        rendered = 0
+        for document in queryset.values_list(field_name, flat=True).iterator(chunk_size=batch_size):
+            render_richtext(document, doc_template, framework, cached=True)
+            rendered += 1
+        if verbosity > 0:
+            self.stdout.write(f"Rendered {rendered} documents of {field}.")
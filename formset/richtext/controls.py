@@ -11,6 +11,9 @@ from formset.dialog import DialogForm
 class ControlElement:
     extension = None
     template_name = 'formset/richtext/control.html'
+    node_types = ()
+    mark_types = ()
+    document_attributes = {}
 
     def get_template(self, renderer):
         templates = [
@@ -43,6 +46,7 @@ class Heading(ControlElement):
     extension = 'heading'
     label = _("Heading")
     levels = [1, 2, 3, 4, 5, 6]
+    node_types = ('heading',)
     template_name = 'formset/richtext/heading.html'
 
     def __init__(self, levels=None):
@@ -99,6 +103,7 @@ class TextAlign(ControlElement):
 class TextColor(ControlElement):
     extension = 'textColor'
     label = _("Text Color")
+    mark_types = ('textColor',)
     template_name = 'formset/richtext/color.html'
     class_based = None
 
@@ -158,46 +163,55 @@ class TextMargin(ControlElement):
 class Bold(ControlElement):
     extension = 'bold'
     label = _("Bold")
+    mark_types = ('bold',)
 
 
 class Blockquote(ControlElement):
     extension = 'blockquote'
     label = _("Blockquote")
+    node_types = ('blockquote',)
 
 
 class CodeBlock(ControlElement):
     extension = 'codeBlock'
     label = _("Code Block")
+    node_types = ('codeBlock',)
 
 
 class HardBreak(ControlElement):
     extension = 'hardBreak'
     label = _("Hard Break")
+    node_types = ('hardBreak',)
 
 
 class Italic(ControlElement):
     extension = 'italic'
     label = _("Italic")
+    mark_types = ('italic',)
 
 
 class Underline(ControlElement):
     extension = 'underline'
     label = _("Underline")
+    mark_types = ('underline',)
 
 
 class BulletList(ControlElement):
     extension = 'bulletList'
     label = _("Bullet List")
+    node_types = ('bulletList', 'listItem')
 
 
 class OrderedList(ControlElement):
     extension = 'orderedList'
     label = _("Ordered List")
+    node_types = ('orderedList', 'listItem')
 
 
 class HorizontalRule(ControlElement):
     extension = 'horizontalRule'
     label = _("Horizontal Rule")
+    node_types = ('horizontalRule',)
 
 
 class ClearFormat(ControlElement):
@@ -208,16 +222,19 @@ class ClearFormat(ControlElement):
 class Strike(ControlElement):
     extension = 'strike'
     label = _("Strike")
+    mark_types = ('strike',)
 
 
 class Subscript(ControlElement):
     extension = 'subscript'
     label = _("Subscript")
+    mark_types = ('subscript',)
 
 
 class Superscript(ControlElement):
     extension = 'superscript'
     label = _("Superscript")
+    mark_types = ('superscript',)
 
 
 class Undo(ControlElement):
@@ -246,6 +263,28 @@ class DialogControl(ControlElement):
             icon = 'formset/icons/activator.svg'
         return icon
 
+    @property
+    def node_types(self):
+        return (self.dialog_form.extension,) if getattr(self.dialog_form, 'plugin_type', None) == 'node' else ()
+
+    @property
+    def mark_types(self):
+        return (self.dialog_form.extension,) if getattr(self.dialog_form, 'plugin_type', None) == 'mark' else ()
+
+    @property
+    def document_attributes(self):
+        """
+        Map the node edited by this dialog onto the control elements of those attributes, which
+        themselves are rich text documents, such as the content of a footnote.
+        """
+        from formset.richtext.widgets import RichTextarea
+
+        attributes = {
+            name: field.widget.control_elements for name, field in self.dialog_form.fields.items()
+            if isinstance(field.widget, RichTextarea)
+        }
+        return {self.dialog_form.extension: attributes} if attributes else {}
+
     def get_context(self):
         return {
             'extension': self.dialog_form.extension,
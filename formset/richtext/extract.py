@@ -0,0 +1,110 @@
+from collections import namedtuple
+
+from formset.richtext.renderer import parse_document
+
+TextRun = namedtuple('TextRun', ['text', 'path', 'marks'])
+TextRun.__doc__ = """
+A run of text in a rich text document. Its ``path`` is a tuple of ``(node_type, index)`` pairs,
+leading from the document root to the node containing this text. Its ``marks`` are those of the
+text node in TipTap JSON.
+"""
+
+RichtextExtract = namedtuple('RichtextExtract', ['text', 'word_count', 'links', 'footnotes'])
+RichtextExtract.__doc__ = """
+The plain text of a rich text document without its footnotes, the number of words in that text,
+the targets of all its links and the plain text of each of its footnotes.
+"""
+
+
+def iter_text_runs(data):
+    """
+    Iterate over the text of a rich text document, given as dict or as JSON string, in document
+    order and without rendering it. Hard breaks are yielded as a newline. The content of each
+    footnote is yielded where it is referenced, with the footnote node being part of its path.
+    """
+    stack = [(parse_document(data), ())]
+    while stack:
+        node, path = stack.pop()
+        node_type = node.get('type')
+        if node_type == 'text':
+            if isinstance(text := node.get('text'), str):
+                yield TextRun(text, path, tuple(node.get('marks') or ()))
+            continue
+        if node_type == 'hardBreak':
+            yield TextRun('\n', path, ())
+            continue
+        if node_type == 'footnote' and isinstance(attrs := node.get('attrs'), dict):
+            children = parse_document(attrs.get('content')).get('content')
+        else:
+            children = node.get('content')
+        if not isinstance(children, list):
+            continue
+        # push in reverse order, so that children are popped in document order
+        for index in range(len(children) - 1, -1, -1):
+            child = children[index]
+            if not isinstance(child, dict):
+                continue
+            child_type = child.get('type')
+            if child_type in ('text', 'hardBreak'):
+                stack.append((child, path))
+            else:
+                stack.append((child, path + ((child_type, index),)))
+
+
+def join_text_runs(text_runs, block_separator='\n'):
+    """
+    Join text runs into plain text, where runs belonging to different nodes are separated by
+    ``block_separator``.
+    """
+    parts, current_path = [], None
+    for text_run in text_runs:
+        if parts and text_run.path != current_path:
+            parts.append(block_separator)
+        current_path = text_run.path
+        parts.append(text_run.text)
+    return ''.join(parts)
+
+
+def extract_text(data, block_separator='\n'):
+    """
+    Return the plain text of a rich text document, given as dict or as JSON string, including
+    its footnotes.
+    """
+    return join_text_runs(iter_text_runs(data), block_separator)
+
+
+def extract_richtext(data):
+    """
+    Extract the plain text, the word count, the links and the footnotes of a rich text document,
+    given as dict or as JSON string, in a single pass over its text.
+    """
+    text_runs, links, footnotes = [], {}, {}
+    for text_run in iter_text_runs(data):
+        for level, (node_type, _) in enumerate(text_run.path):
+            if node_type == 'footnote':
+                footnotes.setdefault(text_run.path[:level + 1], []).append(text_run)
+                break
+        else:
+            text_runs.append(text_run)
+        for mark in text_run.marks:
+            if isinstance(mark, dict) and isinstance(attrs := mark.get('attrs'), dict):
+                if isinstance(href := attrs.get('href'), str) and href:
+                    links[href] = None
+    text = join_text_runs(text_runs)
+    return RichtextExtract(
+        text=text,
+        word_count=len(text.split()),
+        links=list(links),
+        footnotes=[join_text_runs(runs) for runs in footnotes.values()],
+    )
+
+
+def iter_queryset_extracts(queryset, field_name, chunk_size=500):
+    """
+    Iterate over the rich text stored in ``field_name`` of the given queryset, yielding tuples of
+    the primary key and the ``RichtextExtract`` for each row. Rows are fetched from the database in
+    chunks of ``chunk_size``, so that memory consumption remains bounded.
+    """
+    rows = queryset.values_list('pk', field_name).iterator(chunk_size=chunk_size)
+    for pk, data in rows:
+        yield pk, extract_richtext(data)
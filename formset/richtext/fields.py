@@ -1,10 +1,68 @@
+from django.db.models.fields import Field
 from django.db.models.fields.json import JSONField
+from django.forms.fields import JSONField as JSONFormField
 
+from formset.richtext.compression import compress_richtext, decompress_richtext
 from formset.richtext.widgets import RichTextarea
 
 
+class RichTextFormField(JSONFormField):
+    """
+    Form field accepting only documents which can be edited by its ``RichTextarea`` widget. Unknown
+    nodes and marks are stripped and oversized documents are rejected, before being stored.
+    """
+    def to_python(self, value):
+        value = super().to_python(value)
+        if isinstance(value, dict) and isinstance(self.widget, RichTextarea):
+            value = self.widget.schema.clean(value)
+        return value
+
+
 class RichTextField(JSONField):
+    """
+    Model field storing rich text documents as JSON. With ``compressed=True``, documents are
+    stored compressed in a binary column instead, and decompressed transparently when loaded.
+    Such a field can not be queried by the keys of its documents.
+    """
+    def __init__(self, *args, compressed=False, **kwargs):
+        self.compressed = compressed
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.compressed:
+            kwargs['compressed'] = True
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return 'BinaryField' if self.compressed else super().get_internal_type()
+
+    def _check_supported(self, databases):
+        if self.compressed:
+            return []  # stored in a binary column, which is supported by all databases
+        return super()._check_supported(databases)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not self.compressed:
+            return super().get_db_prep_value(value, connection, prepared)
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is None or hasattr(value, 'as_sql'):
+            return value
+        return connection.Database.Binary(compress_richtext(value, self.encoder))
+
+    def from_db_value(self, value, expression, connection):
+        if not self.compressed or value is None:
+            return super().from_db_value(value, expression, connection)
+        return decompress_richtext(value, self.decoder)
+
+    def get_transform(self, name):
+        if self.compressed:
+            return Field.get_transform(self, name)
+        return super().get_transform(name)
+
     def formfield(self, **kwargs):
+        kwargs.setdefault('form_class', RichTextFormField)
         form_field = super().formfield(**kwargs)
         if not isinstance(form_field.widget, RichTextarea):
             form_field.widget = RichTextarea()
@@ -0,0 +1,257 @@
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.html import conditional_escape, mark_safe, strip_spaces_between_tags
+from django.utils.module_loading import import_string
+
+from formset.utils import BoundedCache
+
+BUILTIN_TEMPLATES_DIR = Path(__file__).resolve().parent.parent / 'templates'
+DEFAULT_DOC_TEMPLATE = 'richtext/doc.html'
+RICHTEXT_CACHE_SIZE = 256
+
+
+def parse_document(data):
+    """
+    Return the root node of a rich text document given as dict or as JSON string.
+    """
+    if isinstance(data, dict):
+        return data
+    try:
+        return json.loads(data)
+    except (TypeError, json.JSONDecodeError):
+        return {}
+
+
+@lru_cache
+def is_builtin_template(template_name):
+    """
+    Return ``True`` if the template named ``template_name`` resolves to the one shipped with
+    **django-formset**, ``False`` if a project overrides it or if no such template exists.
+    """
+    try:
+        template = get_template(template_name)
+    except TemplateDoesNotExist:
+        return False
+    return Path(template.origin.name).resolve() == BUILTIN_TEMPLATES_DIR / template_name
+
+
+@lru_cache
+def get_richtext_attributes(framework):
+    """
+    Return the function converting node attributes into HTML attributes for the given framework.
+    """
+    try:
+        return import_string(f'formset.renderers.{framework}.richtext_attributes')
+    except ImportError:
+        from formset.renderers.default import richtext_attributes
+
+        return richtext_attributes
+
+
+@receiver(setting_changed)
+def _clear_template_caches(setting, **kwargs):
+    if setting == 'TEMPLATES':
+        is_builtin_template.cache_clear()
+    if setting == 'FORMSET_RICHTEXT_CACHE_SIZE':
+        _rendered_richtext.clear()
+
+
+class RichtextRenderer:
+    """
+    Render a rich text document, stored as TipTap JSON, into HTML in a single pass over its nodes.
+
+    Each node type is rendered by a method named ``node_<type>`` and each mark type by a method
+    named ``mark_<type>``, where ``<type>`` is lowercased. Node and mark types without such a
+    method, or whose template ``richtext/<type>.html`` respectively ``richtext/marks/<type>.html``
+    has been overridden by the project, are rendered through that template, exactly as included by
+    the template ``richtext/doc.html``.
+    """
+    version = 1
+
+    def __init__(self, framework='default'):
+        self.framework = framework
+        self.richtext_attributes = get_richtext_attributes(framework)
+
+    def render(self, root_node, doc_template=DEFAULT_DOC_TEMPLATE):
+        footnotes = []
+        if is_builtin_template(doc_template):
+            parts = []
+            self.render_content(root_node, parts, footnotes)
+            parts.append(self.render_footnotes(footnotes))
+            html = ''.join(parts)
+        else:
+            html = get_template(doc_template).render(self.get_context(root_node, footnotes))
+        # remove whitespace the same way as the templates do, so that both ways render identical HTML
+        html = html.replace('\t', '').replace('\n', '')
+        return mark_safe(strip_spaces_between_tags(html))
+
+    def get_context(self, node, footnotes, **extra):
+        return dict(extra, node=node, framework=self.framework, richtext_footnotes=footnotes)
+
+    def render_content(self, node, parts, footnotes):
+        for item in node.get('content') or ():
+            if isinstance(item, dict):
+                self.render_node(item, parts, footnotes)
+
+    def render_node(self, node, parts, footnotes):
+        node_type = str(node.get('type', '')).lower()
+        handler = getattr(self, f'node_{node_type}', None)
+        if handler and is_builtin_template(f'richtext/{node_type}.html'):
+            handler(node, parts, footnotes)
+        else:
+            template = get_template(f'richtext/{node_type}.html')
+            parts.append(template.render(self.get_context(node, footnotes)))
+
+    def render_block(self, tag, node, parts, footnotes, attributes=''):
+        if node.get('content'):
+            parts.append(f'<{tag}{attributes}>')
+            self.render_content(node, parts, footnotes)
+            parts.append(f'</{tag}>')
+
+    def node_paragraph(self, node, parts, footnotes):
+        attrs = node.get('attrs')
+        attributes = self.richtext_attributes(attrs) if isinstance(attrs, dict) else ''
+        self.render_block('p', node, parts, footnotes, attributes)
+
+    def node_heading(self, node, parts, footnotes):
+        level = conditional_escape((node.get('attrs') or {}).get('level'))
+        self.render_block(f'h{level}', node, parts, footnotes)
+
+    def node_bulletlist(self, node, parts, footnotes):
+        self.render_block('ul', node, parts, footnotes)
+
+    def node_orderedlist(self, node, parts, footnotes):
+        self.render_block('ol', node, parts, footnotes)
+
+    def node_listitem(self, node, parts, footnotes):
+        self.render_block('li', node, parts, footnotes)
+
+    def node_horizontalrule(self, node, parts, footnotes):
+        parts.append('<hr>')
+
+    def node_footnote(self, node, parts, footnotes):
+        attrs = node.get('attrs')
+        if isinstance(attrs, dict):
+            footnotes.append(attrs)
+            template = get_template('richtext/footnote_ref.html')
+            parts.append(template.render({'footnote_counter': len(footnotes)}))
+
+    def node_text(self, node, parts, footnotes):
+        text = node.get('text', '')
+        marks = node.get('marks')
+        if not marks:
+            parts.append(conditional_escape(text))
+            return
+        # each mark wraps the text on its own, as does the template ``richtext/text.html``
+        for mark in marks:
+            mark_type = str(mark.get('type', '')).lower()
+            attrs = mark.get('attrs')
+            handler = getattr(self, f'mark_{mark_type}', None)
+            if handler and is_builtin_template(f'richtext/marks/{mark_type}.html'):
+                parts.append(handler(conditional_escape(text), attrs or {}))
+            else:
+                template = get_template(f'richtext/marks/{mark_type}.html')
+                parts.append(template.render(self.get_context(node, footnotes, text=text, attrs=attrs)))
+
+    def mark_bold(self, text, attrs):
+        return f'<strong>{text}</strong>'
+
+    def mark_italic(self, text, attrs):
+        return f'<em>{text}</em>'
+
+    def mark_underline(self, text, attrs):
+        return f'<u>{text}</u>'
+
+    def mark_code(self, text, attrs):
+        return f'<code>{text}</code>'
+
+    def mark_simple_link(self, text, attrs):
+        if href := attrs.get('href'):
+            return f'<a href="{conditional_escape(href)}">{text}</a>'
+        return f'<a>{text}</a>'
+
+    def mark_textcolor(self, text, attrs):
+        color = conditional_escape(attrs.get('textColor'))
+        if attrs.get('classBased'):
+            return f'<span class="{color}">{text}</span>'
+        return f'<span style="color: {color}">{text}</span>'
+
+    def mark_procurator(self, text, attrs):
+        variable_name = conditional_escape(attrs.get('variable_name'))
+        sample_value = conditional_escape(attrs.get('sample_value'))
+        return f'{{{{ {variable_name}|default:"{sample_value}" }}}}'
+
+    def render_footnotes(self, footnotes):
+        if not footnotes:
+            return ''
+        if not is_builtin_template('richtext/footnotes_list.html'):
+            template = get_template('richtext/footnotes_list.html')
+            return template.render({'richtext_footnotes': footnotes, 'framework': self.framework})
+        # footnotes are rendered as separate documents, using the default framework
+        renderer = get_richtext_renderer()
+        items = ''.join(
+            f'<li id="_footnote-{counter}">{renderer.render(parse_document(footnote.get("content")))}</li>'
+            for counter, footnote in enumerate(footnotes, 1)
+        )
+        return f'<ol>{items}</ol>'
+
+
+@lru_cache
+def get_richtext_renderer(framework='default'):
+    return RichtextRenderer(framework)
+
+
+_rendered_richtext = BoundedCache(RICHTEXT_CACHE_SIZE, 'FORMSET_RICHTEXT_CACHE_SIZE')
+
+
+def get_richtext_cache():
+    """
+    Return the cache configured by ``settings.FORMSET_RICHTEXT_CACHE`` used to store rendered
+    rich text, or ``None`` if that setting is ``None``.
+    """
+    alias = getattr(settings, 'FORMSET_RICHTEXT_CACHE', 'default')
+    return None if alias is None else caches[alias]
+
+
+def get_richtext_cache_key(data, doc_template=DEFAULT_DOC_TEMPLATE, framework='default'):
+    """
+    Return the cache key for a rich text document, derived from the hash of its content. Hence
+    changing a document does not require to invalidate its cached HTML.
+    """
+    if isinstance(data, str):
+        content = data.encode()
+    else:
+        content = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+    hasher = hashlib.blake2b(content, digest_size=16)
+    hasher.update(f'\0{doc_template}\0{framework}\0{RichtextRenderer.version}'.encode())
+    return f'formset:richtext:{hasher.hexdigest()}'
+
+
+def render_richtext(data, doc_template=DEFAULT_DOC_TEMPLATE, framework='default', cached=False):
+    """
+    Render a rich text document, given as dict or as JSON string, into HTML. If ``cached`` is
+    true, the rendered HTML is looked up in a bounded in-process cache, then in the Django cache
+    configured by ``settings.FORMSET_RICHTEXT_CACHE``, before being rendered.
+    """
+    if not cached:
+        return get_richtext_renderer(framework).render(parse_document(data), doc_template)
+    cache_key = get_richtext_cache_key(data, doc_template, framework)
+    if (html := _rendered_richtext.get(cache_key)) is not None:
+        return mark_safe(html)
+    cache = get_richtext_cache()
+    if cache is None or (html := cache.get(cache_key)) is None:
+        html = str(get_richtext_renderer(framework).render(parse_document(data), doc_template))
+        if cache is not None:
+            cache.set(cache_key, html, getattr(settings, 'FORMSET_RICHTEXT_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+    _rendered_richtext.set(cache_key, html)
+    return mark_safe(html)
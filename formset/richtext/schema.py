@@ -0,0 +1,164 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+
+MAX_DEPTH = 32
+MAX_NODES = 10000
+MAX_TEXT_LENGTH = 1000000
+
+_compiled_schemas = {}
+
+
+@receiver(setting_changed)
+def _clear_compiled_schemas(setting, **kwargs):
+    if setting.startswith('FORMSET_RICHTEXT_MAX_'):
+        _compiled_schemas.clear()
+
+
+class RichtextSchema:
+    """
+    Schema of the TipTap documents which can be edited using a given list of control elements.
+
+    Calling :meth:`clean` on a document returns a copy of it, where all nodes and marks unknown to
+    the editor have been stripped. Documents nested deeper than ``settings.FORMSET_RICHTEXT_MAX_DEPTH``,
+    containing more nodes than ``settings.FORMSET_RICHTEXT_MAX_NODES`` or more characters than
+    ``settings.FORMSET_RICHTEXT_MAX_TEXT_LENGTH`` are rejected. Lists and dicts found in attributes
+    are counted against the same limits. The document is traversed once and without recursion, so
+    that the time spent is proportional to its size.
+    """
+    default_error_messages = {
+        'invalid': _("The rich text document is malformed."),
+        'max_depth': _("The rich text document is nested deeper than {max_depth} levels."),
+        'max_nodes': _("The rich text document contains more than {max_nodes} elements."),
+        'max_text_length': _("The rich text document contains more than {max_text_length} characters."),
+    }
+
+    def __init__(self, control_elements):
+        self.node_types = {'paragraph', 'text', 'hardBreak'}
+        self.mark_types = set()
+        self.document_attributes = {}
+        for control_element in control_elements:
+            self.node_types.update(control_element.node_types)
+            self.mark_types.update(control_element.mark_types)
+            for node_type, nested in control_element.document_attributes.items():
+                self.document_attributes[node_type] = {
+                    attr: get_richtext_schema(elements) for attr, elements in nested.items()
+                }
+        self.max_depth = getattr(settings, 'FORMSET_RICHTEXT_MAX_DEPTH', MAX_DEPTH)
+        self.max_nodes = getattr(settings, 'FORMSET_RICHTEXT_MAX_NODES', MAX_NODES)
+        self.max_text_length = getattr(settings, 'FORMSET_RICHTEXT_MAX_TEXT_LENGTH', MAX_TEXT_LENGTH)
+
+    def raise_error(self, code):
+        message = self.default_error_messages[code].format(
+            max_depth=self.max_depth,
+            max_nodes=self.max_nodes,
+            max_text_length=self.max_text_length,
+        )
+        raise ValidationError(message, code=code)
+
+    def clean(self, document):
+        if not isinstance(document, dict) or document.get('type') != 'doc':
+            self.raise_error('invalid')
+        root = dict(document)
+        # each entry is a copied node, whose content and attributes still refer to the original
+        stack = [(root, 0, self)]
+        num_nodes = text_length = 0
+        while stack:
+            node, depth, schema = stack.pop()
+            if depth > self.max_depth:
+                self.raise_error('max_depth')
+            attrs = node.get('attrs')
+            if attrs is not None:
+                if not isinstance(attrs, dict):
+                    del node['attrs']
+                else:
+                    node['attrs'] = attrs = dict(attrs)
+                    nested = schema.document_attributes.get(node.get('type'), {})
+                    for key, value in attrs.items():
+                        if key in nested and isinstance(value, dict) and value.get('type') == 'doc':
+                            attrs[key] = dict(value)
+                            stack.append((attrs[key], depth + 1, nested[key]))
+                        else:
+                            num_nodes, text_length = self.measure_value(value, depth + 1, num_nodes, text_length)
+            if node.get('type') == 'text':
+                node.pop('content', None)
+                text_length += len(node['text'])
+                if marks := schema.clean_marks(node.get('marks')):
+                    node['marks'] = marks
+                    for mark in marks:
+                        if isinstance(mark_attrs := mark.get('attrs'), dict):
+                            for value in mark_attrs.values():
+                                num_nodes, text_length = self.measure_value(value, depth + 1, num_nodes, text_length)
+                else:
+                    node.pop('marks', None)
+            elif (content := node.get('content')) is not None:
+                if not isinstance(content, list):
+                    self.raise_error('invalid')
+                node['content'] = []
+                for child in content:
+                    if not schema.is_known_node(child):
+                        continue
+                    num_nodes += 1
+                    if num_nodes > self.max_nodes:
+                        self.raise_error('max_nodes')
+                    child = dict(child)
+                    node['content'].append(child)
+                    stack.append((child, depth + 1, schema))
+            if text_length > self.max_text_length:
+                self.raise_error('max_text_length')
+        return root
+
+    def measure_value(self, value, depth, num_nodes, text_length):
+        """
+        Add the elements and characters of an attribute value to the given counts and return them.
+        Lists and dicts are walked without recursion, each of their items counting as an element.
+        """
+        stack = [(value, depth)]
+        while stack:
+            value, depth = stack.pop()
+            if isinstance(value, str):
+                text_length += len(value)
+            elif isinstance(value, (list, dict)):
+                if depth > self.max_depth:
+                    self.raise_error('max_depth')
+                if isinstance(value, dict):
+                    text_length += sum(len(key) for key in value.keys() if isinstance(key, str))
+                    value = value.values()
+                num_nodes += len(value)
+                if num_nodes > self.max_nodes:
+                    self.raise_error('max_nodes')
+                stack.extend((item, depth + 1) for item in value)
+            if text_length > self.max_text_length:
+                self.raise_error('max_text_length')
+        return num_nodes, text_length
+
+    def is_known_node(self, node):
+        if not isinstance(node, dict) or node.get('type') not in self.node_types:
+            return False
+        return node['type'] != 'text' or isinstance(node.get('text'), str)
+
+    def clean_marks(self, marks):
+        if not isinstance(marks, list):
+            return []
+        cleaned, mark_types = [], set()
+        for mark in marks:
+            # a text node can carry each type of mark only once
+            if isinstance(mark, dict) and mark.get('type') in self.mark_types and mark['type'] not in mark_types:
+                mark_types.add(mark['type'])
+                cleaned.append(mark)
+        return cleaned
+
+
+def get_richtext_schema(control_elements):
+    """
+    Return the schema compiled for the given list of control elements. Since that list usually is
+    declared once, its schema is compiled only once.
+    """
+    key = id(control_elements)
+    cached_elements, schema = _compiled_schemas.get(key, (None, None))
+    if cached_elements is not control_elements:
+        schema = RichtextSchema(control_elements)
+        _compiled_schemas[key] = control_elements, schema
+    return schema
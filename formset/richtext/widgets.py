@@ -1,9 +1,41 @@
 import json
+import weakref
 
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.forms.widgets import Textarea
 from django.utils.html import format_html_join
+from django.utils.translation import get_language
 
 from formset.richtext import controls
+from formset.richtext.schema import get_richtext_schema
+from formset.utils import get_render_scope
+
+_control_panel_caches = weakref.WeakSet()
+
+
+class ControlPanelCache:
+    """
+    The control panels rendered for one rich text widget, shared by all copies of that widget.
+    """
+    def __init__(self):
+        self.control_panels = {}
+
+    def get(self, key):
+        return self.control_panels.get(key, (None, None))
+
+    def set(self, key, control_elements, control_panel):
+        self.control_panels[key] = control_elements, control_panel
+
+    def clear(self):
+        self.control_panels.clear()
+
+
+@receiver(setting_changed)
+def _clear_control_panels(setting, **kwargs):
+    if setting == 'TEMPLATES':
+        for control_panels in _control_panel_caches:
+            control_panels.clear()
 
 
 class RichTextarea(Textarea):
@@ -24,6 +56,12 @@ class RichTextarea(Textarea):
         super().__init__(attrs)
         if control_elements is not None:
             self.control_elements = control_elements
+        self.control_panels = ControlPanelCache()
+        _control_panel_caches.add(self.control_panels)
+
+    @property
+    def schema(self):
+        return get_richtext_schema(self.control_elements)
 
     def format_value(self, value):
         return value or ''
@@ -47,23 +85,65 @@ class RichTextarea(Textarea):
         context['widget']['attrs'].pop('use_json', None)
         return context
 
-    def render(self, name, value, attrs=None, renderer=None):
-        context = self.get_context(name, value, attrs)
-        control_panel = format_html_join('', '{0}', (
-            [elm.render(renderer)] for elm in self.control_elements
-        ))
-        dialog_forms = []
+    def render_control_panel(self, renderer, dialog_ids):
+        """
+        Render the buttons of the menubar. They only depend on the control elements, the CSS framework,
+        the active language and the ids of the dialogs they control, hence they are rendered only once
+        for each combination of them.
+        """
+        key = renderer.framework, get_language(), tuple(dialog_ids.items())
+        control_elements, control_panel = self.control_panels.get(key)
+        if control_elements is not self.control_elements:
+            control_panel = format_html_join('', '{0}', (
+                [elm.render(renderer, dict(elm.get_context(), dialog_id=dialog_ids.get(elm.dialog_form.extension)))]
+                if isinstance(elm, controls.DialogControl) else [elm.render(renderer)]
+                for elm in self.control_elements
+            ))
+            self.control_panels.set(key, self.control_elements, control_panel)
+        return control_panel
+
+    def render_dialog_forms(self, attrs, renderer):
+        """
+        Render the dialog forms of the dialog controls and return them together with the ids of the
+        dialogs shared with other editors. While rendering a form collection, dialogs of the same
+        class and title are rendered only once, after that collection, so that all rich text editors
+        inside can share them by their id. All other dialogs are rendered inside the editor.
+        """
+        render_scope = get_render_scope()
+        shared_dialogs = {} if render_scope is None else render_scope.setdefault('richtext_dialogs', {})
+        dialog_forms, dialog_ids = [], {}
         for control_element in self.control_elements:
             if not isinstance(control_element, controls.DialogControl):
                 continue
             dialog_form = control_element.dialog_form
+            dialog_key = type(dialog_form), str(dialog_form.title)
+            dialog_id = None
+            if render_scope is not None:
+                dialog_id = f'{render_scope["id"]}_richtext_dialog_{dialog_form.extension}'
+                if dialog_id not in shared_dialogs:
+                    shared_dialogs[dialog_id] = dialog_key
+                elif shared_dialogs[dialog_id] == dialog_key:
+                    dialog_ids[dialog_form.extension] = dialog_id
+                    continue  # already rendered for another editor
+                else:
+                    dialog_id = None  # another dialog uses this extension, hence render it inside the editor
             dialog_context = dialog_form.get_context()
+            dialog_context['dialog_id'] = dialog_id
             dialog_form.induce_open = f'dialog_{dialog_form.extension}:active'
             dialog_form.auto_id = '{form}_{control}_%s'.format(**attrs, control=dialog_form.extension)
-            dialog_forms.append(dialog_form.render(context=dialog_context, renderer=renderer))
+            dialog_html = dialog_form.render(context=dialog_context, renderer=renderer)
+            if dialog_id:
+                dialog_ids[dialog_form.extension] = dialog_id
+                render_scope['epilogue'].append(dialog_html)
+            else:
+                dialog_forms.append(dialog_html)
+        return dialog_forms, dialog_ids
 
+    def render(self, name, value, attrs=None, renderer=None):
+        context = self.get_context(name, value, attrs)
+        dialog_forms, dialog_ids = self.render_dialog_forms(attrs, renderer)
         context.update(
-            control_panel=control_panel,
+            control_panel=self.render_control_panel(renderer, dialog_ids),
             dialog_forms=dialog_forms,
         )
         return self._render(self.template_name, context, renderer)
@@ -1,38 +1,13 @@
-import json
-
 from django import template
 from django.template.loader import get_template
-from django.utils.html import mark_safe, strip_spaces_between_tags
-from django.utils.module_loading import import_string
-
 
-def render_richtext(data, doc_template='richtext/doc.html', framework='default'):
-    if isinstance(data, dict):
-        root_node = data
-    else:
-        try:
-            root_node = json.loads(data)
-        except json.JSONDecodeError:
-            root_node = {}
-    template = get_template(doc_template)
-    context = {
-        'node': root_node,
-        'framework': framework,
-        'richtext_footnotes': [],
-    }
-    html = template.render(context).replace('\t', '').replace('\n', '')
-    return mark_safe(strip_spaces_between_tags(html))
+from formset.richtext.renderer import get_richtext_attributes, render_richtext
 
 
 def render_attributes(context, attrs):
     if not isinstance(attrs, dict):
         return ''
-    framework = context.get('framework', 'default')
-    try:
-        richtext_attributes = import_string(f'formset.renderers.{framework}.richtext_attributes')
-    except ImportError:
-        from formset.renderers.default import richtext_attributes
-    return richtext_attributes(attrs)
+    return get_richtext_attributes(context.get('framework', 'default'))(attrs)
 
 
 def render_footnote(context, footnote_ref_template, attrs):
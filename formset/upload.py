@@ -1,37 +1,469 @@
+import functools
+import glob
+import hashlib
+import json
+import logging
 import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
+from urllib.parse import urlencode
 
+from django.conf import settings
 from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import locks
+from django.core.files.base import ContentFile, File
 from django.core.files.storage import default_storage
-from django.core.signing import get_cookie_signer
-from django.http.response import HttpResponseBadRequest, JsonResponse
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+from django.core.signing import BadSignature, get_cookie_signer
+from django.db.models.fields.files import FileField
+from django.http.response import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+
+from formset.codec import JsonResponse, get_codec, parse_request_body
 
 THUMBNAIL_MAX_HEIGHT = 200
 THUMBNAIL_MAX_WIDTH = 350
 UPLOAD_TEMP_DIR = Path('upload_temp')
+UPLOAD_SESSION_DIR = UPLOAD_TEMP_DIR / 'sessions'
+
+THUMBNAIL_FAILURES_SIZE = 256
+UPLOAD_BATCH_WORKERS = 4
+UPLOAD_MAX_AGE = 172800
+UPLOAD_SESSION_TIMEOUT = 3600
+UPLOAD_TICKET_MAX_AGE = 600
 
+logger = logging.getLogger('formset.upload')
+_thumbnail_name_pattern = re.compile(r'^(?P<stem>.+)_h\d+(@\d+x)?(?P<suffix>\.[^.]*)?$')
 
-def get_thumbnail_path(image_path, image_height=THUMBNAIL_MAX_HEIGHT):
+
+def get_thumbnail_path(image_path, image_height=THUMBNAIL_MAX_HEIGHT, density=1, image_format=None):
     image_path = Path(image_path)
-    thumbnail_name = f'{image_path.stem}_h{image_height}{image_path.suffix}'
+    thumbnail_name = f'{image_path.stem}_h{image_height}'
+    if density != 1:
+        thumbnail_name += f'@{density}x'
+    thumbnail_name += f'.{image_format}' if image_format else image_path.suffix
     return image_path.with_name(thumbnail_name)
 
 
-def thumbnail_image(storage, image_path, image_height=THUMBNAIL_MAX_HEIGHT):
-    try:
-        from PIL import Image, ImageOps
+def get_thumbnail_variants():
+    """
+    Return the thumbnail variants as tuples of pixel density and image format, where format
+    ``None`` keeps the format of the original image. The first variant always is the thumbnail in
+    single density and the original format. Further variants are configured through
+    ``settings.FORMSET_THUMBNAIL_DENSITIES`` and ``settings.FORMSET_THUMBNAIL_FORMATS``. Formats
+    which can not be encoded by the installed Pillow are skipped.
+    """
+    from PIL import Image
 
-        image = Image.open(storage.path(image_path))
-    except Exception:
-        return staticfiles_storage.url('formset/icons/file-picture.svg')
-    else:
+    Image.init()
+    densities = sorted({1, *getattr(settings, 'FORMSET_THUMBNAIL_DENSITIES', (1,))})
+    image_formats = [None] + [
+        image_format.lower() for image_format in getattr(settings, 'FORMSET_THUMBNAIL_FORMATS', ())
+        if image_format.upper() in Image.SAVE
+    ]
+    return [(density, image_format) for image_format in image_formats for density in densities]
+
+
+def render_thumbnail(image_path, thumbnail_path, image_height=THUMBNAIL_MAX_HEIGHT, variants=()):
+    """
+    Render the thumbnail for the image stored at ``image_path`` into ``thumbnail_path``. Both
+    arguments are filesystem paths, so that this function can also be run inside a separate process.
+    Additional ``variants``, given as tuples of pixel density and image format, are rendered from the
+    same decoded image into the paths returned by :func:`get_thumbnail_path`.
+
+    Huge images are not decoded in full resolution: JPEGs are decoded using Pillow's draft mode and
+    other formats are reduced by an integer factor before being fitted into the thumbnail.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(image_path) as image:
         height = int(image_height)
         width = int(round(image.width * height / image.height))
         width, height = min(width, THUMBNAIL_MAX_WIDTH), min(height, THUMBNAIL_MAX_HEIGHT)
-        thumb = ImageOps.fit(ImageOps.exif_transpose(image), (width, height))
-        thumbnail_path = get_thumbnail_path(storage.path(image_path), image_height)
-        thumb.save(thumbnail_path)
-        return storage.url(thumbnail_path.relative_to(storage.location))
+        # the image may be rotated by its EXIF orientation, hence bound both edges by the longer one
+        bound = max(width, height) * max((density for density, _ in variants), default=1)
+        image.draft(image.mode, (bound, bound))
+        factor = min(image.width, image.height) // (2 * bound)
+        reduced = image.reduce(factor) if factor > 1 else image
+        source = ImageOps.exif_transpose(reduced)
+    thumbs = {}
+    # render the default thumbnail last, since its existence signals that all variants are ready
+    for density, image_format in [*variants, (1, None)]:
+        if density not in thumbs:
+            thumbs[density] = ImageOps.fit(source, (width * density, height * density))
+        thumb = thumbs[density]
+        if image_format:
+            target_path = get_thumbnail_path(image_path, image_height, density, image_format)
+            if thumb.mode not in ('RGB', 'RGBA'):
+                thumb = thumb.convert('RGBA')
+        elif density == 1:
+            target_path = Path(thumbnail_path)
+        else:
+            target_path = get_thumbnail_path(image_path, image_height, density)
+        # write to a hidden file first, so that a partially written thumbnail is never served
+        partial_path = target_path.with_name(f'.{target_path.name}')
+        thumb.save(partial_path)
+        os.replace(partial_path, target_path)
+
+
+def get_thumbnail_urls(storage, image_path, image_height=THUMBNAIL_MAX_HEIGHT):
+    """
+    Return the URL of the thumbnail rendered for the image at filesystem path ``image_path``,
+    together with the ``srcset`` for higher pixel densities and a list of ``<source>`` attributes
+    for the thumbnails rendered in alternative image formats.
+    """
+    srcsets = {}
+    for density, image_format in get_thumbnail_variants():
+        thumbnail_path = get_thumbnail_path(image_path, image_height, density, image_format)
+        thumbnail_url = storage.url(thumbnail_path.relative_to(storage.location))
+        srcsets.setdefault(image_format, []).append(f'{thumbnail_url} {density}x')
+    default_srcset = srcsets.pop(None)
+    return {
+        'thumbnail_url': default_srcset[0].rsplit(' ', 1)[0],
+        'thumbnail_srcset': ', '.join(default_srcset) if len(default_srcset) > 1 else '',
+        'thumbnail_sources': [
+            {'type': f'image/{image_format}', 'srcset': ', '.join(srcset)}
+            for image_format, srcset in srcsets.items()
+        ],
+    }
+
+
+def thumbnails_exist(image_path, image_height=THUMBNAIL_MAX_HEIGHT):
+    return all(
+        get_thumbnail_path(image_path, image_height, density, image_format).is_file()
+        for density, image_format in get_thumbnail_variants()
+    )
+
+
+def get_icon_urls(icon_url):
+    return {'thumbnail_url': icon_url, 'thumbnail_srcset': '', 'thumbnail_sources': []}
+
+
+def create_thumbnails(storage, image_path, image_height=THUMBNAIL_MAX_HEIGHT):
+    """
+    Render all thumbnail variants for the image stored at ``image_path`` and return their URLs as
+    :func:`get_thumbnail_urls` does. If the image can not be rendered, return the URL of an icon.
+    """
+    image_path = storage.path(image_path)
+    try:
+        variants = get_thumbnail_variants()[1:]
+        render_thumbnail(image_path, get_thumbnail_path(image_path, image_height), image_height, variants)
+    except Exception:
+        return get_icon_urls(staticfiles_storage.url('formset/icons/file-picture.svg'))
+    return get_thumbnail_urls(storage, image_path, image_height)
+
+
+def thumbnail_image(storage, image_path, image_height=THUMBNAIL_MAX_HEIGHT):
+    return create_thumbnails(storage, image_path, image_height)['thumbnail_url']
+
+
+class ThumbnailPool:
+    """
+    Bounded pool of workers rendering thumbnails off the request path. It is configured through
+    ``settings.FORMSET_THUMBNAIL_WORKERS`` (number of workers, 0 renders thumbnails synchronously)
+    and ``settings.FORMSET_THUMBNAIL_EXECUTOR`` (``'thread'`` or ``'process'``). At most
+    ``settings.FORMSET_THUMBNAIL_QUEUE_SIZE`` thumbnails are queued; beyond that, images are
+    depicted by their icon.
+    """
+    def __init__(self, workers, executor='thread', queue_size=None):
+        executor_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        self.executor = executor_class(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(queue_size or 4 * workers)
+        self.pending = {}
+        self.failed = OrderedDict()  # recently failed thumbnails, reported once by poll()
+        self.lock = threading.Lock()
+
+    def submit(self, image_path, thumbnail_path, image_height):
+        """
+        Schedule the rendering of a thumbnail. Return False if the queue is exhausted.
+        """
+        key = str(thumbnail_path)
+        with self.lock:
+            if key in self.pending:
+                return True
+            if not self.slots.acquire(blocking=False):
+                return False
+            # pass the variants explicitly, since worker processes may not have configured settings
+            variants = get_thumbnail_variants()[1:]
+            future = self.executor.submit(render_thumbnail, str(image_path), key, image_height, variants)
+            self.pending[key] = future
+        future.add_done_callback(lambda f: self._finished(key, f))
+        return True
+
+    def _finished(self, key, future):
+        self.slots.release()
+        with self.lock:
+            self.pending.pop(key, None)
+            if future.exception() is not None:
+                # remember the failure, so that a poll can report it once, while a later submit retries
+                self.failed[key] = True
+                while len(self.failed) > THUMBNAIL_FAILURES_SIZE:
+                    self.failed.popitem(last=False)
+        if future.exception() is not None:
+            logger.warning(f"Failed to render thumbnail {key}: {future.exception()}")
+
+    def poll(self, thumbnail_path):
+        """
+        Return ``True`` if the thumbnail is ready, ``False`` if rendering failed and ``None`` while
+        it is still pending.
+        """
+        key = str(thumbnail_path)
+        with self.lock:
+            if self.failed.pop(key, None):
+                return False
+            future = self.pending.get(key)
+            if future is not None and future.done():
+                del self.pending[key]
+                return future.exception() is None
+        if future is None and Path(key).is_file():
+            return True
+        return None
+
+
+_thumbnail_pool = None
+_thumbnail_pool_lock = threading.Lock()
+
+
+def get_thumbnail_pool():
+    """
+    Return the shared :class:`ThumbnailPool` or ``None`` if thumbnails are rendered synchronously.
+    """
+    global _thumbnail_pool
+
+    workers = getattr(settings, 'FORMSET_THUMBNAIL_WORKERS', 0)
+    if not workers:
+        return None
+    with _thumbnail_pool_lock:
+        if _thumbnail_pool is None:
+            _thumbnail_pool = ThumbnailPool(
+                workers,
+                executor=getattr(settings, 'FORMSET_THUMBNAIL_EXECUTOR', 'thread'),
+                queue_size=getattr(settings, 'FORMSET_THUMBNAIL_QUEUE_SIZE', None),
+            )
+        return _thumbnail_pool
+
+
+def get_content_digest(file_obj):
+    """
+    Return the SHA-256 digest of a file's content, unless the upload handler already computed it.
+    """
+    if digest := getattr(file_obj, 'sha256', None):
+        return digest
+    hasher = hashlib.sha256()
+    for chunk in file_obj.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def get_temp_upload_name(digest, filename):
+    return str(UPLOAD_TEMP_DIR / f'{digest}{Path(filename).suffix.lower()}')
+
+
+def get_local_path(name, feature):
+    """
+    Return the path of ``name`` inside ``default_storage``, or raise ``ImproperlyConfigured`` if
+    that storage is not located on the local filesystem, which is required by ``feature``.
+    """
+    try:
+        return Path(default_storage.path(name))
+    except NotImplementedError as error:
+        raise ImproperlyConfigured(f"{feature} require a `default_storage` on the local filesystem.") from error
+
+
+def touch_temporary_upload(temp_name):
+    """
+    Refresh the modification time of content in the temporary folder, which tells the sweeper when
+    that content has been referenced for the last time. Storages not based on the filesystem keep
+    the time of its first upload.
+    """
+    try:
+        os.utime(default_storage.path(temp_name))
+    except (NotImplementedError, FileNotFoundError):
+        pass
+
+
+def store_temporary_upload(file_obj):
+    """
+    Store an uploaded file in the temporary folder, addressed by the digest of its content. Hence
+    identical content is stored only once, regardless of how often it has been uploaded.
+    """
+    if isinstance(file_obj, StreamedUploadedFile):
+        # the upload handler already wrote the content into the temporary folder
+        file_obj.close()
+        file_obj.object_name = register_temporary_upload(file_obj.object_name, file_obj.name, file_obj.sha256)
+        return file_obj.object_name
+    temp_name = get_temp_upload_name(get_content_digest(file_obj), file_obj.name)
+    if default_storage.exists(temp_name):
+        touch_temporary_upload(temp_name)
+    else:
+        stored_name = default_storage.save(temp_name, file_obj)
+        if stored_name != temp_name:
+            default_storage.delete(stored_name)  # identical content has been stored concurrently
+    return temp_name
+
+
+def register_temporary_upload(name, filename, digest=None):
+    """
+    Move a completely received file from ``name`` into the temporary folder, addressed by the
+    digest of its content, and return its new name.
+    """
+    if digest is None:
+        with default_storage.open(name) as received_file:
+            digest = get_content_digest(File(received_file))
+    temp_name = get_temp_upload_name(digest, filename)
+    if default_storage.exists(temp_name):
+        default_storage.delete(name)
+        touch_temporary_upload(temp_name)
+        return temp_name
+    try:
+        os.replace(default_storage.path(name), default_storage.path(temp_name))
+    except NotImplementedError:
+        # storages not based on the filesystem can not rename files, hence copy its content
+        with default_storage.open(name) as received_file:
+            stored_name = default_storage.save(temp_name, received_file)
+        default_storage.delete(name)
+        if stored_name != temp_name:
+            default_storage.delete(stored_name)  # identical content has been stored concurrently
+    return temp_name
+
+
+class LocalUploadTicketBackend:
+    """
+    Stand-in for an object store or an upload sidecar, receiving direct uploads through the view
+    itself. A backend for an object store instead returns a pre-signed URL for the object's name
+    and omits method ``receive_upload``.
+    """
+    def get_upload_target(self, request, upload_ticket, object_name, metadata):
+        """
+        Return the URL, HTTP method and additional headers the browser shall use to send the file.
+        """
+        return {
+            'upload_url': f"{request.path}?{urlencode({'upload_ticket': upload_ticket})}",
+            'method': 'PUT',
+            'headers': {'Content-Type': metadata['content_type']},
+        }
+
+    def receive_upload(self, request, object_name, size):
+        received = 0
+        with tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE) as object_file:
+            # stream the body, but never beyond the size declared in the ticket
+            while chunk := request.read(min(65536, size + 1 - received)):
+                received += len(chunk)
+                if received > size:
+                    return HttpResponseBadRequest("Upload exceeds the declared file size.")
+                object_file.write(chunk)
+            default_storage.save(object_name, File(object_file))
+        return HttpResponse(status=204)
+
+
+def get_upload_ticket_backend():
+    """
+    Return the backend configured by ``settings.FORMSET_UPLOAD_TICKET_BACKEND`` or ``None`` if
+    direct uploads are disabled.
+    """
+    if backend := getattr(settings, 'FORMSET_UPLOAD_TICKET_BACKEND', None):
+        return import_string(backend)()
+
+
+def link_or_copy(source_path, target_path):
+    try:
+        os.link(source_path, target_path)
+    except FileExistsError:
+        pass
+    except OSError:
+        shutil.copyfile(source_path, target_path)
+
+
+def promote_thumbnails(temp_path, final_path):
+    """
+    Hard link the thumbnails rendered for a temporary upload next to the file's final location.
+    """
+    temp_path, final_path = Path(temp_path), Path(final_path)
+    for thumbnail_path in temp_path.parent.glob(f'{glob.escape(temp_path.stem)}_h*'):
+        match = _thumbnail_name_pattern.match(thumbnail_path.name)
+        if match and match['stem'] == temp_path.stem:
+            # keep the height, density and format of each thumbnail variant
+            thumbnail_name = final_path.stem + thumbnail_path.name[len(temp_path.stem):]
+            try:
+                link_or_copy(thumbnail_path, final_path.with_name(thumbnail_name))
+            except OSError:
+                pass  # the thumbnail will be rendered again on demand
+
+
+class StoredUploadedFile(UploadedFile):
+    """
+    A file waiting in the temporary upload folder. Since it provides ``temporary_file_path()``,
+    Django's ``FileSystemStorage`` moves it into its final location instead of copying its content.
+    If the final location is on another filesystem, Django falls back to a streamed copy. Storages
+    not based on the filesystem just read the file's content, as with any other ``UploadedFile``.
+    """
+    def __init__(self, temp_path, **kwargs):
+        super().__init__(**kwargs)
+        self.temp_path = Path(temp_path)
+        self.link_path = None
+        self._remove_link = None
+
+    def temporary_file_path(self):
+        # content in the temporary folder may be shared by other uploads, hence hand over a hard link
+        # to it, which then is moved into place
+        if self.link_path is None or not self.link_path.exists():
+            self.link_path = self.temp_path.with_name(f'.{uuid.uuid4().hex}{self.temp_path.suffix}')
+            link_or_copy(self.temp_path, self.link_path)
+            # the link remains if this file is only validated but never saved
+            self._remove_link = weakref.finalize(self, self.link_path.unlink, missing_ok=True)
+        return str(self.link_path)
+
+    def close(self):
+        if self._remove_link:
+            self._remove_link()
+        return super().close()
+
+
+@functools.cache
+def _get_file_field_attnames(model):
+    return tuple(field.attname for field in model._meta.concrete_fields if isinstance(field, FileField))
+
+
+def _track_promotions(sender, instance, **kwargs):
+    # remember the fields an uploaded file is assigned to, in order to move its thumbnails along
+    promotions = []
+    for attname in _get_file_field_attnames(sender):
+        value = instance.__dict__.get(attname)
+        # the uploaded file is either assigned directly or already wrapped by a `FieldFile`
+        uploaded_file = getattr(value, '_file', value)
+        if isinstance(uploaded_file, StoredUploadedFile):
+            promotions.append((attname, uploaded_file))
+    if promotions:
+        instance._formset_promotions = promotions
+
+
+def _promote_thumbnails(sender, instance, **kwargs):
+    for attname, uploaded_file in instance.__dict__.pop('_formset_promotions', ()):
+        if uploaded_file.link_path is None:
+            continue  # the file has been copied by a storage not based on the filesystem
+        if uploaded_file.link_path.exists():
+            uploaded_file.link_path.unlink()
+            continue
+        try:
+            final_path = getattr(instance, attname).path
+        except NotImplementedError:
+            continue
+        promote_thumbnails(uploaded_file.temp_path, final_path)
 
 
 def split_mime_type(content_type):
@@ -49,39 +481,310 @@ def file_icon_url(mime_type, sub_type):
     return staticfiles_storage.url('formset/icons/file-unknown.svg')
 
 
+def get_file_info_cache():
+    """
+    Return the cache configured by ``settings.FORMSET_FILE_INFO_CACHE`` used to store the metadata
+    of files, or ``None`` if that setting is ``None``.
+    """
+    alias = getattr(settings, 'FORMSET_FILE_INFO_CACHE', 'default')
+    return None if alias is None else caches[alias]
+
+
 def get_file_info(field_file):
+    """
+    Return the metadata required to depict a stored file inside the dropbox. Everything but the
+    download URL is cached, keyed by the file's storage name and modification time, so that
+    rendering a form requires just one ``stat()`` per file. Missing thumbnails are rendered by the
+    :class:`ThumbnailPool`, if configured.
+    """
     if not field_file:
         return None
     file_path = Path(field_file.path)
+    file_info = {
+        'name': '.'.join(file_path.name.split('.')[1:]),
+        'path': field_file.name,
+    }
+    try:
+        stat = file_path.stat()
+    except OSError:
+        content_type, _ = mimetypes.guess_type(file_path)
+        return dict(
+            file_info,
+            content_type=content_type,
+            download_url='javascript:void(0);',
+            size='–',
+            **get_icon_urls(staticfiles_storage.url('formset/icons/file-missing.svg')),
+        )
+    file_info['download_url'] = field_file.url
+    cache = get_file_info_cache()
+    cache_key = 'formset:file_info:' + hashlib.md5(f'{field_file.name}:{stat.st_mtime_ns}'.encode()).hexdigest()
+    if cache and (metadata := cache.get(cache_key)):
+        return dict(file_info, **metadata)
+
     content_type, _ = mimetypes.guess_type(file_path)
     mime_type, sub_type = split_mime_type(content_type)
+    cacheable = True
     if mime_type == 'image':
         if sub_type == 'svg+xml':
-            thumbnail_url = field_file.url
+            thumbnail_urls = get_icon_urls(field_file.url)
+        elif thumbnails_exist(file_path):
+            thumbnail_urls = get_thumbnail_urls(field_file.storage, file_path)
+        elif thumbnail_pool := get_thumbnail_pool():
+            # backfill the thumbnail off the request path, until then depict a placeholder
+            thumbnail_pool.submit(file_path, get_thumbnail_path(file_path), THUMBNAIL_MAX_HEIGHT)
+            thumbnail_urls = get_icon_urls(staticfiles_storage.url('formset/icons/file-picture.svg'))
+            cacheable = False
         else:
-            thumbnail_path = get_thumbnail_path(file_path)
-            if thumbnail_path.is_file():
-                thumbnail_url = field_file.storage.url(thumbnail_path.relative_to(field_file.storage.location))
-            else:
-                thumbnail_url = thumbnail_image(field_file.storage, file_path)
+            thumbnail_urls = create_thumbnails(field_file.storage, file_path)
     else:
-        thumbnail_url = file_icon_url(mime_type, sub_type)
-    name = '.'.join(file_path.name.split('.')[1:])
-    if file_path.is_file():
-        download_url = field_file.url
-        file_size = depict_size(field_file.size)
-    else:
-        download_url = 'javascript:void(0);'
-        thumbnail_url = staticfiles_storage.url('formset/icons/file-missing.svg')
-        file_size = '–'
-    return {
+        thumbnail_urls = get_icon_urls(file_icon_url(mime_type, sub_type))
+    metadata = {
         'content_type': content_type,
-        'name': name,
-        'path': field_file.name,
-        'download_url': download_url,
-        'thumbnail_url': thumbnail_url,
-        'size': file_size,
+        'size': depict_size(stat.st_size),
+        **thumbnail_urls,
     }
+    if cache and cacheable:
+        cache.set(cache_key, metadata, getattr(settings, 'FORMSET_FILE_INFO_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+    return dict(file_info, **metadata)
+
+
+def sweep_temporary_uploads(max_age=None, quota=None, dry_run=False):
+    """
+    Remove abandoned files from the temporary upload folder. An upload, together with its
+    thumbnails, is removed if it has not been referenced for ``max_age`` seconds.
+    Thereafter, if the remaining uploads exceed ``quota`` bytes, the least recently referenced ones
+    are removed. Upload sessions which did not receive a chunk for
+    ``settings.FORMSET_UPLOAD_SESSION_TIMEOUT`` seconds are removed, the others are kept.
+
+    Only the API of ``default_storage`` is used, so that this works with any storage backend.
+    Return a tuple with the number of removed files and the reclaimed bytes. Both are reported to
+    the callable configured by ``settings.FORMSET_UPLOAD_SWEEP_METRICS``, if set.
+    """
+    if max_age is None:
+        max_age = getattr(settings, 'FORMSET_UPLOAD_MAX_AGE', UPLOAD_MAX_AGE)
+    if quota is None:
+        quota = getattr(settings, 'FORMSET_UPLOAD_QUOTA', None)
+    session_timeout = getattr(settings, 'FORMSET_UPLOAD_SESSION_TIMEOUT', UPLOAD_SESSION_TIMEOUT)
+    current_time = now()
+
+    def stat(name):
+        return default_storage.get_modified_time(name), default_storage.size(name)
+
+    # group each upload with its thumbnails, as they are removed together
+    groups = {}
+    try:
+        _, filenames = default_storage.listdir(str(UPLOAD_TEMP_DIR))
+    except FileNotFoundError:
+        filenames = []
+    uploads_by_stem = {Path(filename).stem: filename for filename in filenames}
+    for filename in filenames:
+        key = filename
+        if (match := _thumbnail_name_pattern.match(filename)) and match['stem'] in uploads_by_stem:
+            # thumbnail variants may be encoded in another format than their upload
+            key = uploads_by_stem[match['stem']]
+        groups.setdefault(key, []).append(str(UPLOAD_TEMP_DIR / filename))
+    try:
+        _, filenames = default_storage.listdir(str(UPLOAD_SESSION_DIR))
+    except FileNotFoundError:
+        filenames = []
+    for filename in filenames:
+        groups.setdefault(f'sessions/{Path(filename).stem}', []).append(str(UPLOAD_SESSION_DIR / filename))
+
+    uploads = []
+    for key, names in groups.items():
+        stats = [stat(name) for name in names]
+        last_used = max(modified_time for modified_time, _ in stats)
+        age = (current_time - last_used).total_seconds()
+        if key.startswith('sessions/'):
+            if age < session_timeout:
+                continue  # upload session is still in flight
+            age = float('inf')  # abandoned upload sessions can not be resumed anyway
+        uploads.append((last_used, age, sum(size for _, size in stats), names))
+    uploads.sort(key=lambda upload: upload[0])
+
+    removed_files, reclaimed_bytes = 0, 0
+    remaining_bytes = sum(upload[2] for upload in uploads)
+    for last_used, age, size, names in uploads:
+        if age < max_age and (quota is None or remaining_bytes <= quota):
+            break
+        if not dry_run:
+            for name in names:
+                default_storage.delete(name)
+        removed_files += len(names)
+        reclaimed_bytes += size
+        remaining_bytes -= size
+    if metrics_hook := getattr(settings, 'FORMSET_UPLOAD_SWEEP_METRICS', None):
+        import_string(metrics_hook)(removed_files=removed_files, reclaimed_bytes=reclaimed_bytes)
+    return removed_files, reclaimed_bytes
+
+
+_upload_sweeper = None
+_upload_sweeper_lock = threading.Lock()
+
+
+def start_upload_sweeper():
+    """
+    Start a daemon thread sweeping the temporary upload folder every
+    ``settings.FORMSET_UPLOAD_SWEEP_INTERVAL`` seconds. Does nothing if that setting is unset.
+    """
+    global _upload_sweeper
+
+    interval = getattr(settings, 'FORMSET_UPLOAD_SWEEP_INTERVAL', None)
+    if not interval or _upload_sweeper:
+        return
+
+    def sweep():
+        while True:
+            time.sleep(interval)
+            try:
+                sweep_temporary_uploads()
+            except Exception:
+                logger.exception("Failed to sweep the temporary upload folder")
+
+    with _upload_sweeper_lock:
+        if _upload_sweeper is None:
+            _upload_sweeper = threading.Thread(target=sweep, name='formset-upload-sweeper', daemon=True)
+            _upload_sweeper.start()
+
+
+class StreamedUploadedFile(UploadedFile):
+    """
+    A file written into the temporary upload folder by :class:`FormsetUploadHandler`, while
+    being received. Its digest and size have been computed on the fly.
+    """
+    def __init__(self, object_name, sha256, **kwargs):
+        super().__init__(**kwargs)
+        self.object_name = object_name
+        self.sha256 = sha256
+
+    @property
+    def file(self):
+        # the stored object is opened only when its content is accessed
+        if self._file is None:
+            self._file = default_storage.open(self.object_name)
+        return self._file
+
+    @file.setter
+    def file(self, file):
+        self._file = file
+
+    @property
+    def closed(self):
+        return self._file is None or self._file.closed
+
+    def open(self, mode='rb'):
+        if self.closed:
+            self._file = default_storage.open(self.object_name, mode)
+        else:
+            self._file.seek(0)
+        return self
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def temporary_file_path(self):
+        return default_storage.path(self.object_name)
+
+
+class FormsetUploadHandler(FileUploadHandler):
+    """
+    Upload handler for files sent to a view inheriting from :class:`FileUploadMixin`. Instead of
+    buffering them in memory or a temporary file, it writes their content straight into the
+    temporary upload folder and computes their digest and size on the fly. Files which are not
+    accepted by the widget, or which exceed its maximum size, are skipped as soon as detected,
+    while the other files of the request are received as usual.
+
+    Since Django's CSRF middleware parses the request body before the view is invoked, this
+    handler shall be added to ``settings.FILE_UPLOAD_HANDLERS``, where it handles uploads to
+    formset views only. Views exempted from CSRF checks install this handler by themselves.
+    Otherwise uploaded files are buffered by Django's upload handlers.
+    """
+    upload_field_names = ['temp_file', 'temp_files']
+
+    def __init__(self, request=None, view=None):
+        super().__init__(request)
+        self.view = view
+        self.accept, self.max_size = None, None
+        self.rejected = {}  # maps the position of each skipped file to the reason
+        self.file_index = -1
+        self.object_name, self.object_file = None, None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if self.view is None and (resolver_match := getattr(self.request, 'resolver_match', None)):
+            view_class = getattr(resolver_match.func, 'view_class', None)
+            if isinstance(view_class, type) and issubclass(view_class, FileUploadMixin):
+                self.view = view_class(**resolver_match.func.view_initkwargs)
+                self.view.setup(self.request, *resolver_match.args, **resolver_match.kwargs)
+        if self.view is not None:
+            self.accept, self.max_size = self.view.get_upload_limits()
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        from formset.widgets import UploadedFileInput
+
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        if self.view is None or field_name not in self.upload_field_names:
+            return
+        self.file_index += 1
+        if self.accept and not UploadedFileInput.accepts_content_type(self.accept, content_type):
+            self.abort(f"File type '{content_type}' is not accepted.")
+        if self.max_size and content_length and content_length > self.max_size:
+            self.abort(f"File '{file_name}' exceeds the maximum size.")
+        self.object_name = UPLOAD_SESSION_DIR / f'{uuid.uuid4().hex}.upload'
+        try:
+            object_path = Path(default_storage.path(self.object_name))
+        except NotImplementedError:
+            # storages not based on the filesystem receive the file through Django's upload handlers
+            self.object_name = None
+            return
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        self.object_file = open(object_path, 'wb')
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        raise StopFutureHandlers
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.object_file is None:
+            return raw_data
+        self.size += len(raw_data)
+        if self.max_size and self.size > self.max_size:
+            self.abort(f"File '{self.file_name}' exceeds the maximum size.")
+        self.hasher.update(raw_data)
+        self.object_file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if self.object_file is None:
+            return
+        self.object_file.close()
+        self.object_file = None
+        return StreamedUploadedFile(
+            str(self.object_name),
+            self.hasher.hexdigest(),
+            name=self.file_name,
+            content_type=self.content_type,
+            size=self.size,
+            charset=self.charset,
+            content_type_extra=self.content_type_extra,
+        )
+
+    def abort(self, error):
+        """
+        Skip the remaining content of a file which is rejected anyway and remember the reason.
+        """
+        if self.object_file is not None:
+            self.object_file.close()
+            self.object_file = None
+            default_storage.delete(self.object_name)
+        self.rejected[self.file_index] = error
+        raise SkipFile
+
+    def upload_complete(self):
+        if self.object_file is not None:
+            # the upload has been aborted or interrupted, remove the partially written file
+            self.object_file.close()
+            self.object_file = None
+            default_storage.delete(self.object_name)
 
 
 class FileUploadMixin:
@@ -91,42 +794,400 @@ class FileUploadMixin:
     """
     filename_max_length = 250
 
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == 'POST' and request.content_type == 'multipart/form-data':
+            handlers = [handler for handler in request.upload_handlers if isinstance(handler, FormsetUploadHandler)]
+            if hasattr(request, '_files'):
+                # the request body has been parsed beforehand, usually by the CSRF middleware
+                if not handlers:
+                    logger.warning(
+                        "Streaming uploads are unavailable, because 'formset.upload.FormsetUploadHandler' is "
+                        "missing in `settings.FILE_UPLOAD_HANDLERS`. Uploaded files are buffered instead."
+                    )
+            elif handlers:
+                for handler in handlers:
+                    handler.view = self
+            else:
+                request.upload_handlers.insert(0, FormsetUploadHandler(request, view=self))
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_upload_limits(self, field_path=None):
+        """
+        Return the ``accept`` attribute and the maximum size in bytes for files uploaded through the
+        widget of the field addressed by ``field_path``, which defaults to query parameter ``field``.
+        Without a field, only the maximum size configured by ``settings.FORMSET_UPLOAD_MAX_SIZE``
+        applies.
+        """
+        accept, max_size = None, getattr(settings, 'FORMSET_UPLOAD_MAX_SIZE', None)
+        if field_path := field_path or self.request.GET.get('field'):
+            try:
+                attrs = self.get_field(field_path).widget.attrs
+                accept = attrs.get('accept')
+                max_size = int(attrs.get('max-size') or 0) or max_size
+            except (AttributeError, KeyError, TypeError, ValueError):
+                pass
+        return accept, max_size
+
+    def get(self, request, *args, **kwargs):
+        if 'thumbnail' in request.GET and 'image_height' in request.GET:
+            return self._fetch_thumbnail(request.GET['thumbnail'], request.GET['image_height'])
+        if 'upload_session' in request.GET:
+            return self._upload_session_status(request.GET['upload_session'])
+        return getattr(super(), 'get', self.http_method_not_allowed)(request, *args, **kwargs)
+
     def post(self, request, **kwargs):
+        rejected = self._get_rejected_uploads(request) if request.content_type == 'multipart/form-data' else {}
+        if request.content_type == 'multipart/form-data' and 'image_height' in request.POST and rejected:
+            return HttpResponseBadRequest(rejected[0])
         if request.content_type == 'multipart/form-data' and 'temp_file' in request.FILES and 'image_height' in request.POST:
             return self._receive_uploaded_file(request.FILES['temp_file'], request.POST['image_height'])
+        if request.content_type == 'multipart/form-data' and ('temp_files' in request.FILES or rejected):
+            return self._receive_uploaded_files(
+                request.FILES.getlist('temp_files'), request.POST.getlist('image_heights'), request.POST.getlist('fields'),
+                rejected,
+            )
+        if request.content_type == 'application/json':
+            body = parse_request_body(request)
+            if isinstance(body, dict) and 'upload_session' in body:
+                return self._create_upload_session(body['upload_session'])
+            if isinstance(body, dict) and 'finalize_upload' in body:
+                return self._finalize_upload_session(body['finalize_upload'], body.get('image_height', THUMBNAIL_MAX_HEIGHT))
+            if isinstance(body, dict) and 'upload_ticket' in body:
+                return self._issue_upload_ticket(request, body['upload_ticket'])
+            if isinstance(body, dict) and 'register_upload' in body:
+                return self._register_direct_upload(body['register_upload'], body.get('image_height', THUMBNAIL_MAX_HEIGHT))
         return super().post(request, **kwargs)
 
+    def put(self, request, *args, **kwargs):
+        if 'upload_session' in request.GET and 'offset' in request.GET:
+            return self._receive_chunk(request, request.GET['upload_session'], request.GET['offset'])
+        if 'upload_ticket' in request.GET:
+            return self._receive_direct_upload(request, request.GET['upload_ticket'])
+        return getattr(super(), 'put', self.http_method_not_allowed)(request, *args, **kwargs)
+
+    @cached_property
+    def upload_signer(self):
+        return get_cookie_signer(salt='formset')
+
+    def _get_rejected_uploads(self, request):
+        """
+        Return the files skipped by the upload handler, mapping their position to the reason.
+        """
+        request.FILES  # the upload handlers reject files while parsing the request body
+        for handler in request.upload_handlers:
+            if isinstance(handler, FormsetUploadHandler):
+                return handler.rejected
+        return {}
+
     def _receive_uploaded_file(self, file_obj, image_height=None):
         """
         Iterate over all uploaded files.
         """
         if not file_obj:
             return HttpResponseBadRequest(f"File upload failed for '{file_obj.name}'.")
-        signer = get_cookie_signer(salt='formset')
+        if error := self._get_file_limit_error(file_obj):
+            return HttpResponseBadRequest(error)
+        start_upload_sweeper()
+        return JsonResponse(self._store_uploaded_file(file_obj, image_height))
 
-        temp_path = default_storage.save(UPLOAD_TEMP_DIR / file_obj.name, file_obj)
-        assert default_storage.size(temp_path) == file_obj.size
-        download_url = default_storage.url(temp_path)
+    def _receive_uploaded_files(self, file_objs, image_heights, field_paths=(), rejected=None):
+        """
+        Store a batch of uploaded files using a bounded number of threads. For each file, a line
+        containing its handle or an error is streamed back as soon as that file has been processed.
+        Each line contains the position of its file in the batch as ``index``. Since the files of a
+        batch may belong to different fields, the limits of each field are checked per file.
+        Files skipped by the upload handler are reported by their position in ``rejected``.
+        """
+        start_upload_sweeper()
+        rejected = rejected or {}
+        file_objs = list(file_objs)
+        for index in sorted(rejected):
+            file_objs.insert(index, None)
+        image_heights = image_heights + [THUMBNAIL_MAX_HEIGHT] * (len(file_objs) - len(image_heights))
+        field_paths = list(field_paths) + [None] * (len(file_objs) - len(field_paths))
+        max_workers = min(getattr(settings, 'FORMSET_UPLOAD_BATCH_WORKERS', UPLOAD_BATCH_WORKERS), len(file_objs))
+        codec = get_codec()
+
+        def store(index):
+            if index in rejected:
+                return {'index': index, 'error': rejected[index]}
+            if error := self._get_file_limit_error(file_objs[index], field_paths[index]):
+                return {'index': index, 'error': error}
+            try:
+                return dict(self._store_uploaded_file(file_objs[index], image_heights[index]), index=index)
+            except Exception as error:
+                logger.warning(f"File upload failed for '{file_objs[index].name}': {error}")
+                return {'index': index, 'error': f"File upload failed for '{file_objs[index].name}'."}
+
+        def stream():
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for future in as_completed([executor.submit(store, index) for index in range(len(file_objs))]):
+                    yield codec.dumps(future.result()) + b'\n'
 
-        # dict returned by the form on submission
-        mime_type, sub_type = split_mime_type(file_obj.content_type)
+        return StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+
+    def _store_uploaded_file(self, file_obj, image_height):
+        temp_path = store_temporary_upload(file_obj)
+        if not isinstance(file_obj, StreamedUploadedFile):
+            assert default_storage.size(temp_path) == file_obj.size
+        return self._get_file_handle(
+            temp_path, file_obj.name, file_obj.content_type, file_obj.content_type_extra, file_obj.size, image_height
+        )
+
+    def _get_file_handle(self, temp_path, name, content_type, content_type_extra, size, image_height):
+        """
+        Return the dict describing an upload waiting in the temporary folder. The client returns it
+        on form submission.
+        """
+        download_url = default_storage.url(temp_path)
+        mime_type, sub_type = split_mime_type(content_type)
+        thumbnail_pending = False
         if mime_type == 'image':
+            image_path = default_storage.path(temp_path)
             if sub_type == 'svg+xml':
-                thumbnail_url = download_url
+                thumbnail_urls = get_icon_urls(download_url)
+            elif thumbnails_exist(image_path, image_height):
+                # identical content has been uploaded before
+                thumbnail_urls = get_thumbnail_urls(default_storage, image_path, image_height)
+            elif thumbnail_pool := get_thumbnail_pool():
+                thumbnail_path = get_thumbnail_path(image_path, image_height)
+                thumbnail_pending = thumbnail_pool.submit(image_path, thumbnail_path, image_height)
+                thumbnail_urls = get_icon_urls(staticfiles_storage.url('formset/icons/file-picture.svg'))
             else:
-                thumbnail_url = thumbnail_image(default_storage, temp_path, image_height=image_height)
+                thumbnail_urls = create_thumbnails(default_storage, temp_path, image_height=image_height)
         else:
-            thumbnail_url = file_icon_url(mime_type, sub_type)
-        file_handle = {
-            'upload_temp_name': signer.sign(temp_path),
+            thumbnail_urls = get_icon_urls(file_icon_url(mime_type, sub_type))
+        return {
+            'upload_temp_name': self.upload_signer.sign(temp_path),
             'content_type': f'{mime_type}/{sub_type}',
-            'content_type_extra': file_obj.content_type_extra,
-            'name': file_obj.name[:self.filename_max_length],
+            'content_type_extra': content_type_extra,
+            'name': name[:self.filename_max_length],
             'download_url': download_url,
-            'thumbnail_url': thumbnail_url,
-            'size': file_obj.size,
+            **thumbnail_urls,
+            'thumbnail_pending': thumbnail_pending,
+            'size': size,
         }
-        return JsonResponse(file_handle)
+
+    def _get_upload_metadata(self, upload):
+        """
+        Return the metadata of a file announced by the client, or raise ``ValueError`` if invalid.
+        """
+        try:
+            metadata = {
+                'name': Path(str(upload['name'])).name,
+                'size': int(upload['size']),
+                'content_type': str(upload.get('content_type') or 'application/octet-stream'),
+            }
+        except (AttributeError, KeyError, TypeError) as error:
+            raise ValueError(upload) from error
+        if not metadata['name'] or metadata['size'] < 0:
+            raise ValueError(upload)
+        return metadata
+
+    def _get_file_limit_error(self, file_obj, field_path=None):
+        """
+        Check a received file against the limits of its widget. This also applies to files buffered
+        by Django's upload handlers, rather than being streamed by :class:`FormsetUploadHandler`.
+        """
+        metadata = {'name': file_obj.name, 'size': file_obj.size, 'content_type': file_obj.content_type}
+        if error := self._get_upload_limit_error(metadata, field_path):
+            if isinstance(file_obj, StreamedUploadedFile):
+                default_storage.delete(file_obj.object_name)
+            return error
+
+    def _get_upload_limit_error(self, metadata, field_path=None):
+        """
+        Return an error message, if the file announced by the client is not accepted by the widget
+        or exceeds its maximum size.
+        """
+        from formset.widgets import UploadedFileInput
+
+        accept, max_size = self.get_upload_limits(field_path)
+        if accept and not UploadedFileInput.accepts_content_type(accept, metadata['content_type']):
+            return f"File type '{metadata['content_type']}' is not accepted."
+        if max_size and metadata['size'] > max_size:
+            return f"File '{metadata['name']}' exceeds the maximum size."
+
+    def _create_upload_session(self, upload):
+        """
+        Start a chunked upload. The client then uploads the file in chunks using offset-addressed
+        PUT requests and finally asks to finalize that session.
+        """
+        try:
+            metadata = self._get_upload_metadata(upload)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid upload session.")
+        if error := self._get_upload_limit_error(metadata):
+            return HttpResponseBadRequest(error)
+        get_local_path(UPLOAD_SESSION_DIR, "Chunked uploads")
+        session_id = uuid.uuid4().hex
+        default_storage.save(UPLOAD_SESSION_DIR / f'{session_id}.json', ContentFile(json.dumps(metadata).encode()))
+        default_storage.save(UPLOAD_SESSION_DIR / f'{session_id}.part', ContentFile(b''))
+        signer = get_cookie_signer(salt='formset.upload_session')
+        return JsonResponse({'upload_session': signer.sign(session_id), 'offset': 0})
+
+    def _get_upload_session(self, upload_session):
+        """
+        Return the session ID and its metadata, or raise ``ValueError`` if the session is invalid.
+        """
+        signer = get_cookie_signer(salt='formset.upload_session')
+        try:
+            session_id = signer.unsign(upload_session)
+            with default_storage.open(UPLOAD_SESSION_DIR / f'{session_id}.json') as metadata_file:
+                return session_id, json.load(metadata_file)
+        except (BadSignature, OSError) as error:
+            raise ValueError(upload_session) from error
+
+    def _upload_session_status(self, upload_session):
+        try:
+            session_id, metadata = self._get_upload_session(upload_session)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid upload session.")
+        offset = default_storage.size(UPLOAD_SESSION_DIR / f'{session_id}.part')
+        return JsonResponse({'offset': offset, 'size': metadata['size']})
+
+    def _receive_chunk(self, request, upload_session, offset):
+        """
+        Write the request's body at the given offset into the file of an upload session. The chunk
+        is only accepted if its offset matches the number of bytes received so far, otherwise the
+        client is told where to resume using status 409. Since the offset is checked and the chunk
+        written while holding an exclusive lock, concurrent requests for the same offset can not
+        both be accepted.
+        """
+        try:
+            session_id, metadata = self._get_upload_session(upload_session)
+            offset = int(offset)
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid upload session.")
+        if offset + length > metadata['size']:
+            return HttpResponseBadRequest("Chunk exceeds the declared file size.")
+        part_path = get_local_path(UPLOAD_SESSION_DIR / f'{session_id}.part', "Chunked uploads")
+        with open(part_path, 'r+b') as part_file:
+            locks.lock(part_file, locks.LOCK_EX)
+            try:
+                current_offset = os.fstat(part_file.fileno()).st_size
+                if offset != current_offset:
+                    return JsonResponse({'offset': current_offset, 'size': metadata['size']}, status=409)
+                part_file.seek(offset)
+                remaining = metadata['size'] - offset
+                # stream the chunk, rather than loading it through `request.body`
+                while chunk := request.read(min(65536, remaining + 1)):
+                    if len(chunk) > remaining:
+                        part_file.truncate(offset)
+                        return HttpResponseBadRequest("Chunk exceeds the declared file size.")
+                    part_file.write(chunk)
+                    remaining -= len(chunk)
+                current_offset = part_file.tell()
+            finally:
+                part_file.flush()
+                locks.unlock(part_file)
+        return JsonResponse({'offset': current_offset, 'size': metadata['size']})
+
+    def _finalize_upload_session(self, upload_session, image_height):
+        """
+        Move the completely received file of an upload session into the temporary folder and
+        return the same handle as a non-chunked upload.
+        """
+        try:
+            session_id, metadata = self._get_upload_session(upload_session)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid upload session.")
+        part_name = UPLOAD_SESSION_DIR / f'{session_id}.part'
+        if default_storage.size(part_name) != metadata['size']:
+            return HttpResponseBadRequest("Upload is incomplete.")
+        temp_path = register_temporary_upload(part_name, metadata['name'])
+        default_storage.delete(UPLOAD_SESSION_DIR / f'{session_id}.json')
+        return JsonResponse(self._get_file_handle(
+            temp_path, metadata['name'], metadata['content_type'], {}, metadata['size'], image_height
+        ))
+
+    def _issue_upload_ticket(self, request, upload):
+        """
+        Issue a short-lived signed ticket, allowing the client to send a file directly to the
+        target offered by the backend configured through ``settings.FORMSET_UPLOAD_TICKET_BACKEND``.
+        Thereafter the client registers that upload using the same ticket.
+        """
+        if not (backend := get_upload_ticket_backend()):
+            return HttpResponseBadRequest("Direct uploads are not enabled.")
+        try:
+            metadata = self._get_upload_metadata(upload)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid upload ticket.")
+        if error := self._get_upload_limit_error(metadata):
+            return HttpResponseBadRequest(error)
+        object_name = str(UPLOAD_SESSION_DIR / f'{uuid.uuid4().hex}.ticket')
+        signer = get_cookie_signer(salt='formset.upload_ticket')
+        upload_ticket = signer.sign_object(dict(metadata, object_name=object_name))
+        return JsonResponse({
+            'upload_ticket': upload_ticket,
+            **backend.get_upload_target(request, upload_ticket, object_name, metadata),
+        })
+
+    def _get_upload_ticket(self, upload_ticket):
+        """
+        Return the metadata signed into an upload ticket, or raise ``ValueError`` if the ticket is
+        invalid or expired.
+        """
+        signer = get_cookie_signer(salt='formset.upload_ticket')
+        max_age = getattr(settings, 'FORMSET_UPLOAD_TICKET_MAX_AGE', UPLOAD_TICKET_MAX_AGE)
+        try:
+            return signer.unsign_object(str(upload_ticket), max_age=max_age)
+        except BadSignature as error:
+            raise ValueError(upload_ticket) from error
+
+    def _receive_direct_upload(self, request, upload_ticket):
+        backend = get_upload_ticket_backend()
+        if not hasattr(backend, 'receive_upload'):
+            return HttpResponseBadRequest("Direct uploads are not received by this view.")
+        try:
+            metadata = self._get_upload_ticket(upload_ticket)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid upload ticket.")
+        return backend.receive_upload(request, metadata['object_name'], metadata['size'])
+
+    def _register_direct_upload(self, upload_ticket, image_height):
+        """
+        Verify that a direct upload has been completely received and return the same handle as a
+        file uploaded through this view.
+        """
+        try:
+            metadata = self._get_upload_ticket(upload_ticket)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid upload ticket.")
+        if error := self._get_upload_limit_error(metadata):
+            return HttpResponseBadRequest(error)
+        object_name = metadata['object_name']
+        if not default_storage.exists(object_name) or default_storage.size(object_name) != metadata['size']:
+            return HttpResponseBadRequest("Upload is incomplete.")
+        start_upload_sweeper()
+        temp_path = register_temporary_upload(object_name, metadata['name'])
+        return JsonResponse(self._get_file_handle(
+            temp_path, metadata['name'], metadata['content_type'], {}, metadata['size'], image_height
+        ))
+
+    def _fetch_thumbnail(self, upload_temp_name, image_height):
+        """
+        Answer the client polling for a thumbnail rendered by the :class:`ThumbnailPool`. Responds
+        with status 202 while the thumbnail is still pending.
+        """
+        try:
+            temp_path = self.upload_signer.unsign(upload_temp_name)
+            image_height = int(image_height)
+        except (BadSignature, ValueError):
+            return HttpResponseBadRequest("Invalid thumbnail request.")
+        image_path = default_storage.path(temp_path)
+        thumbnail_path = get_thumbnail_path(image_path, image_height)
+        thumbnail_pool = get_thumbnail_pool()
+        ready = thumbnail_pool.poll(thumbnail_path) if thumbnail_pool else thumbnail_path.is_file()
+        if ready:
+            thumbnail_urls = get_thumbnail_urls(default_storage, image_path, image_height)
+        else:
+            thumbnail_urls = get_icon_urls(staticfiles_storage.url('formset/icons/file-picture.svg'))
+        return JsonResponse({
+            **thumbnail_urls,
+            'thumbnail_pending': ready is None,
+        }, status=202 if ready is None else 200)
 
 
 def depict_size(size):
@@ -1,8 +1,13 @@
 import copy
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.forms.fields import FileField
 from django.forms.utils import ErrorDict, ErrorList, RenderableMixin
 from django.utils.functional import cached_property
 from django.utils.safestring import mark_safe
@@ -11,6 +16,65 @@ from formset.renderers.default import FormRenderer
 
 MARKED_FOR_REMOVAL = '_marked_for_removal_'
 
+_render_scope = ContextVar('formset_render_scope', default=None)
+
+
+@contextmanager
+def render_scope(scope_id):
+    """
+    Context manager yielding a dict shared by all forms, collections and widgets rendered within
+    the outermost form collection. It can be used to render elements required only once per page.
+    Its ``id`` is unique for each outermost collection, and the HTML snippets added to its
+    ``epilogue`` are rendered after that collection.
+    """
+    if (scope := _render_scope.get()) is not None:
+        yield scope
+        return
+    token = _render_scope.set({'id': scope_id, 'epilogue': []})
+    try:
+        yield _render_scope.get()
+    finally:
+        _render_scope.reset(token)
+
+
+def get_render_scope():
+    """
+    Return the dict shared while rendering the outermost form collection, or ``None`` if no
+    collection is being rendered.
+    """
+    return _render_scope.get()
+
+
+class BoundedCache:
+    """
+    Thread-safe in-process cache, evicting its least recently used entries beyond ``maxsize``,
+    which can be overridden by the setting named ``setting_name``.
+    """
+    def __init__(self, maxsize, setting_name):
+        self.maxsize = maxsize
+        self.setting_name = setting_name
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        maxsize = getattr(settings, self.setting_name, self.maxsize)
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
 
 class FormsetErrorList(ErrorList):
     template_name = 'formset/default/field_errors.html'
@@ -33,6 +97,51 @@ class FormsetErrorList(ErrorList):
         }
 
 
+def flatten_errors(errors, path=()):
+    """
+    Convert the nested errors of a form or a form collection into a sparse dictionary, mapping the
+    dotted path of each field to its list of error messages. Paths without errors are omitted.
+    """
+    sparse_errors = {}
+    if isinstance(errors, dict):
+        for key, value in errors.items():
+            sparse_errors.update(flatten_errors(value, (*path, key)))
+    elif isinstance(errors, (list, tuple)):
+        if any(isinstance(item, dict) for item in errors):
+            # errors of a collection with siblings
+            for index, value in enumerate(errors):
+                sparse_errors.update(flatten_errors(value, (*path, str(index))))
+        elif len(errors):
+            sparse_errors['.'.join(path)] = [str(message) for message in errors]
+    return sparse_errors
+
+
+def clean_field(form, field_name, dependencies=()):
+    """
+    Validate a single field of a bound form by running the field's ``clean()`` method followed by
+    the form's ``clean_<field_name>()`` method, if declared. Fields listed in ``dependencies`` are
+    cleaned beforehand, so that their values are available in ``form.cleaned_data``. Return the
+    errors for that field.
+    """
+    form._errors = ErrorDict()
+    form.cleaned_data = {}
+    for name in (*dependencies, field_name):
+        bound_field = form[name]
+        field = bound_field.field
+        value = bound_field.initial if field.disabled else bound_field.data
+        try:
+            if isinstance(field, FileField):
+                value = field.clean(value, bound_field.initial)
+            else:
+                value = field.clean(value)
+            form.cleaned_data[name] = value
+            if hasattr(form, f'clean_{name}'):
+                form.cleaned_data[name] = getattr(form, f'clean_{name}')()
+        except ValidationError as error:
+            form.add_error(name, error)
+    return form._errors.get(field_name, form.error_class())
+
+
 class HolderMixin:
     ignore_marked_for_removal = getattr(settings, 'FORMSET_IGNORE_MARKED_FOR_REMOVAL', False)
     marked_for_removal = False
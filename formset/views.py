@@ -1,22 +1,23 @@
-import json
-
 from django.core.exceptions import ImproperlyConfigured
 from django.db import transaction
 from django.db.models import QuerySet
-from django.http.response import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
+from django.http.response import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
 
 try:
     from django.utils.choices import CallableChoiceIterator
 except ImportError:  # Django<5.0
     from django.forms.fields import CallableChoiceIterator
 
+from django.utils.cache import patch_vary_headers
 from django.utils.encoding import force_str
 from django.utils.functional import cached_property
 from django.views.generic.base import ContextMixin, TemplateResponseMixin, View
 from django.views.generic.detail import SingleObjectMixin
 from django.views.generic.edit import FormView as GenericFormView
 
+from formset.codec import JsonResponse, parse_request_body
 from formset.upload import FileUploadMixin
+from formset.utils import clean_field, flatten_errors
 from formset.widgets import DualSelector, Selectize
 
 
@@ -96,10 +97,49 @@ class IncompleteSelectResponseMixin:
 
 
 class FormsetResponseMixin:
+    error_format_header = 'X-Formset-Error-Format'
+
     @cached_property
     def _request_body(self):
-        if self.request.content_type == 'application/json':
-            return json.loads(self.request.body)
+        return parse_request_body(self.request)
+
+    def validate_field(self):
+        """
+        Validate a single field, for instance after it lost focus. The request body contains the
+        path to the field, its value and optionally the values of other fields in the same form it
+        depends on. Only that field is cleaned, the response contains its errors.
+        """
+        params = self._request_body['validate_field']
+        field_path = str(params.get('path'))
+        field_name = field_path.split('.')[-1]
+        dependencies = params.get('dependencies')
+        if not isinstance(dependencies, dict):
+            dependencies = {}
+        data = dict(dependencies, **{field_name: params.get('value')})
+        try:
+            form = self.get_field_form(field_path, data)
+        except (KeyError, ValueError):
+            return HttpResponseBadRequest(f"No such field: {field_path}")
+        dependencies = [name for name in dependencies.keys() if name in form.fields and name != field_name]
+        errors = clean_field(form, field_name, dependencies)
+        return JsonResponse({'errors': list(errors)})
+
+    def is_field_validation(self):
+        return isinstance(self._request_body, dict) and isinstance(self._request_body.get('validate_field'), dict)
+
+    def render_errors(self, errors):
+        """
+        Render the errors of an invalid form or form collection. If the client requests the sparse
+        error format, only paths containing errors are sent, keyed by the dotted path of the field.
+        Otherwise the errors are sent in the nested shape of the form collection.
+        """
+        if self.request.headers.get(self.error_format_header) == 'sparse':
+            response = JsonResponse(flatten_errors(errors), status=422)
+            response[self.error_format_header] = 'sparse'
+        else:
+            response = JsonResponse(errors, status=422, safe=False)
+        patch_vary_headers(response, [self.error_format_header])
+        return response
 
     def get_extra_data(self):
         """
@@ -118,6 +158,11 @@ class FormViewMixin(FormsetResponseMixin):
 
     form_kwargs = None
 
+    def post(self, request, *args, **kwargs):
+        if self.is_field_validation():
+            return self.validate_field()
+        return super().post(request, *args, **kwargs)
+
     def get_success_url(self):
         """
         In **django-formset**, the success_url may be None and set inside the templates.
@@ -131,7 +176,7 @@ class FormViewMixin(FormsetResponseMixin):
 
     def form_invalid(self, form):
         super().form_invalid(form)
-        return JsonResponse(form.errors, status=422, safe=False)
+        return self.render_errors(form.errors)
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
@@ -145,6 +190,17 @@ class FormViewMixin(FormsetResponseMixin):
         field_name = field_path.split('.')[-1]
         return self.form_class.base_fields[field_name]
 
+    def get_field_form(self, field_path, data):
+        """
+        Return the form containing the field addressed by `field_path`, bound to the given data.
+        """
+        kwargs = self.get_form_kwargs()
+        kwargs['data'] = data
+        form = self.get_form_class()(**kwargs)
+        if field_path.split('.')[-1] not in form.fields:
+            raise KeyError(f"No such field: {field_path}")
+        return form
+
 
 class FormView(IncompleteSelectResponseMixin, FileUploadMixin, FormViewMixin, GenericFormView):
     """
@@ -199,6 +255,8 @@ class FormCollectionViewMixin(FormsetResponseMixin):
         return self.render_to_response(self.get_context_data())
 
     def post(self, request, **kwargs):
+        if self.is_field_validation():
+            return self.validate_field()
         form_collection = self.get_form_collection()
         if form_collection.is_valid():
             return self.form_collection_valid(form_collection)
@@ -263,6 +321,13 @@ class FormCollectionViewMixin(FormsetResponseMixin):
         collection_class = self.get_collection_class()
         return collection_class().get_field(field_path)
 
+    def get_field_form(self, field_path, data):
+        """
+        Return the form containing the field addressed by `field_path`, bound to the given data.
+        """
+        collection_class = self.get_collection_class()
+        return collection_class().get_form(field_path).replicate(data=data)
+
     def get_collection_kwargs(self):
         kwargs = {
             'initial': self.get_initial(),
@@ -275,9 +340,8 @@ class FormCollectionViewMixin(FormsetResponseMixin):
     def get_form_collection(self):
         collection_class = self.get_collection_class()
         kwargs = self.get_collection_kwargs()
-        if self.request.method in ('PATCH', 'POST', 'PUT') and self.request.content_type == 'application/json':
-            body = json.loads(self.request.body)
-            kwargs.update(data=body.get('formset_data'))
+        if self.request.method in ('PATCH', 'POST', 'PUT') and self._request_body is not None:
+            kwargs.update(data=self._request_body.get('formset_data'))
             if callable(getattr(self, 'get_object', None)):
                 kwargs.update(instance=self.get_object())
         return collection_class(**kwargs)
@@ -296,7 +360,7 @@ class FormCollectionViewMixin(FormsetResponseMixin):
         return JsonResponse({'success_url': self.get_success_url()})
 
     def form_collection_invalid(self, form_collection):
-        return JsonResponse(form_collection._errors, status=422, safe=False)
+        return self.render_errors(form_collection._errors)
 
 
 class FormCollectionView(IncompleteSelectResponseMixin, FileUploadMixin, FormCollectionViewMixin, ContextMixin,
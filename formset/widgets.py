@@ -1,8 +1,9 @@
+import mimetypes
 import os
 import struct
 from base64 import b16encode
 from datetime import date, timedelta, timezone
-from functools import reduce
+from functools import partial, reduce
 from operator import and_, or_
 from pathlib import Path
 
@@ -21,6 +22,7 @@ from django.utils.timezone import datetime, now
 from django.utils.translation import gettext_lazy as _
 
 from formset.calendar import CalendarRenderer
+from formset.upload import StoredUploadedFile
 
 
 class Button(Widget):
@@ -363,6 +365,29 @@ class UploadedFileInput(FileInput):
     def format_value(self, value):
         return value
 
+    @staticmethod
+    def accepts_content_type(accept, content_type):
+        """
+        Return whether ``content_type`` matches the widget's ``accept`` attribute. That content type
+        is declared by the client or guessed from a file name, hence this does not validate content.
+        Malformed content types are never accepted.
+        """
+        try:
+            main_type, sub_type = content_type.split('/')
+        except (AttributeError, ValueError):
+            return False
+        if not main_type or not sub_type:
+            return False
+        for acc in accept.split(','):
+            acc = acc.strip()
+            if acc.startswith('.'):
+                # file extensions are mapped onto their content type
+                acc = mimetypes.guess_type(f'file{acc}')[0] or ''
+            acc_main, _, acc_sub = acc.partition('/')
+            if acc_main == '*' or acc_main == main_type and acc_sub in ['*', sub_type]:
+                return True
+        return False
+
     def value_from_datadict(self, data, files, name):
         handle = data.get(name)
         if isinstance(handle, (UploadedFile, bool)):
@@ -376,36 +401,41 @@ class UploadedFileInput(FileInput):
                 # widget already initialized, mark as Path to bypass ``clean()``-method
                 return Path(handle['path'])
 
-            # check if the file type corresponds to the allowed types
-            if accept := self.attrs.get('accept'):
-                main_type, sub_type = handle['content_type'].split('/')
-                try:
-                    accepted = [a.strip().split('/') for a in accept.split(',')]
-                    for acc_main, acc_sub in accepted:
-                        if acc_main == '*' or acc_main == main_type and acc_sub in ['*', sub_type]:
-                            break
-                    else:
-                        # apparently the user has tampered with the content type and bypassed the browser check
-                        # hence prevent the temporarily uploaded file from being moved to its final destination
-                        return FILE_INPUT_CONTRADICTION
-                except ValueError:
-                    pass
-
             # check if the uploaded file has been signed by the server
             signer = get_cookie_signer(salt='formset')
             upload_temp_name = signer.unsign(handle['upload_temp_name'])
+
+            # check if the file type corresponds to the allowed types
+            if accept := self.attrs.get('accept'):
+                # the client may have re-encoded an image, hence the content type guessed from the
+                # stored file's extension must be accepted as well. Neither type is derived from the
+                # file's content, so this only rejects uploads whose declared type does not fit
+                guessed_type, _ = mimetypes.guess_type(upload_temp_name)
+                if not all(self.accepts_content_type(accept, t) for t in (handle['content_type'], guessed_type) if t):
+                    # apparently the user has tampered with the content type and bypassed the browser check
+                    # hence prevent the temporarily uploaded file from being moved to its final destination
+                    return FILE_INPUT_CONTRADICTION
             file = default_storage.open(upload_temp_name, 'rb')
-            file.seek(0, os.SEEK_END)
-            size = file.tell()
-            file.seek(0)
             # create pseudo unique prefix to avoid file name collisions
             epoch = datetime(2022, 1, 1, tzinfo=timezone.utc)
             prefix = b16encode(struct.pack('f', (now() - epoch).total_seconds())).decode('utf-8')
             filename = '.'.join((prefix, handle['name']))
-            files[name] = UploadedFile(
-                file=file, name=filename, size=size, content_type=handle['content_type'],
-                content_type_extra=handle['content_type_extra'],
-            )
+            try:
+                temp_path = default_storage.path(upload_temp_name)
+            except NotImplementedError:
+                file.seek(0, os.SEEK_END)
+                size = file.tell()
+                file.seek(0)
+                files[name] = UploadedFile(
+                    file=file, name=filename, size=size, content_type=handle['content_type'],
+                    content_type_extra=handle['content_type_extra'],
+                )
+            else:
+                # the temporary file can be moved to its final destination, rather than being copied
+                files[name] = StoredUploadedFile(
+                    temp_path, file=file, name=filename, size=os.path.getsize(temp_path),
+                    content_type=handle['content_type'], content_type_extra=handle['content_type_extra'],
+                )
         return files.get(name)
 
 
@@ -462,12 +492,26 @@ class CalendarRendererMixin:
 
     def get_context(self, name, value, attrs):
         context = super().get_context(name, value, attrs)
+        context['calendar'] = self.get_calendar_context(value)
+        return context
+
+    def get_calendar_context(self, value, interval=None):
+        """
+        Only the sheet of the starting view mode is rendered. It is shared by all widgets starting
+        with the same date, for instance the siblings of a collection.
+        """
         if isinstance(self.calendar_renderer, type):
             calendar_renderer = self.calendar_renderer(start_datetime=value)
         else:
             calendar_renderer = self.calendar_renderer
-        context['calendar'] = calendar_renderer.get_context()
-        return context
+        view_mode = calendar_renderer.starting_view_mode
+        return {
+            'startdate': calendar_renderer.start_datetime,
+            'template': calendar_renderer.get_template_name(view_mode),
+            'sheet_data': calendar_renderer.sheet_data,
+            'sheet': partial(calendar_renderer.render, view_mode, interval=interval),
+            'range_sheet': partial(calendar_renderer.render, view_mode, pure=True, interval=interval),
+        }
 
 
 class DateTextbox(DateTimeBaseInput):
@@ -522,14 +566,8 @@ class DatePicker(CalendarRendererMixin, DateTextbox):
             default_attrs.update(**attrs)
         super().__init__(attrs=default_attrs, calendar_renderer=calendar_renderer)
 
-    def get_context(self, name, value, attrs):
-        context = super().get_context(name, value, attrs)
-        if isinstance(self.calendar_renderer, type):
-            calendar_renderer = self.calendar_renderer(start_datetime=value)
-        else:
-            calendar_renderer = self.calendar_renderer
-        context['calendar'] = calendar_renderer.get_context(self.interval)
-        return context
+    def get_calendar_context(self, value, interval=None):
+        return super().get_calendar_context(value, self.interval)
 
 
 class DateTimeTextbox(DateTimeBaseInput):
@@ -0,0 +1,31 @@
+"""
+Micro benchmarks for **django-formset**. Run them from the project root, for instance as:
+
+    python -m testapp.benchmarks.codec
+"""
+import os
+import timeit
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'testapp.settings')
+    import django
+
+    django.setup()
+
+
+def measure(func, number=None, repeat=5):
+    """
+    Return the best time per call in microseconds.
+    """
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1E6
+
+
+def print_table(title, columns, rows):
+    print(f"\n{title}")
+    print(' '.join(f'{c:>14}' if i else f'{c:<32}' for i, c in enumerate(columns)))
+    for row in rows:
+        print(' '.join(f'{c:>14.1f}' if i else f'{c:<32}' for i, c in enumerate(row)))
@@ -0,0 +1,66 @@
+"""
+Compare the JSON codecs on payloads representative for submissions and responses.
+"""
+from testapp.benchmarks import measure, print_table, setup_django
+
+
+def build_payloads():
+    from django.core.exceptions import ValidationError
+    from django.forms.utils import ErrorDict, ErrorList
+    from django.utils.translation import gettext_lazy
+
+    person = {'first_name': "John", 'last_name': "Doe", 'email': "john@example.com", 'birth_date': '1980-04-01'}
+    numbers = [{'number': {'phone_number': f'+4112345{n:04d}', 'label': 'work'}} for n in range(200)]
+    richtext = {'type': 'doc', 'content': [{
+        'type': 'paragraph',
+        'content': [
+            {'type': 'text', 'text': "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3},
+            {'type': 'text', 'marks': [{'type': 'bold'}], 'text': "Sed do eiusmod."},
+        ],
+    } for _ in range(100)]}
+    errors = ErrorDict(person=ErrorDict(email=ErrorList([ValidationError("Enter a valid email address.")])))
+    errors['numbers'] = [
+        ErrorDict(number=ErrorDict(label=ErrorList([gettext_lazy("This field is required.")])) if n % 10 else {})
+        for n in range(200)
+    ]
+    options = {
+        'count': 250, 'total_count': 10000, 'incomplete': True,
+        'options': [{'id': n, 'label': f"Option {n}"} for n in range(250)],
+    }
+    return {
+        'small form': {'formset_data': person},
+        'collection (200 siblings)': {'formset_data': {'person': person, 'numbers': numbers}},
+        'rich text (100 paragraphs)': {'formset_data': {'article': {'body': richtext}}},
+        'errors (200 siblings)': errors,
+        'select options (250)': options,
+    }
+
+
+def main():
+    setup_django()
+
+    from formset.codec import JSONCodec, MsgspecCodec, OrjsonCodec
+
+    codecs = {'json': JSONCodec()}
+    for name, codec_class in [('orjson', OrjsonCodec), ('msgspec', MsgspecCodec)]:
+        try:
+            codecs[name] = codec_class()
+        except ImportError:
+            print(f"{name} is not installed, skipping")
+
+    payloads = build_payloads()
+    reference = codecs['json']
+    decode_rows, encode_rows = [], []
+    for label, payload in payloads.items():
+        raw = reference.dumps(payload)
+        encode_rows.append([label] + [measure(lambda: c.dumps(payload)) for c in codecs.values()])
+        if label.startswith(('errors', 'select')):
+            continue  # these payloads are only ever encoded
+        decode_rows.append([label] + [measure(lambda: c.loads(raw)) for c in codecs.values()])
+    columns = ['payload (µs per call)', *codecs.keys()]
+    print_table("Decoding submissions", columns, decode_rows)
+    print_table("Encoding responses", columns, encode_rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Compare rendering rich text documents through the recursive templates with the node visitor.
+"""
+from testapp.benchmarks import measure, print_table, setup_django
+
+
+def build_document(paragraphs):
+    content = []
+    for n in range(paragraphs):
+        if n % 10 == 0:
+            content.append({'type': 'heading', 'attrs': {'level': 2}, 'content': [{'type': 'text', 'text': f"Section {n}"}]})
+        content.append({
+            'type': 'paragraph',
+            'attrs': {'textAlign': 'left' if n % 2 else 'center'},
+            'content': [
+                {'type': 'text', 'text': "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "},
+                {'type': 'text', 'marks': [{'type': 'bold'}], 'text': "Sed do eiusmod"},
+                {'type': 'text', 'text': " tempor incididunt ut labore et dolore magna aliqua, "},
+                {'type': 'text', 'marks': [{'type': 'simple_link', 'attrs': {'href': 'https://example.org/'}}], 'text': "see here"},
+                {'type': 'text', 'text': "."},
+            ],
+        })
+        if n % 5 == 0:
+            content.append({'type': 'bulletList', 'content': [{
+                'type': 'listItem',
+                'content': [{'type': 'paragraph', 'content': [{'type': 'text', 'text': f"Item {i}"}]}],
+            } for i in range(3)]})
+    return {'type': 'doc', 'content': content}
+
+
+def main():
+    setup_django()
+
+    from django.template.loader import get_template
+    from django.utils.html import strip_spaces_between_tags
+
+    from formset.richtext.renderer import RichtextRenderer
+
+    template = get_template('richtext/doc.html')
+    renderer = RichtextRenderer()
+
+    def render_templates(document):
+        html = template.render({'node': document, 'framework': 'default', 'richtext_footnotes': []})
+        return strip_spaces_between_tags(html.replace('\t', '').replace('\n', ''))
+
+    rows = []
+    for paragraphs in [10, 100, 500]:
+        document = build_document(paragraphs)
+        assert render_templates(document) == renderer.render(document)
+        rows.append([
+            f'{paragraphs} paragraphs',
+            measure(lambda: render_templates(document), repeat=3),
+            measure(lambda: renderer.render(document), repeat=3),
+        ])
+    print_table("Rendering rich text", ['document (µs per call)', 'templates', 'visitor'], rows)
+
+
+if __name__ == '__main__':
+    main()
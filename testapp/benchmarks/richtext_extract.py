@@ -0,0 +1,27 @@
+"""
+Compare extracting the plain text of rich text documents by rendering them into HTML and stripping
+the tags, with iterating over their text runs.
+"""
+from testapp.benchmarks import measure, print_table, setup_django
+from testapp.benchmarks.richtext import build_document
+
+
+def main():
+    setup_django()
+
+    from django.utils.html import strip_tags
+
+    from formset.richtext.extract import extract_richtext
+    from formset.richtext.renderer import render_richtext
+
+    rows = []
+    for paragraphs in [10, 100, 500]:
+        document = build_document(paragraphs)
+        rendered = measure(lambda: strip_tags(render_richtext(document)), repeat=3)
+        extracted = measure(lambda: extract_richtext(document), repeat=3)
+        rows.append([f'{paragraphs} paragraphs', 1E6 / rendered, 1E6 / extracted])
+    print_table("Extracting plain text", ['document (documents per second)', 'render+strip', 'extract'], rows)
+
+
+if __name__ == '__main__':
+    main()
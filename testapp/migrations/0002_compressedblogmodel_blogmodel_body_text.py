@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:10
+
+import formset.richtext.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompressedBlogModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('body', formset.richtext.fields.RichTextField(compressed=True, null=True)),
+                ('legacy_body', formset.richtext.fields.RichTextField(null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='blogmodel',
+            name='body_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -2,7 +2,7 @@ from .article import Article, Reporter
 from .annotation import Annotation
 from .company import Company, Department, Team
 from .county import County, CountyUnnormalized, State
-from .blog import BlogModel
+from .blog import BlogModel, CompressedBlogModel
 from .issue import IssueModel
 from .page import PageModel
 from .person import PersonModel, UserContact
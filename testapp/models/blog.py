@@ -6,8 +6,20 @@ from formset.richtext.fields import RichTextField
 class BlogModel(models.Model):
     body = RichTextField()
 
+    body_text = models.TextField(
+        editable=False,
+        blank=True,
+    )
+
     created_by = models.CharField(
         editable=False,
         max_length=40,
         db_index=True,
     )
+
+
+class CompressedBlogModel(models.Model):
+    body = RichTextField(compressed=True, null=True)
+
+    # holds the documents until they have been compressed into field ``body``
+    legacy_body = RichTextField(null=True)
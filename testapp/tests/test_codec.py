@@ -0,0 +1,137 @@
+import pytest
+
+import json
+from datetime import datetime
+from decimal import Decimal
+from django.core.exceptions import BadRequest, ImproperlyConfigured, RequestDataTooBig, SuspiciousOperation, ValidationError
+from django.forms.utils import ErrorDict, ErrorList
+from django.test import RequestFactory, override_settings
+from django.utils.safestring import mark_safe
+from django.utils.translation import gettext_lazy
+
+from formset.codec import (
+    JSONCodec, JsonResponse, MsgspecCodec, OrjsonCodec, get_codec, load_codec, parse_request_body,
+)
+from formset.views import FormCollectionView
+
+from testapp.forms.contact import SimpleContactCollection
+from testapp.forms.person import sample_person_data
+
+
+def available_codecs():
+    codecs = [JSONCodec()]
+    for codec_class in (OrjsonCodec, MsgspecCodec):
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            pass
+    return codecs
+
+
+@pytest.mark.parametrize('codec', available_codecs(), ids=lambda c: c.__class__.__name__)
+def test_codec_encodes_errors(codec):
+    errors = ErrorDict(
+        first_name=ErrorList([ValidationError("Invalid value.")]),
+        last_name=ErrorList([gettext_lazy("This field is required.")]),
+    )
+    payload = {
+        'person': errors,
+        'numbers': [ErrorDict(), ErrorDict(label=ErrorList(["Bad label."]))],
+        'date': datetime(2024, 3, 1, 12, 30),
+    }
+    assert json.loads(codec.dumps(payload)) == json.loads(JSONCodec().dumps(payload)) == {
+        'person': {'first_name': ["Invalid value."], 'last_name': ["This field is required."]},
+        'numbers': [{}, {'label': ["Bad label."]}],
+        'date': '2024-03-01T12:30:00',
+    }
+
+
+@pytest.mark.parametrize('codec', available_codecs(), ids=lambda c: c.__class__.__name__)
+def test_codec_encodes_safe_strings(codec):
+    payload = {'label': mark_safe("<b>Name</b>"), 'help_texts': [mark_safe("Your <i>full</i> name")]}
+    assert json.loads(codec.dumps(payload)) == {'label': "<b>Name</b>", 'help_texts': ["Your <i>full</i> name"]}
+
+
+@pytest.mark.parametrize('codec', available_codecs(), ids=lambda c: c.__class__.__name__)
+def test_codec_decodes(codec):
+    assert codec.loads(b'{"formset_data": {"a": [1, 2.5, null, "\xc3\xa4"]}}') == {
+        'formset_data': {'a': [1, 2.5, None, "ä"]},
+    }
+    with pytest.raises(ValueError):
+        codec.loads(b'{"formset_data":')
+
+
+@override_settings(FORMSET_JSON_CODEC='auto')
+def test_json_response_arguments():
+    class DecimalEncoder(json.JSONEncoder):
+        def default(self, obj):
+            return str(obj) if isinstance(obj, Decimal) else super().default(obj)
+
+    response = JsonResponse({'price': Decimal('9.90')}, encoder=DecimalEncoder, json_dumps_params={'indent': 2})
+    assert response.content == b'{\n  "price": "9.90"\n}'
+    response = JsonResponse([1, 2], safe=False)
+    assert json.loads(response.content) == [1, 2]
+
+
+def test_unknown_codec():
+    with pytest.raises(ImproperlyConfigured):
+        load_codec('testapp.no_such_codec')
+
+
+@override_settings(FORMSET_JSON_CODEC='auto')
+def test_auto_codec():
+    assert get_codec().__class__ in (OrjsonCodec, MsgspecCodec, JSONCodec)
+
+
+def test_parse_once(mocker):
+    request = RequestFactory().post('/', data={'formset_data': {}}, content_type='application/json')
+    loads = mocker.spy(JSONCodec, 'loads')
+    assert parse_request_body(request) == {'formset_data': {}}
+    assert parse_request_body(request) == {'formset_data': {}}
+    assert loads.call_count == 1
+
+
+def test_collection_parses_body_once(mocker):
+    view = FormCollectionView.as_view(
+        collection_class=SimpleContactCollection,
+        template_name='testapp/form-collection.html',
+        success_url='/success',
+    )
+    formset_data = {
+        'person': dict(sample_person_data, last_name="Jones"),
+        'profession': {'company': "Awesome Co.", 'job_title': "Boss"},
+    }
+    request = RequestFactory().post('/', data={'formset_data': formset_data}, content_type='application/json')
+    loads = mocker.spy(JSONCodec, 'loads')
+    response = view(request)
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/json'
+    assert json.loads(response.content) == {'success_url': '/success'}
+    assert loads.call_count == 1
+
+
+def test_invalid_json():
+    request = RequestFactory().post('/', data=b'{"formset_data": [', content_type='application/json')
+    with pytest.raises(BadRequest):
+        parse_request_body(request)
+
+
+@override_settings(FORMSET_MAX_BODY_SIZE=100)
+def test_body_size_guard():
+    request = RequestFactory().post('/', data={'formset_data': {'x': 'y' * 100}}, content_type='application/json')
+    with pytest.raises(RequestDataTooBig):
+        parse_request_body(request)
+
+
+@override_settings(FORMSET_MAX_BODY_DEPTH=10)
+def test_body_depth_guard(mocker):
+    loads = mocker.spy(JSONCodec, 'loads')
+    request = RequestFactory().post('/', data=b'[' * 11 + b']' * 11, content_type='application/json')
+    with pytest.raises(SuspiciousOperation):
+        parse_request_body(request)
+    assert loads.call_count == 0
+
+    # brackets inside strings do not count
+    data = json.dumps({'formset_data': {'text': '[[[[[[[[[[[{{{{{{{{{{ \\"[[['}})
+    request = RequestFactory().post('/', data=data, content_type='application/json')
+    assert parse_request_body(request)['formset_data']['text'].startswith('[[[[')
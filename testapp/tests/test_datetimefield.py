@@ -1,11 +1,22 @@
+import json
 from bs4 import BeautifulSoup
 from datetime import timedelta
 
 import pytest
 
+from django.test import RequestFactory
 from django.utils.timezone import datetime
+from django.utils.translation import override
+from django.views.generic import View
 
-from formset.calendar import CalendarRenderer, ViewMode
+from formset import calendar
+from formset.calendar import CalendarRenderer, CalendarResponseMixin, ViewMode
+from formset.ranges import DateRangeCalendar
+from formset.widgets import DatePicker
+
+
+class CalendarView(CalendarResponseMixin, View):
+    pass
 
 
 @pytest.mark.parametrize('hour12', [False, True])
@@ -120,3 +131,116 @@ def test_render_years():
     assert str(years.contents[3]) == '<li data-date="2023-01-01">2023</li>'
     assert str(years.contents[19]) == '<li data-date="2039-01-01">2039</li>'
     assert len(years.contents) == 20
+
+
+def test_render_cached(mocker):
+    calendar._calendar_sheets.clear()
+    spy = mocker.spy(CalendarRenderer, 'render_sheet')
+    html = CalendarRenderer(start_datetime=datetime(2023, 1, 18)).render(ViewMode.months)
+    assert CalendarRenderer(start_datetime=datetime(2023, 1, 18)).render(ViewMode.months) == html
+    assert spy.call_count == 1
+    with override('de'):
+        german = CalendarRenderer(start_datetime=datetime(2023, 1, 18)).render(ViewMode.months)
+    assert spy.call_count == 2
+    assert '<li data-date="2023-03-01">März</li>' in german
+
+
+def test_render_cached_sheet_date(mocker, settings):
+    calendar._calendar_sheets.clear()
+    spy = mocker.spy(CalendarRenderer, 'render_sheet')
+    html = CalendarRenderer(start_datetime=datetime(2023, 1, 18, 9, 41)).render(ViewMode.weeks)
+    assert '<time datetime="2023-01-18T00:00:00">' in html
+    # widgets rendered without a value start at the current minute, but share the sheet of that day
+    for start_datetime in [datetime(2023, 1, 18, 9, 42), datetime(2023, 1, 18), datetime(2023, 1, 18, 23, 59)]:
+        assert CalendarRenderer(start_datetime=start_datetime).render(ViewMode.weeks) == html
+    CalendarRenderer(start_datetime=datetime(2023, 1, 19)).render(ViewMode.weeks)
+    assert spy.call_count == 2
+    # the first weekday is part of the cache key
+    CalendarRenderer(firstweekday=6, start_datetime=datetime(2023, 1, 18)).render(ViewMode.weeks)
+    assert spy.call_count == 3
+
+    # renderers with customized context render each sheet
+    class HolidayRenderer(CalendarRenderer):
+        def get_context_weeks(self):
+            return dict(super().get_context_weeks(), holidays=[])
+
+    HolidayRenderer(start_datetime=datetime(2023, 1, 18)).render(ViewMode.weeks)
+    HolidayRenderer(start_datetime=datetime(2023, 1, 18)).render(ViewMode.weeks)
+    assert spy.call_count == 5
+
+    # the size of the cache is read when adding sheets
+    settings.FORMSET_CALENDAR_CACHE_SIZE = 2
+    for month in range(1, 5):
+        CalendarRenderer(start_datetime=datetime(2023, month, 1)).render(ViewMode.weeks)
+    assert len(calendar._calendar_sheets.entries) == 2
+
+
+def test_calendar_response():
+    view = CalendarView.as_view()
+    request = RequestFactory().get('/', {'calendar': '', 'date': '2023-01-18', 'mode': 'w'})
+    response = view(request)
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'private, max-age=3600'
+    assert response.headers['Vary'] == 'Accept-Language, Cookie'
+    etag = response.headers['ETag']
+    request = RequestFactory().get('/', {'calendar': '', 'date': '2023-01-18', 'mode': 'w'}, HTTP_IF_NONE_MATCH=etag)
+    response = view(request)
+    assert response.status_code == 304
+    request = RequestFactory().get('/', {'calendar': '', 'date': 'invalid', 'mode': 'w'})
+    assert view(request).status_code == 400
+
+
+def test_widgets_share_starting_sheet(mocker):
+    calendar._calendar_sheets.clear()
+    hours_spy = mocker.spy(CalendarRenderer, 'get_context_hours')
+    weeks_spy = mocker.spy(CalendarRenderer, 'get_context_weeks')
+    value = datetime(2023, 5, 17)
+    html = [DatePicker().render(f'date_{i}', value) for i in range(5)]
+    assert hours_spy.call_count == 0
+    assert weeks_spy.call_count == 1
+    assert html[0].count('class="controls weeks-view"') == 1
+    assert 'class="aside-left"' not in html[0]
+    html = DateRangeCalendar().render('range', value)
+    assert weeks_spy.call_count == 2
+    assert 'class="aside-left"' in html
+
+
+def test_calendar_data_response():
+    view = CalendarView.as_view()
+    request = RequestFactory().get('/', {'calendar': '', 'format': 'json', 'date': '2023-01-18', 'mode': 'm'})
+    response = view(request)
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'application/json'
+    assert response.headers['Cache-Control'] == 'private, max-age=3600'
+    data = json.loads(response.content)
+    assert data['mode'] == 'm'
+    assert data['prev'] == '2022-01-18'
+    assert data['cells'][2] == '2023-03-01'
+    request = RequestFactory().get('/', {'calendar': '', 'format': 'json', 'date': '2023-01-18', 'mode': 'w'})
+    data = json.loads(view(request).content)
+    assert data['cells'][0] == ['2022-12-26', 1]
+    assert data['cells'][6] == ['2023-01-01', 0]
+
+    with override('de'):
+        request = RequestFactory().get('/', {'calendar': '', 'format': 'json', 'tables': ''})
+        tables = json.loads(view(request).content)
+    assert tables['language'] == 'de'
+    assert tables['weekdays'][0] == ['Mo', 'Montag']
+    assert tables['months'][2] == 'März'
+    assert '<svg' in tables['icons']['today']
+
+
+def test_customized_renderer_without_data():
+    class TemplateRenderer(CalendarRenderer):
+        def get_template_name(self, view_mode):
+            return super().get_template_name(view_mode)
+
+    class TemplateView(CalendarResponseMixin, View):
+        calendar_renderer_class = TemplateRenderer
+
+    assert CalendarRenderer.sheet_data is True
+    assert TemplateRenderer.sheet_data is False
+    request = RequestFactory().get('/', {'calendar': '', 'format': 'json', 'date': '2023-01-18', 'mode': 'm'})
+    assert TemplateView.as_view()(request).status_code == 400
+    assert 'data-format="json"' in DatePicker().render('date', datetime(2023, 5, 17))
+    assert 'data-format' not in DatePicker(calendar_renderer=TemplateRenderer).render('date', datetime(2023, 5, 17))
@@ -8,6 +8,7 @@ from django.forms import fields, forms
 from django.test import RequestFactory
 
 from formset.collection import COLLECTION_ERRORS, FormCollection
+from formset.utils import MARKED_FOR_REMOVAL, HolderMixin
 from formset.views import EditCollectionView, FormCollectionView
 
 from testapp.forms.company import CompanyCollection
@@ -313,3 +314,93 @@ def test_check_missing_collection_data(contact_collection_view):
         'person': {NON_FIELD_ERRORS: ['Form data is missing.']},
         'numbers': {NON_FIELD_ERRORS: ['Form data is missing.']}
     }
+
+
+def test_reject_too_many_siblings_early(contact_collection_view, mocker):
+    replicate = mocker.spy(HolderMixin, 'replicate')
+    form_data = {
+        'formset_data': {
+            'person': {'full_name': "John Doe"},
+            'numbers': [{'number': {'phone_number': "+41 91 667914"}}] * 1000,
+        }
+    }
+    request = RequestFactory().post('/', form_data, content_type='application/json')
+    response = contact_collection_view(request)
+    assert response.status_code == 422
+    response_body = json.loads(response.getvalue())
+    assert response_body == {
+        'person': {},
+        'numbers': [{COLLECTION_ERRORS: ['Too many entries in “PhoneNumberCollection”, please remove one.']}]
+    }
+    assert replicate.call_count == 0
+
+
+def test_siblings_marked_for_removal_are_not_counted(contact_collection_view):
+    form_data = {
+        'formset_data': {
+            'person': {'full_name': "John Doe"},
+            'numbers': [
+                {'number': {'phone_number': "+1 234 567 8900"}},
+                {'number': {'phone_number': "+33 1 43478293"}},
+                {'number': {'phone_number': "+39 335 327041", MARKED_FOR_REMOVAL: True}},
+                None,
+                {'number': {'phone_number': "+41 91 667914"}},
+            ],
+        }
+    }
+    request = RequestFactory().post('/', form_data, content_type='application/json')
+    response = contact_collection_view(request)
+    assert response.status_code == 200
+
+
+def test_reject_unknown_keys(contact_collection_view, mocker):
+    replicate = mocker.spy(HolderMixin, 'replicate')
+    form_data = {
+        'formset_data': {
+            'person': {'full_name': "John Doe"},
+            'numbers': [{'number': {'phone_number': "+41 91 667914"}}],
+            'bogus': {'full_name': "John Doe"},
+        }
+    }
+    request = RequestFactory().post('/', form_data, content_type='application/json')
+    response = contact_collection_view(request)
+    assert response.status_code == 422
+    response_body = json.loads(response.getvalue())
+    assert response_body == {
+        NON_FIELD_ERRORS: ['Submitted data contains unknown key “bogus”.'],
+        'person': {},
+        'numbers': [],
+    }
+    assert replicate.call_count == 0
+
+
+@pytest.mark.parametrize('numbers', [
+    {'number': {'phone_number': "+41 91 667914"}},
+    [{'number': [{'phone_number': "+41 91 667914"}]}],
+    [{'number': {'phone_number': "+41 91 667914"}, 'person': {'full_name': "John Doe"}}],
+])
+def test_reject_malformed_nesting(contact_collection_view, numbers):
+    form_data = {
+        'formset_data': {
+            'person': {'full_name': "John Doe"},
+            'numbers': numbers,
+        }
+    }
+    request = RequestFactory().post('/', form_data, content_type='application/json')
+    response = contact_collection_view(request)
+    assert response.status_code == 422
+    response_body = json.loads(response.getvalue())
+    assert response_body == {
+        'person': {},
+        'numbers': [{COLLECTION_ERRORS: ['Submitted data for “PhoneNumberCollection” is malformed.']}]
+    }
+
+
+@pytest.mark.parametrize('numbers, message', [
+    ([{'number': {'phone_number': "+41 91 667914"}}] * 5, 'Too many entries in “PhoneNumberCollection”, please remove one.'),
+    ([{'number': {'phone_number': "+41 91 667914"}, 'bogus': {}}], 'Submitted data for “PhoneNumberCollection” is malformed.'),
+])
+def test_reject_top_level_siblings(numbers, message):
+    collection = PhoneNumberCollection(data=numbers)
+    assert collection.is_valid() is False
+    assert collection.errors == [{COLLECTION_ERRORS: [message]}]
@@ -3,6 +3,7 @@ import pytest
 import json
 from bs4 import BeautifulSoup
 from copy import copy
+from django.core.exceptions import ValidationError
 from django.forms.fields import CharField
 from django.forms.forms import Form
 from django.test import RequestFactory
@@ -328,3 +329,105 @@ def test_collection_post(counter, formset_data):
     if counter == 6:
         assert response.status_code == 200
         assert body['success_url'] == '/success'
+
+
+@pytest.mark.parametrize('counter,formset_data', enumerate(collection_formset_data))
+def test_collection_post_sparse_errors(counter, formset_data):
+    view = FormCollectionView.as_view(
+        collection_class=ContactCollection,
+        success_url='/success',
+        template_name='bootstrap/form-collection.html',
+    )
+    headers = {'X-Formset-Error-Format': 'sparse'}
+    http_request = RequestFactory().post(
+        '/', data={'formset_data': formset_data}, content_type='application/json', headers=headers,
+    )
+    response = view(http_request)
+    body = json.loads(response.content)
+    if formset_data['person'] == sample_person_data and counter != 1:
+        # too many siblings are rejected before any form is validated
+        assert body.pop('person.__all__') == ["John Doe is persona non grata here!"]
+    if counter == 0:
+        assert body == {
+            f'numbers.0.{COLLECTION_ERRORS}': ["Not enough entries in “List of Phone Numbers”, please add another."],
+        }
+    if counter == 1:
+        assert body == {
+            f'numbers.0.{COLLECTION_ERRORS}': ["Too many entries in “List of Phone Numbers”, please remove one."],
+        }
+    if counter == 2:
+        assert body == {'numbers.1.number.phone_number': ["Are you kidding me?"]}
+    if counter == 3:
+        assert body == {'numbers.0.number.label': ["This field is required."]}
+    if counter == 4:
+        assert body == {'numbers.1.number.phone_number': ["Enter a valid value."]}
+    if counter == 5:
+        assert body == {}
+    if counter == 6:
+        assert response.status_code == 200
+        assert body['success_url'] == '/success'
+    else:
+        assert response.status_code == 422
+        assert response['X-Formset-Error-Format'] == 'sparse'
+
+
+class BookingForm(Form):
+    first_night = CharField()
+    last_night = CharField()
+
+    def clean_last_night(self):
+        if self.cleaned_data.get('first_night', '') > self.cleaned_data['last_night']:
+            raise ValidationError("Last night must be after first night.")
+        return self.cleaned_data['last_night']
+
+
+@pytest.mark.parametrize('validate_field,expected', [
+    ({'path': 'last_night', 'value': '2024-01-05', 'dependencies': {'first_night': '2024-01-01'}}, []),
+    ({'path': 'last_night', 'value': '2024-01-05', 'dependencies': {'first_night': '2024-01-09'}},
+     ["Last night must be after first night."]),
+    ({'path': 'first_night', 'value': ''}, ["This field is required."]),
+])
+def test_form_validate_field(validate_field, expected, mocker):
+    clean = mocker.spy(BookingForm, 'clean')
+    view = FormView.as_view(form_class=BookingForm, template_name='testapp/native-form.html')
+    http_request = RequestFactory().post(
+        '/', data={'validate_field': validate_field}, content_type='application/json',
+    )
+    response = view(http_request)
+    assert response.status_code == 200
+    assert json.loads(response.content) == {'errors': expected}
+    assert clean.call_count == 0
+
+
+@pytest.mark.parametrize('validate_field,expected', [
+    ({'path': 'numbers.3.number.phone_number', 'value': '+123456789'}, ["Are you kidding me?"]),
+    ({'path': 'numbers.0.number.phone_number', 'value': '+41 91 667914'}, []),
+    ({'path': 'numbers.0.number.phone_number', 'value': 'abc'}, ["Enter a valid value."]),
+    ({'path': 'person.last_name', 'value': 'Doe', 'dependencies': {'first_name': 'John'}}, []),
+])
+def test_collection_validate_field(validate_field, expected, mocker):
+    replicate = mocker.spy(FormCollection, 'replicate')
+    view = FormCollectionView.as_view(
+        collection_class=ContactCollection,
+        template_name='testapp/form-collection.html',
+    )
+    http_request = RequestFactory().post(
+        '/', data={'validate_field': validate_field}, content_type='application/json',
+    )
+    response = view(http_request)
+    assert response.status_code == 200
+    assert json.loads(response.content) == {'errors': expected}
+    assert replicate.call_count == 0
+
+
+@pytest.mark.parametrize('path', ['numbers.number.phone_number', 'person.unknown', 'unknown.first_name'])
+def test_collection_validate_unknown_field(path):
+    view = FormCollectionView.as_view(
+        collection_class=ContactCollection,
+        template_name='testapp/form-collection.html',
+    )
+    http_request = RequestFactory().post(
+        '/', data={'validate_field': {'path': path, 'value': 'x'}}, content_type='application/json',
+    )
+    response = view(http_request)
+    assert response.status_code == 400
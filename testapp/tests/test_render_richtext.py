@@ -1,12 +1,19 @@
 import pytest
 
+import json
+from io import StringIO
+
 from django.conf import settings
 from django.core.management import call_command
 from django.views.generic import TemplateView
-from django.template.loader import render_to_string
+from django.template.loader import get_template, render_to_string
 from django.utils.html import strip_spaces_between_tags
 
+from formset.richtext import renderer
+from formset.richtext.renderer import RichtextRenderer, get_richtext_cache, is_builtin_template, render_richtext
+
 from testapp.models import PageModel
+from testapp.models.blog import BlogModel
 
 
 class TiptapView(TemplateView):
@@ -370,6 +377,76 @@ def test_render_alternative_template():
     assert html == '<article><p>This is <strong>bold</strong><em>and italic</em> text.</p></article>'
 
 
+sample_document = {
+    'type': 'doc',
+    'content': [{
+        'type': 'heading',
+        'attrs': {'level': 2},
+        'content': [{'type': 'text', 'text': 'Fish & <Chips>'}],
+    }, {
+        'type': 'paragraph',
+        'attrs': {'textAlign': 'center', 'textIndent': 'indent'},
+        'content': [{
+            'type': 'text',
+            'marks': [{'type': 'bold'}, {'type': 'italic'}],
+            'text': 'Both',
+        }, {
+            'type': 'text',
+            'marks': [{'type': 'textcolor', 'attrs': {'textColor': 'rgb(255, 0, 0)'}}],
+            'text': ' red',
+        }, {
+            'type': 'text',
+            'marks': [{'type': 'textcolor', 'attrs': {'textColor': 'text-primary', 'classBased': True}}],
+            'text': ' primary',
+        }, {
+            'type': 'text',
+            'marks': [{'type': 'simple_link', 'attrs': {'href': 'https://example.org/?a=1&b="2"'}}],
+            'text': 'link',
+        }, {
+            'type': 'text',
+            'marks': [{'type': 'simple_link', 'attrs': {}}, {'type': 'code'}, {'type': 'underline'}],
+            'text': 'x < y',
+        }, {
+            'type': 'footnote',
+            'attrs': {'content': {'type': 'doc', 'content': [{'type': 'paragraph', 'content': [
+                {'type': 'text', 'text': 'A note'},
+            ]}]}},
+        }],
+    }, {
+        'type': 'horizontalRule',
+    }, {
+        'type': 'paragraph',
+    }, {
+        'type': 'bulletList',
+        'content': [{
+            'type': 'listItem',
+            'content': [{'type': 'paragraph', 'content': [{'type': 'text', 'text': 'Item\twith\ttabs'}]}],
+        }, {
+            'type': 'listItem',
+            'content': [{'type': 'orderedList', 'content': [{
+                'type': 'listItem',
+                'content': [{'type': 'paragraph', 'content': [{'type': 'text', 'text': 'Nested'}]}],
+            }]}],
+        }],
+    }],
+}
+
+
+@pytest.mark.parametrize('framework', ['default', 'bootstrap'])
+def test_renderer_matches_templates(framework):
+    template = get_template('richtext/doc.html')
+    html = template.render({'node': sample_document, 'framework': framework, 'richtext_footnotes': []})
+    assert RichtextRenderer(framework).render(sample_document) == strip_spaces_between_tags(
+        html.replace('\t', '').replace('\n', '')
+    )
+
+
+def test_renderer_uses_overridden_templates():
+    assert is_builtin_template('richtext/paragraph.html') is True
+    assert is_builtin_template('richtext/marks/custom_hyperlink.html') is False
+    assert is_builtin_template('richtext/no_such_node.html') is False
+
+
 @pytest.fixture(scope='function')
 def django_db_setup(django_db_blocker):
     with django_db_blocker.unblock():
@@ -402,3 +479,50 @@ def test_render_custom_hyperlink():
     }}
     html = render_to_string('testapp/tiptap.html', context)
     assert html == f'<p>Click on this <a href="{page.get_absolute_url()}">page</a></p>'
+
+
+@pytest.fixture
+def richtext_cache(settings):
+    settings.FORMSET_RICHTEXT_CACHE_SIZE = 2
+    get_richtext_cache().clear()
+    yield renderer._rendered_richtext
+    renderer._rendered_richtext.clear()
+
+
+def test_cached_richtext(richtext_cache, mocker):
+    expected_html = RichtextRenderer().render(sample_document)
+    # the sample document contains a footnote, which is rendered as separate document
+    render = mocker.spy(RichtextRenderer, 'render')
+    html = render_richtext(sample_document, cached=True)
+    assert html == expected_html
+    assert render.call_count == 2
+    assert render_richtext(sample_document, cached=True) == html
+    assert render_richtext(json.dumps(sample_document), cached=True) == html
+    assert render.call_count == 4  # the JSON string is hashed differently
+
+    # the in-process cache is bounded, evicted entries are fetched from the Django cache
+    render_richtext(sample_document, framework='bootstrap', cached=True)
+    assert len(richtext_cache.entries) == 2
+    assert render_richtext(sample_document, cached=True) == html
+    assert render.call_count == 6
+
+    # a changed document is rendered again
+    changed_document = dict(sample_document, content=sample_document['content'][:1])
+    assert render_richtext(changed_document, cached=True) == '<h2>Fish &amp; &lt;Chips&gt;</h2>'
+    assert render.call_count == 7
+
+    html = render_to_string('testapp/tiptap-cached.html', {'object': {'text': changed_document}})
+    assert html == '<h2>Fish &amp; &lt;Chips&gt;</h2>'
+    assert render.call_count == 7
+
+
+@pytest.mark.django_db
+def test_warm_richtext_command(richtext_cache, mocker):
+    BlogModel.objects.create(body=sample_document)
+    stdout = StringIO()
+    call_command('formset_warm_richtext', 'testapp.BlogModel.body', stdout=stdout)
+    assert stdout.getvalue() == "Rendered 1 documents of testapp.BlogModel.body.\n"
+    render = mocker.spy(RichtextRenderer, 'render')
+    richtext_cache.clear()
+    render_richtext(sample_document, cached=True)
+    assert render.call_count == 0
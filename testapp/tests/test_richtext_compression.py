@@ -0,0 +1,62 @@
+import pytest
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+from formset.richtext.compression import compress_richtext, copy_richtext, decompress_richtext
+from formset.richtext.renderer import render_richtext
+
+from testapp.models.blog import CompressedBlogModel
+
+
+document = {'type': 'doc', 'content': [{
+    'type': 'heading',
+    'attrs': {'level': 2},
+    'content': [{'type': 'text', 'text': "Überschrift"}],
+}, {
+    'type': 'paragraph',
+    'content': [
+        {'type': 'text', 'text': "Some "},
+        {'type': 'text', 'marks': [{'type': 'bold'}], 'text': "bold"},
+        {'type': 'text', 'text': " and "},
+        {'type': 'text', 'marks': [{'type': 'italic'}], 'text': "italic"},
+        {'type': 'text', 'text': " text."},
+    ],
+}]}
+
+
+def test_compress_richtext(settings):
+    compressed = compress_richtext(document)
+    assert compressed[0] == 1
+    assert len(compressed) < len(str(document)) / 2
+    assert decompress_richtext(compressed) == document
+    assert decompress_richtext(memoryview(compressed)) == document
+    assert decompress_richtext(b'{"type": "doc"}') == {'type': 'doc'}
+    settings.FORMSET_RICHTEXT_COMPRESSION = 'lzma'
+    with pytest.raises(ImproperlyConfigured):
+        compress_richtext(document)
+
+
+@pytest.mark.django_db
+def test_compressed_richtext_field():
+    instance = CompressedBlogModel.objects.create(body=document)
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT body FROM {CompressedBlogModel._meta.db_table} WHERE id = %s', [instance.pk])
+        stored = bytes(cursor.fetchone()[0])
+    assert stored == compress_richtext(document)
+    instance = CompressedBlogModel.objects.get(pk=instance.pk)
+    assert instance.body == document
+    assert CompressedBlogModel.objects.values_list('body', flat=True).get() == document
+    assert render_richtext(instance.body) == (
+        '<h2>Überschrift</h2><p>Some <strong>bold</strong> and <em>italic</em> text.</p>'
+    )
+    assert CompressedBlogModel.objects.filter(body__isnull=False).count() == 1
+    assert CompressedBlogModel._meta.get_field('body').deconstruct()[3] == {'compressed': True, 'null': True}
+
+
+@pytest.mark.django_db
+def test_copy_richtext():
+    CompressedBlogModel.objects.bulk_create([CompressedBlogModel(legacy_body=document) for _ in range(3)])
+    copy_richtext('testapp', 'CompressedBlogModel', 'legacy_body', 'body', batch_size=2)(apps, None)
+    assert list(CompressedBlogModel.objects.values_list('body', flat=True)) == [document] * 3
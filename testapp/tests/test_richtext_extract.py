@@ -0,0 +1,73 @@
+import pytest
+
+import json
+from io import StringIO
+
+from django.core.management import call_command
+
+from formset.richtext.extract import extract_richtext, extract_text, iter_queryset_extracts, iter_text_runs
+
+from testapp.models.blog import BlogModel
+
+
+document = {'type': 'doc', 'content': [{
+    'type': 'heading',
+    'attrs': {'level': 1},
+    'content': [{'type': 'text', 'text': "The Title"}],
+}, {
+    'type': 'paragraph',
+    'content': [
+        {'type': 'text', 'text': "Read "},
+        {'type': 'text', 'text': "this", 'marks': [{'type': 'simple_link', 'attrs': {'href': "https://example.org/"}}]},
+        {'type': 'hardBreak'},
+        {'type': 'text', 'text': "carefully", 'marks': [{'type': 'bold'}]},
+        {'type': 'footnote', 'attrs': {'content': {'type': 'doc', 'content': [{
+            'type': 'paragraph',
+            'content': [{'type': 'text', 'text': "A footnote."}],
+        }]}}},
+        {'type': 'text', 'text': "."},
+    ],
+}, {
+    'type': 'bulletList',
+    'content': [{
+        'type': 'listItem',
+        'content': [{'type': 'paragraph', 'content': [{'type': 'text', 'text': "One item"}]}],
+    }],
+}]}
+
+
+def test_iter_text_runs():
+    runs = list(iter_text_runs(json.dumps(document)))
+    assert [run.text for run in runs] == ["The Title", "Read ", "this", "\n", "carefully", "A footnote.", ".", "One item"]
+    assert runs[0].path == (('heading', 0),)
+    assert runs[2].marks == ({'type': 'simple_link', 'attrs': {'href': "https://example.org/"}},)
+    assert runs[5].path == (('paragraph', 1), ('footnote', 4), ('paragraph', 0))
+    assert runs[7].path == (('bulletList', 2), ('listItem', 0), ('paragraph', 0))
+
+
+def test_extract_text():
+    assert extract_text(document) == "The Title\nRead this\ncarefully\nA footnote.\n.\nOne item"
+    assert extract_text(document, block_separator=' ').split() == [
+        "The", "Title", "Read", "this", "carefully", "A", "footnote.", ".", "One", "item",
+    ]
+    assert extract_text(None) == ''
+
+
+def test_extract_richtext():
+    extract = extract_richtext(document)
+    assert extract.text == "The Title\nRead this\ncarefully.\nOne item"
+    assert extract.word_count == 7
+    assert extract.links == ["https://example.org/"]
+    assert extract.footnotes == ["A footnote."]
+
+
+@pytest.mark.django_db
+def test_index_richtext_command():
+    BlogModel.objects.bulk_create([BlogModel(body=document) for _ in range(5)])
+    assert [pk for pk, _ in iter_queryset_extracts(BlogModel.objects.all(), 'body', chunk_size=2)] == list(
+        BlogModel.objects.values_list('pk', flat=True)
+    )
+    stdout = StringIO()
+    call_command('formset_index_richtext', 'testapp.BlogModel.body', 'body_text', batch_size=2, stdout=stdout)
+    assert stdout.getvalue() == "Indexed 5 documents of testapp.BlogModel.body into body_text.\n"
+    assert set(BlogModel.objects.values_list('body_text', flat=True)) == {"The Title\nRead this\ncarefully.\nOne item"}
@@ -0,0 +1,162 @@
+import pytest
+
+import functools
+
+from django.core.exceptions import ValidationError
+from django.forms import fields, forms
+
+from formset.collection import FormCollection
+from formset.renderers.default import FormRenderer
+from formset.richtext import controls
+from formset.richtext.dialogs import FootnoteDialogForm, SimpleLinkDialogForm
+from formset.richtext.fields import RichTextFormField
+from formset.richtext.schema import get_richtext_schema
+from formset.richtext.widgets import RichTextarea
+from formset.utils import FormMixin
+
+from testapp.forms.blog import BlogModelForm
+
+
+control_elements = [
+    controls.Bold(),
+    controls.Italic(),
+    controls.DialogControl(SimpleLinkDialogForm()),
+]
+
+
+class ArticleForm(FormMixin, forms.Form):
+    default_renderer = FormRenderer
+    template_name = 'django/forms/default.html'
+
+    intro = fields.CharField(widget=RichTextarea(control_elements=control_elements))
+    body = fields.CharField(widget=RichTextarea(control_elements=control_elements))
+    summary = fields.CharField(widget=RichTextarea(control_elements=[
+        controls.Bold(),
+        controls.DialogControl(SimpleLinkDialogForm()),
+    ]))
+
+
+def test_toolbar_is_cached(mocker):
+    form = ArticleForm()
+    form.render()
+    spy = mocker.spy(controls.Bold, 'render')
+    html = form.render()
+    assert spy.call_count == 0
+    assert html.count('<div role="menubar">') == 3
+
+
+def test_dialogs_outside_collections():
+    # forms rendered outside a collection leave their output untouched and render dialogs inside each editor
+    html = ArticleForm().render()
+    assert html.count('<dialog') == 3
+    assert 'richtext_dialog_simple_link' not in html
+
+    html = ArticleForm()['body'].as_widget() + ArticleForm()['body'].as_widget()
+    assert html.count('<dialog') == 2
+    assert 'richtext_dialog_simple_link' not in html
+
+
+class ArticleCollection(FormCollection):
+    default_renderer = FormRenderer
+    min_siblings = 1
+    extra_siblings = 1
+    article = ArticleForm()
+
+
+def test_dialog_rendered_once_per_collection(mocker):
+    html = ArticleCollection().render()
+    assert html.count('<dialog') == 1
+    assert html.count('id="id_articlecollection_richtext_dialog_simple_link"') == 1
+    # the editors of the sibling and of its template for new siblings all refer to the shared dialog
+    assert html.count('aria-controls="id_articlecollection_richtext_dialog_simple_link"') == 2 * 3
+    # removing any sibling must not remove the shared dialog
+    assert html.index('<dialog') > html.rindex('</template>')
+
+    # collections rendered separately refer to dialogs of their own
+    html = ArticleCollection(prefix='first').render() + ArticleCollection(prefix='second').render()
+    assert html.count('<dialog') == 2
+    assert html.count('id="id_first_richtext_dialog_simple_link"') == 1
+    assert html.count('id="id_second_richtext_dialog_simple_link"') == 1
+
+    # the toolbars of all siblings are rendered once
+    spy = mocker.spy(controls.Bold, 'render')
+    ArticleCollection().render()
+    assert spy.call_count == 0
+
+
+def test_schema_strips_unknown_nodes():
+    document = {'type': 'doc', 'content': [{
+        'type': 'heading',
+        'attrs': {'level': 1},
+        'content': [{'type': 'text', 'text': "Title"}],
+    }, {
+        'type': 'paragraph',
+        'content': [
+            {'type': 'text', 'text': "bold", 'marks': [{'type': 'bold'}, {'type': 'bold'}, {'type': 'strike'}]},
+            {'type': 'text', 'text': "link", 'marks': [{'type': 'simple_link', 'attrs': {'href': "/"}}]},
+            {'type': 'image', 'attrs': {'src': "/x.png"}},
+            {'type': 'text'},
+        ],
+    }]}
+    cleaned = ArticleForm.base_fields['body'].widget.schema.clean(document)
+    assert cleaned == {'type': 'doc', 'content': [{
+        'type': 'paragraph',
+        'content': [
+            {'type': 'text', 'text': "bold", 'marks': [{'type': 'bold'}]},
+            {'type': 'text', 'text': "link", 'marks': [{'type': 'simple_link', 'attrs': {'href': "/"}}]},
+        ],
+    }]}
+    assert document['content'][1]['content'][0]['marks'][2] == {'type': 'strike'}  # left untouched
+
+
+@pytest.mark.parametrize('document, code', [
+    ({'type': 'paragraph'}, 'invalid'),
+    ({'type': 'doc', 'content': {'type': 'paragraph'}}, 'invalid'),
+    ({'type': 'doc', 'content': [{'type': 'paragraph', 'content': [{'type': 'text', 'text': "x" * 101}]}]}, 'max_text_length'),
+    ({'type': 'doc', 'content': [{'type': 'paragraph'}] * 51}, 'max_nodes'),
+    ({'type': 'doc', 'content': [functools.reduce(
+        lambda node, _: {'type': 'bulletList', 'content': [node]}, range(5000), {'type': 'paragraph'},
+    )]}, 'max_depth'),
+    ({'type': 'doc', 'content': [{'type': 'paragraph', 'attrs': {'data': ["x" * 101]}}]}, 'max_text_length'),
+    ({'type': 'doc', 'content': [{'type': 'paragraph', 'attrs': {'data': list(range(51))}}]}, 'max_nodes'),
+    ({'type': 'doc', 'content': [{'type': 'paragraph', 'attrs': {'data': functools.reduce(
+        lambda value, _: {'x': value}, range(5000), {},
+    )}}]}, 'max_depth'),
+    ({'type': 'doc', 'content': [{'type': 'paragraph', 'content': [{'type': 'text', 'text': "x", 'marks': [
+        {'type': 'bold', 'attrs': {'data': {'x': "x" * 101}}},
+    ]}]}]}, 'max_text_length'),
+])
+def test_schema_limits(settings, document, code):
+    settings.FORMSET_RICHTEXT_MAX_TEXT_LENGTH = 100
+    settings.FORMSET_RICHTEXT_MAX_NODES = 50
+    schema = get_richtext_schema([controls.BulletList(), controls.Bold()])
+    with pytest.raises(ValidationError) as excinfo:
+        schema.clean(document)
+    assert excinfo.value.code == code
+
+
+def test_schema_nested_footnotes():
+    schema = get_richtext_schema([controls.DialogControl(FootnoteDialogForm())])
+    footnote = {'type': 'doc', 'content': [{'type': 'paragraph', 'content': [
+        {'type': 'text', 'text': "note", 'marks': [{'type': 'italic'}, {'type': 'textColor'}]},
+    ]}]}
+    cleaned = schema.clean({'type': 'doc', 'content': [{'type': 'paragraph', 'content': [
+        {'type': 'text', 'text': "text", 'marks': [{'type': 'italic'}]},
+        {'type': 'footnote', 'attrs': {'content': footnote, 'role': 'note'}},
+    ]}]})
+    paragraph = cleaned['content'][0]
+    assert paragraph['content'][0] == {'type': 'text', 'text': "text"}
+    assert paragraph['content'][1]['attrs']['content']['content'][0]['content'][0]['marks'] == [{'type': 'italic'}]
+
+
+@pytest.mark.django_db
+def test_richtext_field_cleaning():
+    form = BlogModelForm(data={
+        'body': {'type': 'doc', 'content': [{'type': 'paragraph', 'content': [
+            {'type': 'text', 'text': "Hello"},
+            {'type': 'iframe', 'attrs': {'src': "https://example.org/"}},
+        ]}]},
+    })
+    assert isinstance(form.fields['body'], RichTextFormField)
+    assert form.is_valid()
+    assert form.cleaned_data['body']['content'][0]['content'] == [{'type': 'text', 'text': "Hello"}]
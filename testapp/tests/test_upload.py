@@ -0,0 +1,668 @@
+import pytest
+
+import gc
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+from pathlib import Path
+from urllib.parse import urlencode
+from PIL import Image, ImageOps
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import InMemoryStorage, default_storage
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.signing import get_cookie_signer
+from django.db import models
+from django.forms import fields, forms
+from django.db.models.fields.files import FieldFile
+from django.forms.widgets import FILE_INPUT_CONTRADICTION
+from django.test import RequestFactory
+
+from formset import upload
+from formset.upload import (
+    FormsetUploadHandler, StoredUploadedFile, StreamedUploadedFile, get_file_info, get_thumbnail_path,
+    render_thumbnail, store_temporary_upload, sweep_temporary_uploads,
+)
+from formset.views import FormView
+from formset.widgets import UploadedFileInput
+
+from testapp.forms.gallerycollection import ImageForm
+from testapp.forms.upload import UploadForm
+from testapp.models.gallery import Gallery
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def create_image(width, height, format='JPEG'):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), color=(200, 100, 50)).save(buffer, format=format)
+    return buffer.getvalue()
+
+
+upload_view = FormView.as_view(form_class=UploadForm, template_name='testapp/native-form.html', success_url='/success')
+
+
+def get_temp_path(file_handle):
+    return Path(default_storage.path(get_cookie_signer(salt='formset').unsign(file_handle['upload_temp_name'])))
+
+
+def upload_image(name='photo.jpg', content=None):
+    temp_file = SimpleUploadedFile(name, content or create_image(1200, 900), content_type='image/jpeg')
+    request = RequestFactory().post('/', data={'temp_file': temp_file, 'image_height': '120'})
+    response = upload_view(request)
+    assert response.status_code == 200
+    return json.loads(response.content)
+
+
+@pytest.mark.parametrize('format', ['JPEG', 'PNG'])
+def test_render_thumbnail(tmp_path, mocker, format):
+    image_path = tmp_path / f'large.{format.lower()}'
+    image_path.write_bytes(create_image(4000, 3000, format))
+    fit = mocker.spy(ImageOps, 'fit')
+    thumbnail_path = get_thumbnail_path(image_path, 100)
+    render_thumbnail(image_path, thumbnail_path, 100)
+    with Image.open(thumbnail_path) as thumb:
+        assert thumb.size == (133, 100)
+    # JPEGs are decoded in draft mode, other formats are reduced, before being fitted
+    assert fit.call_args.args[0].size == {'JPEG': (500, 375), 'PNG': (364, 273)}[format]
+    assert not thumbnail_path.with_name(f'.{thumbnail_path.name}').exists()
+
+
+def test_synchronous_thumbnail(media_root):
+    file_handle = upload_image()
+    assert file_handle['thumbnail_pending'] is False
+    assert file_handle['thumbnail_url'].endswith('_h120.jpg')
+
+
+def test_thumbnail_variants(media_root, settings):
+    settings.FORMSET_THUMBNAIL_DENSITIES = [2]
+    settings.FORMSET_THUMBNAIL_FORMATS = ['webp', 'nonexisting']
+    file_handle = upload_image()
+    temp_path = get_temp_path(file_handle)
+    assert file_handle['thumbnail_url'].endswith('_h120.jpg')
+    assert file_handle['thumbnail_srcset'] == '{0} 1x, {1} 2x'.format(
+        file_handle['thumbnail_url'], file_handle['thumbnail_url'].replace('_h120.jpg', '_h120%402x.jpg'),
+    )
+    assert [source['type'] for source in file_handle['thumbnail_sources']] == ['image/webp']
+    assert file_handle['thumbnail_sources'][0]['srcset'].endswith('_h120%402x.webp 2x')
+    for density, suffix, format in [(1, '.jpg', 'JPEG'), (2, '.jpg', 'JPEG'), (1, '.webp', 'WEBP'), (2, '.webp', 'WEBP')]:
+        thumbnail_name = f'{temp_path.stem}_h120{"@2x" if density == 2 else ""}{suffix}'
+        with Image.open(temp_path.with_name(thumbnail_name)) as thumb:
+            assert thumb.format == format
+            assert thumb.size == (160 * density, 120 * density)
+
+    # thumbnail variants are removed together with their upload
+    removed_files, _ = sweep_temporary_uploads(max_age=0)
+    assert removed_files == 5
+    assert default_storage.listdir('upload_temp')[1] == []
+
+
+@pytest.fixture
+def thumbnail_pool(settings, monkeypatch):
+    settings.FORMSET_THUMBNAIL_WORKERS = 2
+    monkeypatch.setattr(upload, '_thumbnail_pool', None)
+    pool = upload.get_thumbnail_pool()
+    yield pool
+    pool.executor.shutdown()
+
+
+def test_asynchronous_thumbnail(media_root, thumbnail_pool, mocker):
+    render = mocker.patch('formset.upload.render_thumbnail', wraps=render_thumbnail)
+    file_handle = upload_image()
+    assert file_handle['thumbnail_pending'] is True
+    assert file_handle['thumbnail_url'].endswith('/file-picture.svg')
+    for future in list(thumbnail_pool.pending.values()):
+        future.result()
+    assert render.call_count == 1
+
+    request = RequestFactory().get('/', data={'thumbnail': file_handle['upload_temp_name'], 'image_height': 120})
+    response = upload_view(request)
+    assert response.status_code == 200
+    thumbnail_url = json.loads(response.content)['thumbnail_url']
+    assert thumbnail_url.endswith('_h120.jpg')
+    assert default_storage.exists(Path(thumbnail_url).relative_to(default_storage.base_url))
+
+
+def test_pending_thumbnail(media_root, thumbnail_pool, mocker):
+    mocker.patch.object(thumbnail_pool.slots, 'acquire', return_value=False)
+    file_handle = upload_image()
+    # queue exhausted, hence the image is depicted by its icon
+    assert file_handle['thumbnail_pending'] is False
+
+    thumbnail_pool.pending[str(get_thumbnail_path(get_temp_path(file_handle), 120))] = mocker.Mock(
+        done=mocker.Mock(return_value=False),
+    )
+    request = RequestFactory().get('/', data={'thumbnail': file_handle['upload_temp_name'], 'image_height': 120})
+    response = upload_view(request)
+    assert response.status_code == 202
+    assert json.loads(response.content)['thumbnail_pending'] is True
+
+
+def test_failed_thumbnail(media_root, thumbnail_pool, mocker):
+    render = mocker.patch('formset.upload.render_thumbnail', side_effect=OSError("Broken image"))
+    image_path = media_root / 'broken.jpg'
+    thumbnail_path = get_thumbnail_path(image_path, 120)
+
+    def submit_and_wait():
+        assert thumbnail_pool.submit(image_path, thumbnail_path, 120) is True
+        for _ in range(100):
+            if not thumbnail_pool.pending:
+                break
+            time.sleep(0.01)
+
+    submit_and_wait()
+    # the failed future does not linger in the pool
+    assert thumbnail_pool.pending == {}
+    assert thumbnail_pool.poll(thumbnail_path) is False
+    assert thumbnail_pool.poll(thumbnail_path) is None
+
+    # the failed thumbnail is rendered again on the next submission
+    submit_and_wait()
+    assert render.call_count == 2
+
+
+def test_thumbnail_bad_signature(media_root):
+    request = RequestFactory().get('/', data={'thumbnail': 'upload_temp/photo.jpg:forged', 'image_height': 120})
+    assert upload_view(request).status_code == 400
+
+
+def stored_image(media_root, name='1a2b3c.photo.jpg'):
+    (media_root / name).write_bytes(create_image(600, 400))
+    return FieldFile(None, models.FileField(), name)
+
+
+def test_file_info_cache(media_root, mocker):
+    field_file = stored_image(media_root)
+    render = mocker.patch('formset.upload.render_thumbnail', wraps=render_thumbnail)
+    file_info = get_file_info(field_file)
+    assert file_info['name'] == 'photo.jpg'
+    assert file_info['content_type'] == 'image/jpeg'
+    assert file_info['thumbnail_url'] == '/media/1a2b3c.photo_h200.jpg'
+    assert render.call_count == 1
+
+    guess_type = mocker.spy(upload.mimetypes, 'guess_type')
+    assert get_file_info(field_file) == file_info
+    assert guess_type.call_count == 0
+
+    # modifying the file invalidates its cached metadata
+    (media_root / field_file.name).write_bytes(create_image(60, 40))
+    os.utime(media_root / field_file.name, ns=(0, 0))
+    assert get_file_info(field_file)['size'] != file_info['size']
+    assert guess_type.call_count == 1
+
+
+def test_file_info_backfill(media_root, thumbnail_pool):
+    field_file = stored_image(media_root)
+    file_info = get_file_info(field_file)
+    assert file_info['thumbnail_url'].endswith('/file-picture.svg')
+    for future in list(thumbnail_pool.pending.values()):
+        future.result()
+    assert get_file_info(field_file)['thumbnail_url'] == '/media/1a2b3c.photo_h200.jpg'
+
+
+def test_file_info_missing(media_root):
+    file_info = get_file_info(FieldFile(None, models.FileField(), '1a2b3c.missing.pdf'))
+    assert file_info['thumbnail_url'].endswith('/file-missing.svg')
+    assert file_info['size'] == '–'
+
+
+def test_chunked_upload(media_root):
+    content = create_image(800, 600)
+    request = RequestFactory().post('/', data={
+        'upload_session': {'name': 'chunked.jpg', 'size': len(content), 'content_type': 'image/jpeg'},
+    }, content_type='application/json')
+    response = upload_view(request)
+    assert response.status_code == 200
+    upload_session = json.loads(response.content)['upload_session']
+
+    def put_chunk(offset, chunk):
+        query = urlencode({'upload_session': upload_session, 'offset': offset})
+        return upload_view(RequestFactory().put(f'/?{query}', data=chunk, content_type='application/octet-stream'))
+
+    response = put_chunk(0, content[:1000])
+    assert json.loads(response.content) == {'offset': 1000, 'size': len(content)}
+
+    # a chunk sent twice is rejected and the client is told where to resume
+    response = put_chunk(0, content[:1000])
+    assert response.status_code == 409
+    assert json.loads(response.content)['offset'] == 1000
+
+    # the finalization of an incomplete upload is rejected
+    request = RequestFactory().post('/', data={'finalize_upload': upload_session}, content_type='application/json')
+    assert upload_view(request).status_code == 400
+
+    response = upload_view(RequestFactory().get('/', data={'upload_session': upload_session}))
+    assert json.loads(response.content)['offset'] == 1000
+    assert put_chunk(1000, content[1000:] + b'excess').status_code == 400
+    assert put_chunk(1000, content[1000:]).status_code == 200
+
+    request = RequestFactory().post('/', data={
+        'finalize_upload': upload_session,
+        'image_height': 120,
+    }, content_type='application/json')
+    response = upload_view(request)
+    assert response.status_code == 200
+    file_handle = json.loads(response.content)
+    assert file_handle['name'] == 'chunked.jpg'
+    assert file_handle['size'] == len(content)
+    assert file_handle['thumbnail_url'].endswith('_h120.jpg')
+    assert get_temp_path(file_handle).read_bytes() == content
+    assert default_storage.listdir('upload_temp/sessions')[1] == []
+
+
+def test_upload_session_bad_signature(media_root):
+    query = urlencode({'upload_session': 'abc:forged', 'offset': 0})
+    response = upload_view(RequestFactory().put(f'/?{query}', data=b'xyz', content_type='application/octet-stream'))
+    assert response.status_code == 400
+
+
+def test_streaming_upload(media_root, mocker):
+    save = mocker.spy(default_storage, 'save')
+    content = create_image(800, 600)
+    file_handle = upload_image(content=content)
+    # the upload handler wrote the content straight into the temporary folder
+    assert save.call_count == 0
+    assert get_temp_path(file_handle).read_bytes() == content
+    assert default_storage.listdir('upload_temp/sessions')[1] == []
+
+
+def test_read_streamed_upload(media_root):
+    content = b"Some notes" * 1000
+    temp_file = SimpleUploadedFile('notes.txt', content, content_type='text/plain')
+    request = RequestFactory().post('/', data={'temp_file': temp_file})
+    view = FormView(form_class=UploadForm)
+    view.setup(request)
+    request.upload_handlers.insert(0, FormsetUploadHandler(request, view=view))
+    file_obj = request.FILES['temp_file']
+    assert isinstance(file_obj, StreamedUploadedFile)
+    assert file_obj.closed
+    assert file_obj.read() == content
+    assert b''.join(file_obj.chunks(chunk_size=1024)) == content
+    with file_obj.open() as opened_file:
+        assert opened_file.read(10) == b"Some notes"
+    assert file_obj.closed
+    request.close()  # Django's request cleanup closes all uploaded files
+    store_temporary_upload(file_obj)
+    assert file_obj.read() == content
+    file_obj.close()
+
+
+class RemoteStorage(InMemoryStorage):
+    """
+    Emulate a storage which is not located on the local filesystem.
+    """
+    def path(self, name):
+        raise NotImplementedError("This backend doesn't support absolute paths.")
+
+    def _relative_path(self, name):
+        return os.path.relpath(super().path(name), self.location)
+
+
+def test_remote_storage_upload(media_root, settings):
+    settings.STORAGES = dict(settings.STORAGES, default={'BACKEND': 'testapp.tests.test_upload.RemoteStorage'})
+    content = b'Lorem ipsum dolor sit amet'
+    temp_name = f'upload_temp/{hashlib.sha256(content).hexdigest()}.txt'
+    temp_file = SimpleUploadedFile('notes.txt', content, content_type='text/plain')
+    response = upload_view(RequestFactory().post('/', data={'temp_file': temp_file, 'image_height': '120'}))
+    assert response.status_code == 200
+    assert default_storage.open(temp_name).read() == content
+    assert list(media_root.iterdir()) == []
+    default_storage.delete(temp_name)
+
+    settings.FORMSET_UPLOAD_TICKET_BACKEND = 'formset.upload.LocalUploadTicketBackend'
+    upload = {'name': 'notes.txt', 'size': len(content), 'content_type': 'text/plain'}
+    target = json.loads(upload_view(
+        RequestFactory().post('/', data={'upload_ticket': upload}, content_type='application/json')
+    ).content)
+    request = RequestFactory().put(target['upload_url'], data=content, content_type='text/plain')
+    assert upload_view(request).status_code == 204
+    request = RequestFactory().post('/', data={'register_upload': target['upload_ticket']}, content_type='application/json')
+    assert upload_view(request).status_code == 200
+    assert default_storage.open(temp_name).read() == content
+    assert default_storage.listdir('upload_temp/sessions')[1] == []
+
+    # chunks can not be appended through the storage's API
+    request = RequestFactory().post('/', data={'upload_session': upload}, content_type='application/json')
+    with pytest.raises(ImproperlyConfigured):
+        upload_view(request)
+
+
+class LimitedUploadForm(forms.Form):
+    picture = fields.FileField(widget=UploadedFileInput(attrs={'accept': 'image/png', 'max-size': 2000}))
+
+
+def test_upload_limits(media_root):
+    limited_view = FormView.as_view(form_class=LimitedUploadForm, template_name='testapp/native-form.html')
+
+    def upload(name, content, content_type):
+        temp_file = SimpleUploadedFile(name, content, content_type=content_type)
+        request = RequestFactory().post('/?field=picture', data={'temp_file': temp_file, 'image_height': '120'})
+        return limited_view(request)
+
+    response = upload('photo.jpg', create_image(20, 20), 'image/jpeg')
+    assert response.status_code == 400
+    assert response.content == b"File type 'image/jpeg' is not accepted."
+    response = upload('large.png', os.urandom(5000), 'image/png')
+    assert response.status_code == 400
+    assert response.content == b"File 'large.png' exceeds the maximum size."
+    assert default_storage.listdir('upload_temp/sessions')[1] == []
+    assert upload('small.png', create_image(20, 20, 'PNG'), 'image/png').status_code == 200
+
+
+
+def test_upload_session_limits(media_root, settings):
+    settings.FORMSET_UPLOAD_TICKET_BACKEND = 'formset.upload.LocalUploadTicketBackend'
+    limited_view = FormView.as_view(form_class=LimitedUploadForm, template_name='testapp/native-form.html')
+
+    def announce(kind, name, size, content_type):
+        upload = {'name': name, 'size': size, 'content_type': content_type}
+        request = RequestFactory().post('/?field=picture', data={kind: upload}, content_type='application/json')
+        return limited_view(request)
+
+    for kind in ['upload_session', 'upload_ticket']:
+        response = announce(kind, 'photo.jpg', 1000, 'image/jpeg')
+        assert response.status_code == 400
+        assert response.content == b"File type 'image/jpeg' is not accepted."
+        response = announce(kind, 'large.png', 5000, 'image/png')
+        assert response.status_code == 400
+        assert response.content == b"File 'large.png' exceeds the maximum size."
+        assert announce(kind, 'small.png', 1000, 'image/png').status_code == 200
+
+
+def test_upload_handler_setting(media_root, settings, caplog):
+    def upload():
+        temp_file = SimpleUploadedFile('notes.txt', b"Some notes", content_type='text/plain')
+        request = RequestFactory().post('/', data={'temp_file': temp_file, 'image_height': '120'})
+        request.POST  # parse the request body, as the CSRF middleware does
+        return upload_view(request)
+
+    assert upload().status_code == 200
+    settings.FILE_UPLOAD_HANDLERS = [
+        'django.core.files.uploadhandler.MemoryFileUploadHandler',
+        'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+    ]
+    with caplog.at_level(logging.WARNING, logger='formset.upload'):
+        response = upload()
+    assert response.status_code == 200
+    assert get_temp_path(json.loads(response.content)).read_bytes() == b"Some notes"
+    assert "Streaming uploads are unavailable" in caplog.text
+
+    # buffered files are checked against the widget's limits after having been received
+    limited_view = FormView.as_view(form_class=LimitedUploadForm, template_name='testapp/native-form.html')
+    temp_file = SimpleUploadedFile('photo.jpg', create_image(20, 20), content_type='image/jpeg')
+    request = RequestFactory().post('/?field=picture', data={'temp_file': temp_file, 'image_height': '120'})
+    request.POST
+    response = limited_view(request)
+    assert response.status_code == 400
+    assert response.content == b"File type 'image/jpeg' is not accepted."
+
+
+def test_batch_upload_skipped(media_root, settings):
+    settings.FORMSET_UPLOAD_MAX_SIZE = 2000
+    temp_files = [
+        SimpleUploadedFile('first.txt', b"First notes", content_type='text/plain'),
+        SimpleUploadedFile('large.bin', os.urandom(5000), content_type='application/octet-stream'),
+        SimpleUploadedFile('last.txt', b"Last notes", content_type='text/plain'),
+    ]
+    response = upload_view(RequestFactory().post('/', data={'temp_files': temp_files}))
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+    file_handles = {line.pop('index'): line for line in lines}
+    assert file_handles[1] == {'error': "File 'large.bin' exceeds the maximum size."}
+    assert get_temp_path(file_handles[0]).read_bytes() == b"First notes"
+    assert get_temp_path(file_handles[2]).read_bytes() == b"Last notes"
+    assert default_storage.listdir('upload_temp/sessions')[1] == []
+
+
+def test_batch_upload_limits(media_root):
+    limited_view = FormView.as_view(form_class=LimitedUploadForm, template_name='testapp/native-form.html')
+    temp_files = [
+        SimpleUploadedFile('photo.jpg', create_image(20, 20), content_type='image/jpeg'),
+        SimpleUploadedFile('large.png', os.urandom(5000), content_type='image/png'),
+        SimpleUploadedFile('small.png', create_image(20, 20, 'PNG'), content_type='image/png'),
+    ]
+    data = {'temp_files': temp_files, 'fields': ['picture'] * 3}
+    response = limited_view(RequestFactory().post('/', data=data))
+    lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+    file_handles = {line.pop('index'): line for line in lines}
+    assert file_handles[0] == {'error': "File type 'image/jpeg' is not accepted."}
+    assert file_handles[1] == {'error': "File 'large.png' exceeds the maximum size."}
+    assert file_handles[2]['name'] == 'small.png'
+
+
+def test_concurrent_chunks(media_root):
+    content = os.urandom(4000)
+    request = RequestFactory().post('/', data={
+        'upload_session': {'name': 'chunked.bin', 'size': len(content)},
+    }, content_type='application/json')
+    upload_session = json.loads(upload_view(request).content)['upload_session']
+    query = urlencode({'upload_session': upload_session, 'offset': 0})
+
+    def put_chunk(_):
+        request = RequestFactory().put(f'/?{query}', data=content[:1000], content_type='application/octet-stream')
+        return upload_view(request).status_code
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        status_codes = sorted(executor.map(put_chunk, range(4)))
+    # only one of the chunks sent for the same offset has been accepted
+    assert status_codes == [200, 409, 409, 409]
+    response = upload_view(RequestFactory().get('/', data={'upload_session': upload_session}))
+    assert json.loads(response.content)['offset'] == 1000
+
+
+def test_direct_upload(media_root, settings):
+    content = create_image(800, 600)
+    upload = {'name': 'direct.jpg', 'size': len(content), 'content_type': 'image/jpeg'}
+    request = RequestFactory().post('/', data={'upload_ticket': upload}, content_type='application/json')
+    assert upload_view(request).status_code == 400  # direct uploads are disabled by default
+
+    settings.FORMSET_UPLOAD_TICKET_BACKEND = 'formset.upload.LocalUploadTicketBackend'
+    response = upload_view(request)
+    assert response.status_code == 200
+    target = json.loads(response.content)
+    assert target['method'] == 'PUT'
+    assert target['headers'] == {'Content-Type': 'image/jpeg'}
+    upload_ticket = target['upload_ticket']
+
+    def register():
+        request = RequestFactory().post('/', data={
+            'register_upload': upload_ticket,
+            'image_height': 120,
+        }, content_type='application/json')
+        return upload_view(request)
+
+    assert register().status_code == 400  # nothing has been uploaded yet
+    request = RequestFactory().put(target['upload_url'], data=content + b'excess', content_type='image/jpeg')
+    assert upload_view(request).status_code == 400
+    request = RequestFactory().put(target['upload_url'], data=content, content_type='image/jpeg')
+    assert upload_view(request).status_code == 204
+
+    response = register()
+    assert response.status_code == 200
+    file_handle = json.loads(response.content)
+    assert file_handle['name'] == 'direct.jpg'
+    assert file_handle['thumbnail_url'].endswith('_h120.jpg')
+    assert get_temp_path(file_handle).read_bytes() == content
+    assert default_storage.listdir('upload_temp/sessions')[1] == []
+
+    request = RequestFactory().post('/', data={'register_upload': upload_ticket[:-1]}, content_type='application/json')
+    assert upload_view(request).status_code == 400
+
+
+@pytest.mark.django_db
+def test_promote_upload(media_root, mocker):
+    file_handle = upload_image()
+    temp_path = get_temp_path(file_handle)
+    chunks = mocker.spy(StoredUploadedFile, 'chunks')
+    gallery = Gallery.objects.create(name="Holidays")
+    final_paths = []
+    for _ in range(2):
+        form = ImageForm(data={'image': [file_handle]})
+        assert form.is_valid()
+        image = form.save(commit=False)
+        image.gallery = gallery
+        image.save()
+        final_paths.append(Path(image.image.path))
+
+    # both images share the content of the temporary upload
+    assert final_paths[0] != final_paths[1]
+    for final_path in final_paths:
+        assert final_path.parent == media_root / 'images'
+        assert '.photo' in final_path.name
+        assert final_path.stat().st_ino == temp_path.stat().st_ino
+        assert get_thumbnail_path(final_path, 120).is_file()
+    assert chunks.call_count == 0
+    assert [p.name for p in temp_path.parent.glob('.*')] == []
+
+
+class PictureForm(forms.Form):
+    picture = fields.ImageField(widget=UploadedFileInput)
+
+
+def test_unsaved_upload_link(media_root):
+    file_handle = upload_image()
+    temp_path = get_temp_path(file_handle)
+    form = PictureForm(data={'picture': [file_handle]})
+    assert form.is_valid()
+    # validating the image created a hard link, which is removed along with the unsaved file
+    assert len(list(temp_path.parent.glob('.*'))) == 1
+    del form
+    gc.collect()
+    assert list(temp_path.parent.glob('.*')) == []
+    assert temp_path.is_file()
+
+
+def test_deduplicate_uploads(media_root, mocker):
+    content = create_image(1200, 900)
+    render = mocker.patch('formset.upload.render_thumbnail', wraps=render_thumbnail)
+    first_handle = upload_image('first.jpg', content)
+    second_handle = upload_image('second.jpg', content)
+    assert first_handle['name'] == 'first.jpg'
+    assert second_handle['name'] == 'second.jpg'
+    temp_path = get_temp_path(first_handle)
+    assert temp_path == get_temp_path(second_handle)
+    assert temp_path.stem == hashlib.sha256(content).hexdigest()
+    assert second_handle['thumbnail_url'] == first_handle['thumbnail_url']
+    assert render.call_count == 1
+    # each reference onto the content refreshes its modification time, which is used by the sweeper
+    age_files([temp_path], 86400)
+    upload_image('fourth.jpg', content)
+    assert time.time() - temp_path.stat().st_mtime < 60
+    assert upload_image('third.jpg', create_image(1200, 901))['upload_temp_name'] != first_handle['upload_temp_name']
+
+
+def age_files(paths, seconds):
+    for path in paths:
+        mtime = path.stat().st_mtime - seconds
+        os.utime(path, (mtime, mtime))
+
+
+def test_sweep_temporary_uploads(media_root, settings, mocker):
+    settings.FORMSET_UPLOAD_SWEEP_METRICS = 'testapp.tests.test_upload.metrics_hook'
+    metrics = mocker.patch('testapp.tests.test_upload.metrics_hook', create=True)
+    old_path = get_temp_path(upload_image('old.jpg', create_image(1200, 900)))
+    new_path = get_temp_path(upload_image('new.jpg', create_image(1200, 901)))
+    old_files = list(old_path.parent.glob(f'{old_path.stem}*'))
+    assert len(old_files) == 2  # upload and thumbnail
+    age_files(old_files, 3 * 86400)
+    old_size = sum(path.stat().st_size for path in old_files)
+
+    # a session still in flight and an abandoned one
+    for session_id, age in [('inflight', 60), ('abandoned', 2 * 3600)]:
+        for suffix in ['.json', '.part']:
+            path = media_root / 'upload_temp/sessions' / f'{session_id}{suffix}'
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(b'{}')
+            age_files([path], age)
+
+    removed_files, reclaimed_bytes = sweep_temporary_uploads()
+    assert removed_files == 4
+    assert reclaimed_bytes == old_size + 4
+    assert not any(path.exists() for path in old_files)
+    assert new_path.exists()
+    assert sorted(p.name for p in (media_root / 'upload_temp/sessions').iterdir()) == ['inflight.json', 'inflight.part']
+    metrics.assert_called_once_with(removed_files=4, reclaimed_bytes=reclaimed_bytes)
+
+    # evict by quota
+    assert sweep_temporary_uploads(quota=10**9) == (0, 0)
+    removed_files, reclaimed_bytes = sweep_temporary_uploads(quota=1000)
+    assert removed_files == 2
+    assert not new_path.exists()
+
+
+def test_sweep_command(media_root):
+    temp_path = get_temp_path(upload_image())
+    output = StringIO()
+    call_command('formset_sweep_uploads', max_age=0, dry_run=True, stdout=output)
+    assert output.getvalue().startswith("Would remove 2 files")
+    assert temp_path.exists()
+    call_command('formset_sweep_uploads', max_age=0, stdout=output)
+    assert not temp_path.exists()
+
+
+def test_batch_upload(media_root, mocker):
+    temp_files = [
+        SimpleUploadedFile(f'image{index}.jpg', create_image(600, 400 + index), content_type='image/jpeg')
+        for index in range(3)
+    ] + [SimpleUploadedFile('notes.txt', b"Some notes", content_type='text/plain')]
+    request = RequestFactory().post('/', data={'temp_files': temp_files, 'image_heights': [100, 120, 140]})
+    response = upload_view(request)
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+    file_handles = {line.pop('index'): line for line in lines}
+    assert sorted(file_handles.keys()) == [0, 1, 2, 3]
+    for index, height in enumerate([100, 120, 140]):
+        assert file_handles[index]['name'] == f'image{index}.jpg'
+        assert file_handles[index]['thumbnail_url'].endswith(f'_h{height}.jpg')
+    assert file_handles[3]['thumbnail_url'].endswith('/file-unknown.svg')
+    assert get_temp_path(file_handles[3]).read_bytes() == b"Some notes"
+
+
+def test_batch_upload_error(media_root, mocker):
+    mocker.patch('formset.upload.store_temporary_upload', side_effect=OSError("Disk full"))
+    temp_files = [SimpleUploadedFile('notes.txt', b"Some notes", content_type='text/plain')]
+    response = upload_view(RequestFactory().post('/', data={'temp_files': temp_files}))
+    assert json.loads(b''.join(response.streaming_content)) == {
+        'index': 0,
+        'error': "File upload failed for 'notes.txt'.",
+    }
+
+
+@pytest.mark.parametrize('content_type, accepted', [
+    ('image/png', True),
+    ('application/pdf', True),
+    ('text/plain', False),
+    ('image', False),
+    ('image/png/x', False),
+    ('/png', False),
+    ('', False),
+    (None, False),
+])
+def test_accepts_content_type(content_type, accepted):
+    assert UploadedFileInput.accepts_content_type('image/*, .pdf', content_type) is accepted
+
+
+def test_accept_reencoded_image(media_root):
+    widget = UploadedFileInput(attrs={'accept': 'image/jpeg, image/png'})
+    file_handle = upload_image('photo.jpg')
+    assert isinstance(widget.value_from_datadict({'image': [file_handle]}, {}, 'image'), StoredUploadedFile)
+
+    # image re-encoded as WebP by the client, but declared as JPEG
+    content = create_image(600, 400, 'WEBP')
+    temp_file = SimpleUploadedFile('photo.webp', content, content_type='image/jpeg')
+    response = upload_view(RequestFactory().post('/', data={'temp_file': temp_file, 'image_height': '120'}))
+    file_handle = json.loads(response.content)
+    assert file_handle['content_type'] == 'image/jpeg'
+    assert widget.value_from_datadict({'image': [file_handle]}, {}, 'image') is FILE_INPUT_CONTRADICTION
+    widget = UploadedFileInput(attrs={'accept': 'image/*'})
+    assert isinstance(widget.value_from_datadict({'image': [file_handle]}, {}, 'image'), StoredUploadedFile)
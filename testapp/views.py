@@ -167,7 +167,7 @@ class DemoFormViewMixin(DemoViewMixin, CalendarResponseMixin, IncompleteSelectRe
     extra_doc = None
 
     def form_valid(self, form):
-        formset_data = json.loads(self.request.body)['formset_data']
+        formset_data = self._request_body['formset_data']
         self.request.session['valid_formset_data'] = json.dumps(
             formset_data, cls=JSONEncoder, indent=2, ensure_ascii=False
         )
@@ -247,7 +247,7 @@ class DemoFormCollectionViewMixin(DemoViewMixin):
         return form_collection
 
     def form_collection_valid(self, form_collection):
-        formset_data = json.loads(self.request.body)['formset_data']
+        formset_data = self._request_body['formset_data']
         self.request.session['valid_formset_data'] = json.dumps(
             formset_data, cls=JSONEncoder, indent=2, ensure_ascii=False
         )